@@ -5,7 +5,7 @@ a = Analysis(
     ['app.py'],
     pathex=[],
     binaries=[],
-    datas=[('db.py', '.'), ('utils.py', '.')],
+    datas=[('db.py', '.'), ('utils.py', '.'), ('backup.py', '.'), ('maintenance.py', '.'), ('client.py', '.'), ('docstore.py', '.'), ('reports.py', '.'), ('sessions.py', '.'), ('quality.py', '.'), ('columnar.py', '.'), ('dashboard.py', '.')],
     hiddenimports=[],
     hookspath=[],
     hooksconfig={},
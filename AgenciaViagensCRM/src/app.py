@@ -2,25 +2,36 @@
 from __future__ import annotations
 
 import os
+import queue
 import subprocess
 import sys
+import threading
+import time
 from datetime import date, datetime, timedelta
 from decimal import Decimal
-from typing import Dict, Optional
+from typing import Callable, Dict, Optional, Tuple
 
 import tkinter as tk
-from tkinter import END, Menu, StringVar, IntVar, Toplevel, messagebox, filedialog
+from tkinter import END, Menu, StringVar, IntVar, Toplevel, messagebox, filedialog, simpledialog
 from tkinter import ttk
 import tkinter.font as tkfont
 
+import db
 from db import (
-    DB_PATH,
-    init_db, available_years, list_clientes, list_by_month_year,
-    sum_lucro, insert_cliente, update_cliente, delete_cliente, flights_departing_on,
+    archive_before, enable_mirror, disable_mirror, mirror_enabled, MIRROR_ENABLED_BY_ENV,
 )
+from client import RemoteDB, RemoteError
+import columnar
+import dashboard
+import docstore
+import quality
+import reports
+from sessions import SessionCache
+from backup import start_backup_thread
+from maintenance import db_stats, format_stats, start_maintenance_thread
 from utils import (
-    br_to_iso, iso_to_br, parse_currency_to_cents, format_cents_br,
-    valido_cpf, somente_digitos,
+    br_to_iso, iso_to_br, parse_currency_to_cents, parse_currency_many, format_cents_br, format_cliente_rows,
+    valido_cpf, somente_digitos, fold_nome,
     
 )
 
@@ -32,8 +43,13 @@ class App:
     TABLE_W = 1000
     TABLE_H = 760
 
-    def __init__(self, root: tk.Tk) -> None:
+    def __init__(self, root: tk.Tk, backend: Optional[RemoteDB] = None) -> None:
         self.root = root
+        # db (arquivo local) ou RemoteDB (server.py): mesma interface
+        self.remote = backend is not None
+        # modo local: uma sessão por arquivo, as últimas ficam abertas (troca rápida)
+        self.sessions = SessionCache()
+        self.backend = backend if backend is not None else self.sessions.open(db.DB_PATH)[0]
         self.root.title("Agência de Viagens — CRM de Clientes")
         self.root.geometry("1600x980")
         self.root.minsize(1280, 860)
@@ -42,6 +58,13 @@ class App:
         self.base_size = 11
 
         self._masking_guard = False  # evita recursão nos formatadores
+        self.doc_health = docstore.HealthChecker()
+        self._doc_status_by_id: Dict[int, str] = {}
+        self._doc_check_gen = 0
+        self._dashboard: Optional[Tuple[Toplevel, Callable[[], None]]] = None  # painel aberto (janela, recarregar)
+        self.var_mirror = tk.BooleanVar(value=False)
+        if MIRROR_ENABLED_BY_ENV and not self.remote:
+            self._set_mirror(True)
         self.var_lucro_mode = tk.StringVar(value="cliente")  # 'custo' ou 'cliente' (padrão corrige estornos reduzindo lucro)
 
         self._make_styles()
@@ -51,10 +74,18 @@ class App:
         self.refresh_table()
         self.update_totals()
 
-        # Checagem inicial e periódica de voos de amanhã
-        self.check_upcoming_flights(show_if_empty=False)
+        # Checagem inicial e periódica de voos de amanhã e aniversariantes
+        self.check_alerts()
         self.schedule_hourly_check()
 
+        # Manutenção do banco (optimize, vacuum incremental, checkpoint) quando ocioso
+        self._last_activity = datetime.now()
+        self._maintenance_thread = None
+        self.root.bind_all("<Any-KeyPress>", self._mark_activity, add="+")
+        self.root.bind_all("<Any-ButtonPress>", self._mark_activity, add="+")
+        if not self.remote:
+            self.schedule_idle_maintenance()
+
         # Atalhos
         self.root.bind("<Control-n>", lambda _e: self.on_clear_form())
         self.root.bind("<Control-s>", lambda _e: self.on_save())
@@ -170,6 +201,8 @@ class App:
         self._lucro_user_edited = False
 
     # ---------- Auto-ajuste colunas ----------
+    MEASURE_LONGEST = 32
+
     def _get_tree_font(self, tree: ttk.Treeview) -> tkfont.Font:
         try:
             font_name = self.style.lookup("Treeview", "font")
@@ -199,8 +232,9 @@ class App:
         heading_text = tree.heading(col).get("text", "")
         max_width = f.measure(heading_text) + padding
 
-        for iid in tree.get_children(""):
-            txt = str(tree.set(iid, col))
+        # medir cada célula custa uma chamada Tk; basta medir os textos mais longos
+        texts = {str(tree.set(iid, col)) for iid in tree.get_children("")}
+        for txt in sorted(texts, key=len, reverse=True)[:self.MEASURE_LONGEST]:
             w = f.measure(txt)
             if w + padding > max_width:
                 max_width = w + padding
@@ -217,8 +251,22 @@ class App:
         # Menu
         menubar = Menu(self.root)
         menu_banco = Menu(menubar, tearoff=False)
-        menu_banco.add_command(label="Trocar banco de dados…", command=self.on_change_db)
-        menu_banco.add_command(label="Mostrar caminho do banco", command=self.on_show_db_path)
+        if self.remote:
+            # backup, manutenção etc. ficam a cargo do servidor
+            menu_banco.add_command(label="Mostrar servidor", command=self.on_show_db_path)
+        else:
+            menu_banco.add_command(label="Trocar banco de dados…", command=self.on_change_db)
+            menu_banco.add_command(label="Mostrar caminho do banco", command=self.on_show_db_path)
+            menu_banco.add_separator()
+            menu_banco.add_command(label="Fazer backup…", command=self.on_backup)
+            menu_banco.add_command(label="Manutenção / estatísticas…", command=self.on_maintenance)
+            menu_banco.add_command(label="Arquivar viagens antigas…", command=self.on_archive)
+            menu_banco.add_command(label="Verificar documentos de voo", command=self.on_scan_documents)
+            menu_banco.add_command(label="Importar documentos antigos p/ repositório", command=self.on_import_legacy_documents)
+            menu_banco.add_command(label="Qualidade dos dados…", command=self.open_quality_view)
+            menu_banco.add_separator()
+            menu_banco.add_checkbutton(label="Relatórios a partir de cópia em memória",
+                                       variable=self.var_mirror, command=self.on_toggle_mirror)
         menubar.add_cascade(label="Banco", menu=menu_banco)
 
         # ===== Modo de cálculo do Lucro =====
@@ -275,7 +323,11 @@ class App:
         self.lbl_total_ano.grid(row=0, column=9, sticky="w")
 
         ttk.Button(top, text="Vendas por Mês/Ano…", command=self.open_month_year_view).grid(row=0, column=10, padx=(18, 0))
-        ttk.Button(top, text="Checar voos de amanhã", command=lambda: self.check_upcoming_flights(show_if_empty=True)).grid(row=0, column=11, padx=(12, 0))
+        ttk.Button(top, text="Relatórios…", command=self.open_reports_view).grid(row=0, column=11, padx=(12, 0))
+        ttk.Button(top, text="Painel…", command=self.open_dashboard_view).grid(row=0, column=12, padx=(12, 0))
+        ttk.Button(top, text="Recebíveis…", command=self.open_receivables_view).grid(row=0, column=13, padx=(12, 0))
+        ttk.Button(top, text="Checar voos de amanhã", command=lambda: self.check_upcoming_flights(show_if_empty=True)).grid(row=0, column=14, padx=(12, 0))
+        ttk.Button(top, text="Aniversariantes", command=self.show_birthdays).grid(row=0, column=15, padx=(12, 0))
         top.grid_columnconfigure(1, weight=1)
 
         # ======= ÁREA PRINCIPAL =======
@@ -362,7 +414,8 @@ class App:
         btns = ttk.Frame(form); btns.grid(row=r, column=0, columnspan=3, pady=(12, 0))
         ttk.Button(btns, text="Novo / Salvar", command=self.on_save).pack(side="left", padx=(0, 8))
         ttk.Button(btns, text="Limpar", command=self.on_clear_form).pack(side="left", padx=(0, 8))
-        ttk.Button(btns, text="Excluir selecionado", command=self.on_delete).pack(side="left")
+        ttk.Button(btns, text="Excluir selecionado", command=self.on_delete).pack(side="left", padx=(0, 8))
+        ttk.Button(btns, text="Histórico do cliente…", command=self.open_customer_history).pack(side="left")
 
         form.grid_columnconfigure(1, weight=1)
 
@@ -381,6 +434,7 @@ class App:
 
         self.tree.tag_configure("odd", background=self.colors["row_odd"])
         self.tree.tag_configure("even", background=self.colors["row_even"])
+        self.tree.tag_configure("doc_problema", foreground="#B91C1C")
 
         self._headings = {
             "id": "ID", "nome": "Nome", "nascimento": "Nascimento", "compra": "Compra",
@@ -403,8 +457,13 @@ class App:
         footer = ttk.Frame(self.root, padding=(12, 8))
         footer.pack(side="bottom", fill="x")
         ttk.Button(footer, text="Exportar CSV (lista atual)", command=self.on_export_csv).pack(side="left")
+        btn_bi = ttk.Button(footer, text="Exportar p/ BI…", command=self.on_export_columnar)
+        btn_bi.pack(side="left", padx=(6, 0))
+        if self.remote or not columnar.available_formats():
+            btn_bi.state(["disabled"])
         self.conn_badge = ttk.Label(footer, text="Conectado", style="Status.TLabel"); self.conn_badge.pack(side="left", padx=(12, 0))
-        self.status = ttk.Label(footer, text=f"Banco: {DB_PATH}", style="Status.TLabel"); self.status.pack(side="right")
+        origem = f"Servidor: {self.backend.base_url}" if self.remote else f"Banco: {self.backend.path}"
+        self.status = ttk.Label(footer, text=origem, style="Status.TLabel"); self.status.pack(side="right")
 
         # Placeholders
         self._add_placeholder(self.ent_nascimento, self.var_nascimento, "DD/MM/AAAA")
@@ -439,43 +498,315 @@ class App:
 
     # ---------- Menu Banco ----------
     def on_change_db(self) -> None:
-        from db import DB_PATH as _DB_PATH
         new_path = filedialog.asksaveasfilename(
             title="Selecionar/definir arquivo do banco de dados",
             defaultextension=".db",
             filetypes=[("SQLite DB", "*.db"), ("SQLite", "*.sqlite"), ("Todos", "*.*")],
-            initialfile=os.path.basename(_DB_PATH) if _DB_PATH else "agencia_viagens.db",
+            initialfile=os.path.basename(self.backend.path) or "agencia_viagens.db",
         )
         if not new_path:
             return
-        import db as _db
-        _db.DB_PATH = new_path
         try:
-            init_db()
-            self.status["text"] = f"Banco: {new_path}"
+            self.backend, warm = self.sessions.open(new_path)
+            if mirror_enabled():
+                self._set_mirror(True)
+            self.status["text"] = f"Banco: {new_path}" + (" (sessão em cache)" if warm else "")
             self.refresh_year_month_options()
             self.refresh_table()
             self.update_totals()
-            messagebox.showinfo("Banco", "Banco de dados trocado com sucesso.")
+            if not warm:
+                messagebox.showinfo("Banco", "Banco de dados trocado com sucesso.")
         except Exception as exc:
             messagebox.showerror("Erro ao trocar banco", str(exc))
 
+    def on_toggle_mirror(self) -> None:
+        self._set_mirror(self.var_mirror.get())
+
+    def _set_mirror(self, on: bool) -> None:
+        try:
+            if on:
+                with self.backend.bound():
+                    enable_mirror()
+            else:
+                disable_mirror()
+        except Exception as exc:
+            on = False
+            messagebox.showerror("Cópia em memória", str(exc))
+        self.var_mirror.set(on)
+
     def on_show_db_path(self) -> None:
-        from db import DB_PATH as _DB_PATH
-        messagebox.showinfo("Banco de dados", f"Caminho atual do banco:\n{_DB_PATH}")
+        if self.remote:
+            messagebox.showinfo("Servidor", f"Conectado ao servidor:\n{self.backend.base_url}")
+            return
+        messagebox.showinfo("Banco de dados", f"Caminho atual do banco:\n{self.backend.path}")
+
+    def on_backup(self) -> None:
+        if getattr(self, "_backup_thread", None) is not None and self._backup_thread.is_alive():
+            messagebox.showinfo("Backup", "Já existe um backup em andamento.")
+            return
+        directory = filedialog.askdirectory(title="Pasta dos backups")
+        if not directory:
+            return
+        compress = messagebox.askyesno("Backup", "Comprimir o backup (gzip)?")
+        # A thread só conversa com o Tk por esta fila; o polling roda no loop do Tk.
+        self._backup_queue: "queue.Queue[tuple]" = queue.Queue()
+        q = self._backup_queue
+        with self.backend.bound():
+            self._backup_thread = start_backup_thread(
+                directory,
+                compress=compress,
+                progress=lambda done, total: q.put(("progress", done, total)),
+                on_done=lambda path, exc: q.put(("done", path, exc)),
+            )
+        self.status["text"] = "Backup iniciado…"
+        self.root.after(200, self._poll_backup)
+
+    def _poll_backup(self) -> None:
+        finished = None
+        try:
+            while True:
+                msg = self._backup_queue.get_nowait()
+                if msg[0] == "progress":
+                    _tag, done, total = msg
+                    pct = (100 * done // total) if total else 100
+                    self.status["text"] = f"Backup: {pct}% ({done}/{total} páginas)"
+                else:
+                    finished = msg
+        except queue.Empty:
+            pass
+        if finished is None:
+            self.root.after(200, self._poll_backup)
+            return
+        _tag, path, exc = finished
+        if exc is not None:
+            self.status["text"] = "Falha no backup."
+            messagebox.showerror("Erro no backup", str(exc))
+        else:
+            self.status["text"] = f"Backup salvo em {os.path.basename(path)}."
+
+    def on_maintenance(self) -> None:
+        try:
+            with self.backend.bound():
+                stats = format_stats(db_stats())
+        except Exception as exc:
+            messagebox.showerror("Manutenção", str(exc))
+            return
+        if not messagebox.askyesno("Manutenção do banco", f"{stats}\n\nExecutar manutenção completa agora?"):
+            return
+        self._run_maintenance(full=True, notify=True)
+
+    def on_archive(self) -> None:
+        sugestao = date.today().replace(month=1, day=1)
+        sugestao = sugestao.replace(year=sugestao.year - 2)
+        resp = simpledialog.askstring(
+            "Arquivar viagens",
+            "Mover para o arquivo as viagens encerradas antes de (DD/MM/AAAA):",
+            initialvalue=sugestao.strftime("%d/%m/%Y"), parent=self.root,
+        )
+        if not resp:
+            return
+        try:
+            cutoff = datetime.strptime(resp.strip(), "%d/%m/%Y").date()
+        except ValueError:
+            messagebox.showerror("Arquivar viagens", "Data inválida. Use DD/MM/AAAA.")
+            return
+        if not messagebox.askyesno("Confirmar", f"Arquivar viagens encerradas antes de {cutoff:%d/%m/%Y}?"):
+            return
+        if getattr(self, "_archive_thread", None) is not None and self._archive_thread.is_alive():
+            messagebox.showinfo("Arquivar viagens", "Já existe um arquivamento em andamento.")
+            return
+
+        def done(moved: Optional[int], exc: Optional[BaseException]) -> None:
+            if exc is not None:
+                self.status["text"] = "Falha ao arquivar."
+                messagebox.showerror("Erro ao arquivar", str(exc))
+                return
+            self.refresh_year_month_options()
+            self.refresh_table()
+            self.update_totals()
+            self.status["text"] = f"{moved} viagem(ns) arquivada(s)."
+
+        self.status["text"] = "Arquivando viagens…"
+        self._archive_thread = self._run_in_background("arquivar", lambda: archive_before(cutoff), done)
+
+    def _run_in_background(self, name: str, work: Callable[[], object],
+                           done: Callable[[object, Optional[BaseException]], None]) -> threading.Thread:
+        """work() numa thread daemon, no banco da sessão atual; done(resultado,
+        erro) roda no loop do Tk (a thread só conversa com o Tk pela fila)."""
+        session = self.backend
+        result: "queue.Queue[tuple]" = queue.Queue()
+
+        def run() -> None:
+            try:
+                with session.bound():
+                    result.put((work(), None))
+            except Exception as exc:
+                result.put((None, exc))
+
+        def poll() -> None:
+            try:
+                res, exc = result.get_nowait()
+            except queue.Empty:
+                self.root.after(100, poll)
+                return
+            done(res, exc)
+
+        t = threading.Thread(target=run, name=name, daemon=True)
+        t.start()
+        self.root.after(100, poll)
+        return t
+
+    def _documents_busy(self) -> bool:
+        if getattr(self, "_docs_thread", None) is not None and self._docs_thread.is_alive():
+            messagebox.showinfo("Documentos", "Já existe uma operação de documentos em andamento.")
+            return True
+        return False
+
+    def on_scan_documents(self) -> None:
+        if self._documents_busy():
+            return
+
+        def done(problems, exc: Optional[BaseException]) -> None:
+            self.status["text"] = ""
+            if exc is not None:
+                messagebox.showerror("Documentos", str(exc))
+                return
+            if not problems:
+                messagebox.showinfo("Documentos", "Repositório de documentos íntegro.")
+                return
+            linhas = [f"{h[:12]}…: {msg}" for h, msg in problems[:30]]
+            extra = f"\n… e mais {len(problems) - 30}" if len(problems) > 30 else ""
+            messagebox.showwarning("Documentos", f"{len(problems)} problema(s):\n\n" + "\n".join(linhas) + extra)
+
+        self.status["text"] = "Verificando documentos…"
+        self._docs_thread = self._run_in_background("doc-scan", docstore.scan, done)
+
+    def open_quality_view(self) -> None:
+        session = self.backend  # a janela continua no banco em que foi aberta
+        win = Toplevel(self.root); win.title("Qualidade dos dados"); win.geometry("1000x600")
+        top = ttk.Frame(win, padding=(12, 10)); top.pack(side="top", fill="x")
+        todas = "Todas as regras"
+        por_desc = {f"{desc} [{grav}]": regra for regra, (grav, desc) in quality.RULES.items()}
+        var_regra = StringVar(value=todas)
+        cmb = ttk.Combobox(top, textvariable=var_regra, values=[todas] + list(por_desc), width=48, state="readonly")
+        cmb.pack(side="left")
+        btn_inc = ttk.Button(top, text="Verificar alterações", command=lambda: run(False)); btn_inc.pack(side="left", padx=(12, 0))
+        btn_full = ttk.Button(top, text="Verificação completa", command=lambda: run(True)); btn_full.pack(side="left", padx=(6, 0))
+        lbl_info = ttk.Label(top, text="", style="Field.TLabel"); lbl_info.pack(side="left", padx=(18, 0))
+
+        container = ttk.Frame(win); container.pack(fill="both", expand=True, padx=12, pady=8)
+        cfg = {
+            "id": (70, "center", "ID"),
+            "nome": (280, "w", "Nome"),
+            "regra": (200, "w", "Regra"),
+            "detalhe": (380, "w", "Detalhe"),
+        }
+        table = ttk.Treeview(container, columns=tuple(cfg), show="headings")
+        vsb = ttk.Scrollbar(container, orient="vertical", command=table.yview)
+        table.configure(yscrollcommand=vsb.set)
+        table.grid(row=0, column=0, sticky="nsew"); vsb.grid(row=0, column=1, sticky="ns")
+        container.grid_rowconfigure(0, weight=1); container.grid_columnconfigure(0, weight=1)
+        for c, (w, anc, t) in cfg.items():
+            table.heading(c, text=t)
+            table.column(c, width=w, anchor=anc, stretch=False)
+
+        def show() -> None:
+            for iid in table.get_children(""):
+                table.delete(iid)
+            regra = por_desc.get(var_regra.get())
+            with session.bound():
+                achados = quality.list_findings(regra)
+                resumo = quality.summary()
+            for cid, nome, r, detalhe in achados:
+                table.insert("", END, values=(cid, nome, quality.RULES[r][1], detalhe))
+            lbl_info["text"] = "   ".join(f"{r}: {n}" for r, n in resumo) if resumo else "Nenhum problema registrado."
+
+        result: "queue.Queue[tuple]" = queue.Queue()
+
+        def work(full: bool) -> None:
+            try:
+                with session.bound():
+                    res = quality.scan(full=full, progress=lambda i, n: result.put(("progresso", i, n)))
+                result.put(("fim", res, None))
+            except Exception as exc:
+                result.put(("fim", None, exc))
+
+        def poll() -> None:
+            while True:
+                try:
+                    item = result.get_nowait()
+                except queue.Empty:
+                    win.after(100, poll)
+                    return
+                if item[0] == "progresso":
+                    lbl_info["text"] = f"Verificando… faixa {item[1]} de {item[2]}"
+                    continue
+                _, res, exc = item
+                btn_inc.state(["!disabled"]); btn_full.state(["!disabled"])
+                if exc is not None:
+                    lbl_info["text"] = ""
+                    messagebox.showerror("Qualidade dos dados", str(exc), parent=win)
+                    return
+                show()
+                self.status["text"] = f"Qualidade: {res['verificadas']} venda(s) verificada(s), {res['achados']} achado(s)."
+                return
+
+        def run(full: bool) -> None:
+            btn_inc.state(["disabled"]); btn_full.state(["disabled"])
+            lbl_info["text"] = "Verificando…"
+            threading.Thread(target=work, args=(full,), name="qualidade", daemon=True).start()
+            win.after(100, poll)
+
+        cmb.bind("<<ComboboxSelected>>", lambda _e: show())
+        show()
+        run(False)
+
+    def on_import_legacy_documents(self) -> None:
+        if self._documents_busy():
+            return
+
+        def done(res, exc: Optional[BaseException]) -> None:
+            self.status["text"] = ""
+            if exc is not None:
+                messagebox.showerror("Documentos", str(exc))
+                return
+            n, missing = res
+            msg = f"{n} documento(s) trazido(s) para o repositório."
+            if missing:
+                msg += f"\n{len(missing)} caminho(s) não encontrado(s)."
+            messagebox.showinfo("Documentos", msg)
+            self.refresh_table()
+
+        self.status["text"] = "Importando documentos…"
+        self._docs_thread = self._run_in_background("doc-import", docstore.import_legacy_paths, done)
 
     # ---------- Ações ----------
     def on_pick_file(self) -> None:
         path = filedialog.askopenfilename(title="Selecionar documento do voo")
-        if path:
+        if not path:
+            return
+        if self.remote:
             self.var_doc_voo_path.set(path)
+            return
+        try:
+            with self.backend.bound():
+                ref = docstore.import_file(path)
+        except OSError as exc:
+            messagebox.showerror("Documento do voo", str(exc))
+            return
+        self.var_doc_voo_path.set(ref)
+        self.status["text"] = f"Documento {os.path.basename(path)} guardado no repositório."
 
     def on_open_file(self) -> None:
-        path = self.var_doc_voo_path.get().strip()
-        if not path:
+        valor = self.var_doc_voo_path.get().strip()
+        if self.remote:
+            path = docstore.resolve(valor)
+        else:
+            with self.backend.bound():
+                path = docstore.resolve(valor)
+        if not path or path == "caminho/arquivo.pdf":
             messagebox.showinfo("Abrir arquivo", "Nenhum arquivo definido.")
             return
-        import os
         if not os.path.exists(path):
             messagebox.showerror("Abrir arquivo", "Arquivo não encontrado no caminho salvo.")
             return
@@ -502,23 +833,27 @@ class App:
         sel = self.tree.selection()
         if not sel:
             return
-        item = self.tree.item(sel[0])
-        (cid, nome, nasc, comp, ida, volta, doc, venda, pago, lucro) = item["values"]
-        self.var_id.set(int(cid))
-        self.var_nome.set(nome)
-        self.var_nascimento.set(nasc)
-        self.var_compra.set(comp)
-        self.var_data_ida.set(ida)
-        self.var_data_volta.set(volta)
-        if ":" in doc:
-            tipo, valor = doc.split(":", 1)
-            self.var_doc_tipo.set(tipo.strip())
-            self.var_doc_valor.set(valor.strip())
-        else:
-            self.var_doc_valor.set(doc)
-        self.var_valor_venda.set(venda)
-        self.var_valor_pago.set(pago)
-        self.var_valor_lucro.set(lucro)
+        cid = int(self.tree.item(sel[0])["values"][0])
+        try:
+            c = self.backend.get_cliente(cid)
+        except RemoteError as exc:
+            messagebox.showerror("Servidor", str(exc))
+            return
+        if c is None:
+            self.status["text"] = f"Cliente ID {cid} não encontrado."
+            return
+        self.var_id.set(c.id)
+        self.var_nome.set(c.nome_completo)
+        self.var_nascimento.set(iso_to_br(c.data_nascimento))
+        self.var_compra.set(iso_to_br(c.data_compra_voo))
+        self.var_data_ida.set(iso_to_br(c.data_ida))
+        self.var_data_volta.set(iso_to_br(c.data_volta))
+        self.var_doc_tipo.set(c.doc_tipo or "CPF")
+        self.var_doc_valor.set(c.doc_valor or "")
+        self.var_valor_venda.set(format_cents_br(c.valor_venda_cents))
+        self.var_valor_pago.set(format_cents_br(c.valor_pago_cents))
+        self.var_valor_lucro.set(format_cents_br(c.valor_lucro_cents))
+        self.var_doc_voo_path.set(c.doc_voo_path or "")
         self._lucro_user_edited = True
 
     def on_clear_form(self) -> None:
@@ -537,7 +872,7 @@ class App:
             return
         if not messagebox.askyesno("Confirmar exclusão", f"Deseja excluir o cliente ID {cid}?"):
             return
-        delete_cliente(cid)
+        self.backend.delete_cliente(cid)
         self.on_clear_form()
         self.refresh_table()
         self.update_totals()
@@ -560,13 +895,17 @@ class App:
             messagebox.showerror("Erro de validação", str(exc))
             return
         cid = self.var_id.get()
-        if cid > 0:
-            update_cliente(cid, data)
-            self.status["text"] = f"Cliente ID {cid} atualizado com sucesso."
-        else:
-            new_id = insert_cliente(data)
-            self.var_id.set(new_id)
-            self.status["text"] = f"Cliente criado com ID {new_id}."
+        try:
+            if cid > 0:
+                self.backend.update_cliente(cid, data)
+                self.status["text"] = f"Cliente ID {cid} atualizado com sucesso."
+            else:
+                new_id = self.backend.insert_cliente(data)
+                self.var_id.set(new_id)
+                self.status["text"] = f"Cliente criado com ID {new_id}."
+        except Exception as exc:
+            messagebox.showerror("Erro ao salvar", str(exc))
+            return
         self.refresh_year_month_options()
         self.refresh_table()
         self.update_totals()
@@ -591,6 +930,41 @@ class App:
         except Exception as exc:
             messagebox.showerror("Erro ao exportar", str(exc))
 
+    def on_export_columnar(self) -> None:
+        """Mesmo filtro da busca, mas com colunas tipadas (Parquet ou .npz), em segundo plano."""
+        tipos = {"parquet": ("Parquet", "*.parquet"), "npz": ("NumPy", "*.npz")}
+        formatos = columnar.available_formats()
+        fpath = filedialog.asksaveasfilename(title="Exportar para BI", defaultextension=f".{formatos[0]}",
+                                             filetypes=[tipos[f] for f in formatos],
+                                             initialfile=f"clientes.{formatos[0]}")
+        if not fpath:
+            return
+        busca = self.var_busca.get().strip()
+        session = self.backend
+        result: "queue.Queue[tuple]" = queue.Queue()
+
+        def work() -> None:
+            try:
+                with session.bound():
+                    result.put((columnar.export_columnar(fpath, busca), None))
+            except Exception as exc:
+                result.put((0, exc))
+
+        def poll() -> None:
+            try:
+                n, exc = result.get_nowait()
+            except queue.Empty:
+                self.root.after(100, poll)
+                return
+            if exc is not None:
+                messagebox.showerror("Erro ao exportar", str(exc))
+                return
+            self.status["text"] = f"{n} linha(s) exportada(s) para {os.path.basename(fpath)}."
+
+        self.status["text"] = "Exportando para BI…"
+        threading.Thread(target=work, name="export-bi", daemon=True).start()
+        self.root.after(100, poll)
+
     # ---------- Eventos de preço/lucro ----------
     def on_price_change(self, _event=None) -> None:
         if self._lucro_user_edited:
@@ -616,22 +990,55 @@ class App:
         for iid in self.tree.get_children(""):
             self.tree.delete(iid)
         search = self.var_busca.get().strip()
-        data = list_clientes(search)
-        for idx, (cid, nome, nasc_iso, comp_iso, doc_tipo, doc_valor, venda_c, lucro_c, pago_c, ida_iso, volta_iso, _path) in enumerate(data):
-            nasc = iso_to_br(nasc_iso)
-            comp = iso_to_br(comp_iso)
-            ida = iso_to_br(ida_iso)
-            volta = iso_to_br(volta_iso) if volta_iso else ""
-            doc = f"{doc_tipo}: {doc_valor}"
-            venda = format_cents_br(venda_c)
-            lucro = format_cents_br(lucro_c)
-            pago = format_cents_br(pago_c)
+        data = self.backend.list_clientes(search)
+        doc_paths: Dict[int, str] = {r.id: r.doc_voo_path for r in data if r.doc_voo_path}
+        for idx, values in enumerate(format_cliente_rows(data)):
             tag = "odd" if idx % 2 == 0 else "even"
-            self.tree.insert("", END, values=(cid, nome, nasc, comp, ida, volta, doc, venda, pago, lucro), tags=(tag,))
+            self.tree.insert("", END, values=values, tags=(tag,))
         self._auto_adjust_all_columns(self.tree)
+        self._start_doc_check(doc_paths)
+
+    # ---------- Saúde dos documentos ----------
+    def _start_doc_check(self, doc_paths: Dict[int, str]) -> None:
+        """Confere os anexos em segundo plano e marca na tabela os ausentes/alterados."""
+        if self.remote or not doc_paths:
+            return
+        self._doc_check_gen += 1
+        gen = self._doc_check_gen
+        result: "queue.Queue[Dict[str, str]]" = queue.Queue()
+        with self.backend.bound():
+            self.doc_health.check_in_background(doc_paths.values(), result.put)
+
+        def poll() -> None:
+            try:
+                by_value = result.get_nowait()
+            except queue.Empty:
+                self.root.after(100, poll)
+                return
+            if gen != self._doc_check_gen:
+                return  # tabela já foi recarregada
+            self._doc_status_by_id = {cid: by_value.get(v, docstore.STATUS_OK) for cid, v in doc_paths.items()}
+            self._apply_doc_tags()
+            ruins = sum(1 for st in self._doc_status_by_id.values() if st != docstore.STATUS_OK)
+            if ruins:
+                self.status["text"] = f"{ruins} documento(s) de voo ausente(s) ou alterado(s)."
+
+        self.root.after(100, poll)
+
+    def _apply_doc_tags(self) -> None:
+        for iid in self.tree.get_children(""):
+            tags = [t for t in self.tree.item(iid, "tags") if t != "doc_problema"]
+            try:
+                cid = int(self.tree.item(iid, "values")[0])
+            except (IndexError, ValueError):
+                continue
+            if self._doc_status_by_id.get(cid, docstore.STATUS_OK) != docstore.STATUS_OK:
+                tags.append("doc_problema")
+            self.tree.item(iid, tags=tags)
 
     def sort_by(self, col: str) -> None:
         rows = [self.tree.item(i)["values"] for i in self.tree.get_children("")]
+        tags_by_id = {self.tree.item(i)["values"][0]: self.tree.item(i)["tags"] for i in self.tree.get_children("")}
         if not rows:
             return
         asc = self.col_sort_state.get(col, True)
@@ -639,26 +1046,24 @@ class App:
         def to_date_br(s: str) -> datetime:
             return datetime.strptime(s, "%d/%m/%Y") if s else datetime.min
 
-        def money_to_cents(s: str) -> int:
-            try:
-                return parse_currency_to_cents(s)
-            except Exception:
-                return 0
-
         key_funcs = {
             "id": lambda r: int(r[0]),
-            "nome": lambda r: str(r[1]).lower(),
+            "nome": lambda r: fold_nome(str(r[1])),
             "nascimento": lambda r: to_date_br(r[2]),
             "compra": lambda r: to_date_br(r[3]),
             "ida": lambda r: to_date_br(r[4]),
             "volta": lambda r: to_date_br(r[5]),
             "doc": lambda r: str(r[6]).lower(),
-            "venda": lambda r: money_to_cents(r[7]),
-            "pago": lambda r: money_to_cents(r[8]),
-            "lucro": lambda r: money_to_cents(r[9]),
         }
+        money_idx = {"venda": 7, "pago": 8, "lucro": 9}
 
-        rows.sort(key=key_funcs[col], reverse=not asc)
+        if col in money_idx:
+            # valores inválidos contam como 0
+            cents, _erros = parse_currency_many(str(r[money_idx[col]]) for r in rows)
+            order = sorted(range(len(rows)), key=cents.__getitem__, reverse=not asc)
+            rows = [rows[i] for i in order]
+        else:
+            rows.sort(key=key_funcs[col], reverse=not asc)
         self.col_sort_state[col] = not asc
 
         for c in self._headings:
@@ -669,13 +1074,13 @@ class App:
         for iid in self.tree.get_children(""):
             self.tree.delete(iid)
         for r in rows:
-            self.tree.insert("", END, values=r)
+            self.tree.insert("", END, values=r, tags=tags_by_id.get(r[0], ()))
 
         self._auto_adjust_all_columns(self.tree)
 
     # ---------- Totais ----------
     def refresh_year_month_options(self) -> None:
-        years = available_years()
+        years = self.backend.available_years()
         cur = self.var_ano.get()
         year_vals = [str(y) for y in years]
         if cur and cur not in year_vals:
@@ -692,10 +1097,12 @@ class App:
             year = None
         mes_nome = self.var_mes.get()
         month = mes_map.get(mes_nome) if mes_nome and mes_nome != "Todos" else None
-        lucro_mes = sum_lucro(year=year, month=month) if month else 0
-        lucro_ano = sum_lucro(year=year) if year else sum_lucro()
+        lucro_mes = self.backend.sum_lucro(year=year, month=month) if month else 0
+        lucro_ano = self.backend.sum_lucro(year=year) if year else self.backend.sum_lucro()
         self.lbl_total_mes.configure(text=(f"Total (Mês): {format_cents_br(lucro_mes)}" if month else "Total (Mês): —"))
         self.lbl_total_ano.configure(text=f"Total (Ano): {format_cents_br(lucro_ano)}")
+        if self._dashboard is not None:
+            self._dashboard[1]()
 
     # ---------- Coleta/Validação ----------
     def _collect_and_validate_form(self) -> Dict[str, object]:
@@ -783,7 +1190,7 @@ class App:
         top = ttk.Frame(win, padding=(12, 10)); top.pack(side="top", fill="x")
 
         ttk.Label(top, text="Ano:", style="Field.TLabel").grid(row=0, column=0, padx=(0, 6), sticky="e")
-        years = [str(y) for y in available_years()]
+        years = [str(y) for y in self.backend.available_years()]
         var_ano2 = StringVar(value=years[-1] if years else str(datetime.now().year))
         cmb_ano2 = ttk.Combobox(top, textvariable=var_ano2, values=years, width=8, state="readonly"); cmb_ano2.grid(row=0, column=1, sticky="w")
 
@@ -793,7 +1200,13 @@ class App:
         cmb_mes2 = ttk.Combobox(top, textvariable=var_mes2, values=meses, width=12, state="readonly"); cmb_mes2.grid(row=0, column=3, sticky="w")
 
         btn_aplicar = ttk.Button(top, text="Aplicar Filtro", command=lambda: populate()); btn_aplicar.grid(row=0, column=4, padx=(12, 0))
-        lbl_tot = ttk.Label(top, text="Total (Lucro): R$ 0,00", style="Header.TLabel"); lbl_tot.grid(row=0, column=5, padx=(18, 0))
+        ttk.Button(top, text="◀", width=3, command=lambda: step(-1)).grid(row=0, column=5, padx=(12, 0))
+        ttk.Button(top, text="▶", width=3, command=lambda: step(1)).grid(row=0, column=6, padx=(4, 0))
+        lbl_tot = ttk.Label(top, text="Total (Lucro): R$ 0,00", style="Header.TLabel"); lbl_tot.grid(row=0, column=7, padx=(18, 0))
+        cmb_ano2.bind("<<ComboboxSelected>>", lambda _e: populate())
+        cmb_mes2.bind("<<ComboboxSelected>>", lambda _e: populate())
+        win.bind("<Prior>", lambda _e: step(-1))
+        win.bind("<Next>", lambda _e: step(1))
 
         container = ttk.Frame(win); container.pack(fill="both", expand=True, padx=12, pady=8)
         table = ttk.Treeview(container, columns=("id","nome","ida","volta","compra","doc","venda","pago","lucro"), show="headings")
@@ -841,38 +1254,390 @@ class App:
         ttk.Button(win, text="Exportar CSV (filtro)", command=export_csv_local).pack(side="bottom", anchor="w", padx=12, pady=(0, 10))
 
         mes_map = {"Janeiro":1,"Fevereiro":2,"Março":3,"Abril":4,"Maio":5,"Junho":6,"Julho":7,"Agosto":8,"Setembro":9,"Outubro":10,"Novembro":11,"Dezembro":12}
+        # linhas já formatadas por (ano, mês); valem enquanto a lista do cache for a mesma
+        formatted: Dict[tuple, tuple] = {}
+        state = {"gen": 0, "fechada": False}
+        win.bind("<Destroy>", lambda e: state.update(fechada=True) if e.widget is win else None, add="+")
 
-        def populate() -> None:
-            for iid in table.get_children(""):
-                table.delete(iid)
+        def selected() -> Optional[tuple]:
             try:
                 y = int(var_ano2.get())
             except ValueError:
-                messagebox.showerror("Ano inválido", "Selecione um ano válido.")
-                return
+                return None
             mn = var_mes2.get()
-            m = mes_map.get(mn) if mn != "Todos" else None
-            rows_local = list_by_month_year(y, m)
-            total_lucro = 0
-            for (cid, nome, _nasc_iso, comp_iso, doc_tipo, doc_valor, venda_c, lucro_c, pago_c, ida_iso, volta_iso, _path) in rows_local:
-                table.insert("", END, values=(
-                    cid, nome, iso_to_br(ida_iso), iso_to_br(volta_iso) if volta_iso else "",
-                    iso_to_br(comp_iso), f"{doc_tipo}: {doc_valor}",
-                    format_cents_br(venda_c), format_cents_br(pago_c), format_cents_br(lucro_c)
-                ))
-                total_lucro += int(lucro_c)
-            lbl_tot["text"] = f"Total (Lucro): {format_cents_br(total_lucro)}"
+            return y, (mes_map.get(mn) if mn != "Todos" else None)
+
+        def neighbours(y: int, m: Optional[int]) -> list:
+            if m is None:
+                return [(yy, None) for yy in (y - 1, y + 1) if str(yy) in years]
+            prev = (y, m - 1) if m > 1 else (y - 1, 12)
+            nxt = (y, m + 1) if m < 12 else (y + 1, 1)
+            return [p for p in (prev, nxt) if str(p[0]) in years]
+
+        def step(delta: int) -> None:
+            sel = selected()
+            if sel is None:
+                return
+            y, m = sel
+            if m is None:
+                y += delta
+            else:
+                m += delta
+                if m < 1:
+                    y, m = y - 1, 12
+                elif m > 12:
+                    y, m = y + 1, 1
+            if str(y) not in years:
+                return
+            var_ano2.set(str(y))
+            if m is not None:
+                var_mes2.set(meses[m])
+            populate()
+
+        def fetch(gen: int, y: int, m: Optional[int], result: "queue.Queue[tuple]") -> None:
+            try:
+                rows_local = self.backend.list_by_month_year(y, m)
+                grupos = self.backend.grouped_report("mes", y)
+                result.put((rows_local, grupos, None))
+            except Exception as exc:
+                result.put((None, None, exc))
+                return
+            if self.remote:
+                return  # sem cache no cliente: pré-carga não aproveitaria
+            # pré-carga dos vizinhos: ficam no cache da sessão para o próximo ◀/▶
+            for py, pm in neighbours(y, m):
+                if state["gen"] != gen or state["fechada"]:
+                    return
+                try:
+                    self.backend.list_by_month_year(py, pm)
+                    self.backend.grouped_report("mes", py)
+                except Exception:
+                    return
+
+        def render(y: int, m: Optional[int], rows_local: list, grupos: list) -> None:
+            for iid in table.get_children(""):
+                table.delete(iid)
+            hit = formatted.get((y, m))
+            if hit is None or hit[0] is not rows_local:
+                values = [(cid, nome, ida, volta, comp, doc, venda, pago, lucro)
+                          for (cid, nome, _nasc, comp, ida, volta, doc, venda, pago, lucro) in format_cliente_rows(rows_local)]
+                hit = formatted[(y, m)] = (rows_local, values)
+            for v in hit[1]:
+                table.insert("", END, values=v)
+            # totais do agregado por mês, sem somar as linhas
+            if m is not None:
+                tot = next((r for r in grupos if r[0] == f"{y:04d}-{m:02d}"), ("", 0, 0, 0, 0, 0))
+            else:
+                tot = reports.totals(grupos)
+            lbl_tot["text"] = (f"{tot[1]} venda(s) — Venda: {format_cents_br(tot[2])}   "
+                               f"Pago: {format_cents_br(tot[3])}   Total (Lucro): {format_cents_br(tot[4])}")
             for col in table["columns"]:
                 self._auto_adjust_column(table, col)
 
+        def populate() -> None:
+            sel = selected()
+            if sel is None:
+                messagebox.showerror("Ano inválido", "Selecione um ano válido.", parent=win)
+                return
+            y, m = sel
+            state["gen"] += 1
+            gen = state["gen"]
+            lbl_tot["text"] = "Carregando…"
+            result: "queue.Queue[tuple]" = queue.Queue()
+            threading.Thread(target=fetch, args=(gen, y, m, result), name="mes-ano", daemon=True).start()
+
+            def poll() -> None:
+                if state["fechada"] or gen != state["gen"]:
+                    return  # janela fechada ou outro mês já pedido
+                try:
+                    rows_local, grupos, exc = result.get_nowait()
+                except queue.Empty:
+                    win.after(20, poll)
+                    return
+                if exc is not None:
+                    lbl_tot["text"] = ""
+                    messagebox.showerror("Vendas por Mês/Ano", str(exc), parent=win)
+                    return
+                render(y, m, rows_local, grupos)
+
+            win.after(1, poll)
+
         populate()
 
-    # ---------- Alertas de Voo ----------
+    # ---------- Histórico do cliente ----------
+    def open_customer_history(self) -> None:
+        """Todas as viagens da pessoa da venda selecionada (mesmo documento)."""
+        cid = self.var_id.get()
+        if cid <= 0:
+            messagebox.showinfo("Histórico", "Selecione um cliente na lista.")
+            return
+        rows = self.backend.customer_history(cid)
+        if not rows:
+            messagebox.showinfo("Histórico", "Cliente não encontrado.")
+            return
+        atual = next((r for r in rows if r.id == cid), rows[0])
+        win = Toplevel(self.root); win.title(f"Histórico — {atual.nome_completo}"); win.geometry("1000x520")
+        top = ttk.Frame(win, padding=(12, 10)); top.pack(side="top", fill="x")
+        venda = sum(r.valor_venda_cents for r in rows)
+        lucro = sum(r.valor_lucro_cents for r in rows)
+        ttk.Label(top, text=f"{atual.nome_completo} — {atual.doc_tipo}: {atual.doc_valor}", style="Header.TLabel").pack(side="left")
+        ttk.Label(top, text=f"{len(rows)} viagem(ns)   Venda: {format_cents_br(venda)}   Lucro: {format_cents_br(lucro)}",
+                  style="Field.TLabel").pack(side="right")
+
+        container = ttk.Frame(win); container.pack(fill="both", expand=True, padx=12, pady=8)
+        cfg = {
+            "id": (60, "center", "ID"),
+            "compra": (110, "center", "Compra"),
+            "ida": (110, "center", "Ida"),
+            "volta": (110, "center", "Volta"),
+            "venda": (120, "e", "Venda"),
+            "pago": (120, "e", "Pago"),
+            "lucro": (120, "e", "Lucro"),
+        }
+        table = ttk.Treeview(container, columns=tuple(cfg), show="headings")
+        vsb = ttk.Scrollbar(container, orient="vertical", command=table.yview)
+        table.configure(yscrollcommand=vsb.set)
+        table.grid(row=0, column=0, sticky="nsew"); vsb.grid(row=0, column=1, sticky="ns")
+        container.grid_rowconfigure(0, weight=1); container.grid_columnconfigure(0, weight=1)
+        for c, (w, anc, t) in cfg.items():
+            table.heading(c, text=t)
+            table.column(c, width=w, anchor=anc, stretch=False)
+        for (rid, _nome, _nasc, comp, ida, volta, _doc, v, p, lu) in format_cliente_rows(rows):
+            table.insert("", END, values=(rid, comp, ida, volta, v, p, lu), tags=("atual",) if rid == cid else ())
+        table.tag_configure("atual", font=(self.base_font, self.base_size, "bold"))
+
+    # ---------- Painel ----------
+    DASHBOARD_REDRAW_MS = 30  # junta os <Configure> de um arraste de redimensionamento
+
+    def open_dashboard_view(self) -> None:
+        """Lucro, venda e pago por mês em gráficos no Canvas. Os dados vêm de um
+        grouped_report("mes") (em cache na sessão até a próxima gravação) e são
+        relidos sempre que update_totals roda; redimensionar só redesenha.
+        """
+        if self._dashboard is not None:
+            self._dashboard[0].lift()
+            self._dashboard[1]()
+            return
+        win = Toplevel(self.root); win.title("Painel"); win.geometry("1000x680")
+        top = ttk.Frame(win, padding=(12, 10)); top.pack(side="top", fill="x")
+        lbl_tot = ttk.Label(top, text="", style="Header.TLabel"); lbl_tot.pack(side="left")
+        lbl_info = ttk.Label(top, text="", style="Status.TLabel"); lbl_info.pack(side="right")
+        canvas = tk.Canvas(win, background="white", highlightthickness=0)
+        canvas.pack(fill="both", expand=True, padx=12, pady=(0, 12))
+
+        state = {"labels": [], "series": {}, "gen": 0, "after": None, "lendo": False, "fechada": False}
+        font = (self.base_font, max(self.base_size - 2, 8))
+
+        def redraw() -> None:
+            state["after"] = None
+            if state["fechada"]:
+                return
+            t0 = time.perf_counter()
+            pontos = dashboard.draw_dashboard(canvas, state["labels"], state["series"],
+                                              canvas.winfo_width(), canvas.winfo_height(), font)
+            canvas.update_idletasks()
+            ms = (time.perf_counter() - t0) * 1000
+            lbl_info["text"] = f"{len(state['labels'])} mês(es), {pontos} ponto(s) — desenho {ms:.0f} ms"
+
+        def on_configure(_e=None) -> None:
+            if state["after"] is not None:
+                win.after_cancel(state["after"])
+            state["after"] = win.after(self.DASHBOARD_REDRAW_MS, redraw)
+
+        result: "queue.Queue[tuple]" = queue.Queue()
+
+        def fetch(gen: int) -> None:
+            try:
+                result.put((gen, self.backend.grouped_report("mes", None), None))
+            except Exception as exc:
+                result.put((gen, None, exc))
+
+        def poll() -> None:
+            if state["fechada"]:
+                return
+            while True:
+                try:
+                    gen, rows, exc = result.get_nowait()
+                except queue.Empty:
+                    win.after(100, poll)
+                    return
+                if gen == state["gen"]:  # descarta leituras já superadas
+                    break
+            state["lendo"] = False
+            if exc is not None:
+                lbl_info["text"] = ""
+                messagebox.showerror("Painel", str(exc), parent=win)
+                return
+            state["labels"], state["series"] = dashboard.monthly_series(rows)
+            _, n, venda, pago, lucro, _ = reports.totals(rows)
+            lbl_tot["text"] = (f"{n} venda(s)   Lucro: {format_cents_br(lucro)}   "
+                               f"Venda: {format_cents_br(venda)}   Pago: {format_cents_br(pago)}")
+            redraw()
+
+        def refresh() -> None:
+            state["gen"] += 1
+            lbl_info["text"] = "Carregando…"
+            threading.Thread(target=fetch, args=(state["gen"],), name="painel", daemon=True).start()
+            if not state["lendo"]:
+                state["lendo"] = True
+                win.after(100, poll)
+
+        def on_destroy(e) -> None:
+            if e.widget is win:
+                state["fechada"] = True
+                self._dashboard = None
+
+        canvas.bind("<Configure>", on_configure)
+        win.bind("<Destroy>", on_destroy)
+        self._dashboard = (win, refresh)
+        refresh()
+
+    # ---------- Recebíveis ----------
+    RECEIVABLES_PAGE = 200
+
+    def open_receivables_view(self) -> None:
+        win = Toplevel(self.root); win.title("Recebíveis"); win.geometry("1100x620")
+        top = ttk.Frame(win, padding=(12, 10)); top.pack(side="top", fill="x")
+        lbl_tot = ttk.Label(top, text="", style="Header.TLabel"); lbl_tot.pack(side="left")
+
+        container = ttk.Frame(win); container.pack(fill="both", expand=True, padx=12, pady=8)
+        cfg = {
+            "id": (60, "center", "ID"),
+            "nome": (280, "w", "Nome"),
+            "ida": (110, "center", "Ida"),
+            "volta": (110, "center", "Volta"),
+            "doc": (200, "center", "Documento"),
+            "venda": (120, "e", "Venda"),
+            "pago": (120, "e", "Pago"),
+            "saldo": (120, "e", "Em aberto"),
+        }
+        table = ttk.Treeview(container, columns=tuple(cfg), show="headings")
+        vsb = ttk.Scrollbar(container, orient="vertical", command=table.yview)
+        table.configure(yscrollcommand=vsb.set)
+        table.grid(row=0, column=0, sticky="nsew"); vsb.grid(row=0, column=1, sticky="ns")
+        container.grid_rowconfigure(0, weight=1); container.grid_columnconfigure(0, weight=1)
+        for c, (w, anc, t) in cfg.items():
+            table.heading(c, text=t)
+            table.column(c, width=w, anchor=anc, stretch=False)
+
+        state: Dict[str, object] = {"after": None, "fim": False}
+        btn_mais = ttk.Button(win, text="Carregar mais", command=lambda: load_page())
+        btn_mais.pack(side="bottom", anchor="w", padx=12, pady=(0, 10))
+
+        def load_page() -> None:
+            if state["fim"]:
+                return
+            rows = self.backend.list_receivables(self.RECEIVABLES_PAGE, state["after"])
+            for r in rows:
+                table.insert("", END, values=(
+                    r.id, r.nome_completo, iso_to_br(r.data_ida), iso_to_br(r.data_volta),
+                    f"{r.doc_tipo}: {r.doc_valor}", format_cents_br(r.valor_venda_cents),
+                    format_cents_br(r.valor_pago_cents), format_cents_br(r.valor_venda_cents - r.valor_pago_cents),
+                ))
+            if rows:
+                state["after"] = (rows[-1].data_ida, rows[-1].id)
+            if len(rows) < self.RECEIVABLES_PAGE:
+                state["fim"] = True
+                btn_mais.state(["disabled"])
+
+        n, total = self.backend.receivables_total()
+        lbl_tot["text"] = f"{n} viagem(ns) com saldo em aberto — Total: {format_cents_br(total)}"
+        load_page()
+
+    # ---------- Relatórios ----------
+    def open_reports_view(self) -> None:
+        win = Toplevel(self.root); win.title("Relatórios"); win.geometry("900x560")
+        top = ttk.Frame(win, padding=(12, 10)); top.pack(side="top", fill="x")
+
+        por_label = {v: k for k, v in reports.GROUPINGS.items()}
+        ttk.Label(top, text="Agrupar por:", style="Field.TLabel").grid(row=0, column=0, padx=(0, 6), sticky="e")
+        var_por = StringVar(value=reports.GROUPINGS["mes"])
+        ttk.Combobox(top, textvariable=var_por, values=list(por_label), width=28, state="readonly").grid(row=0, column=1, sticky="w")
+
+        ttk.Label(top, text="Ano:", style="Field.TLabel").grid(row=0, column=2, padx=(12, 6), sticky="e")
+        var_ano = StringVar(value="Todos")
+        anos = ["Todos"] + [str(y) for y in self.backend.available_years()]
+        ttk.Combobox(top, textvariable=var_ano, values=anos, width=8, state="readonly").grid(row=0, column=3, sticky="w")
+        ttk.Button(top, text="Gerar", command=lambda: generate()).grid(row=0, column=4, padx=(12, 0))
+        lbl_info = ttk.Label(top, text="", style="Field.TLabel"); lbl_info.grid(row=0, column=5, padx=(18, 0))
+
+        container = ttk.Frame(win); container.pack(fill="both", expand=True, padx=12, pady=8)
+        cfg = {
+            "grupo": (200, "w", "Grupo"),
+            "qtd": (80, "e", "Qtd"),
+            "venda": (140, "e", "Venda"),
+            "pago": (140, "e", "Pago"),
+            "lucro": (140, "e", "Lucro"),
+            "receber": (140, "e", "A receber"),
+        }
+        table = ttk.Treeview(container, columns=tuple(cfg), show="headings")
+        vsb = ttk.Scrollbar(container, orient="vertical", command=table.yview)
+        table.configure(yscrollcommand=vsb.set)
+        table.grid(row=0, column=0, sticky="nsew"); vsb.grid(row=0, column=1, sticky="ns")
+        container.grid_rowconfigure(0, weight=1); container.grid_columnconfigure(0, weight=1)
+        for c, (w, anc, t) in cfg.items():
+            table.heading(c, text=t)
+            table.column(c, width=w, anchor=anc, stretch=False)
+        table.tag_configure("total", font=(self.base_font, self.base_size, "bold"))
+
+        result: "queue.Queue[tuple]" = queue.Queue()
+
+        def run(by: str, year: Optional[int]) -> None:
+            try:
+                result.put((self.backend.grouped_report(by, year), None))
+            except Exception as exc:
+                result.put((None, exc))
+
+        def poll() -> None:
+            try:
+                rows, exc = result.get_nowait()
+            except queue.Empty:
+                win.after(100, poll)
+                return
+            if exc is not None:
+                lbl_info["text"] = ""
+                messagebox.showerror("Relatórios", str(exc), parent=win)
+                return
+            for iid in table.get_children(""):
+                table.delete(iid)
+            for r in rows + [reports.totals(rows)]:
+                table.insert("", END, values=(r[0], r[1], *(format_cents_br(v) for v in r[2:])),
+                             tags=("total",) if r[0] == "Total" else ())
+            lbl_info["text"] = f"{len(rows)} grupo(s)"
+
+        def generate() -> None:
+            ano = var_ano.get()
+            lbl_info["text"] = "Calculando…"
+            threading.Thread(target=run, args=(por_label[var_por.get()], int(ano) if ano != "Todos" else None),
+                             name="reports", daemon=True).start()
+            win.after(100, poll)
+
+        generate()
+
+    # ---------- Alertas de Voo e Aniversários ----------
+    def check_alerts(self) -> None:
+        """Um único aviso com voos de amanhã e aniversariantes de hoje."""
+        partes = []
+        voos = self.backend.flights_departing_on(date.today() + timedelta(days=1))
+        if voos:
+            partes.append(f"{len(voos)} voo(s) com ida amanhã.")
+        hoje = date.today()
+        aniversarios = self.backend.birthdays_between(hoje, hoje)
+        if aniversarios:
+            partes.append(f"{len(aniversarios)} aniversariante(s) hoje.")
+        if partes:
+            self.show_toast("\n".join(partes))
+
     def check_upcoming_flights(self, show_if_empty: bool = False) -> None:
         tomorrow = date.today() + timedelta(days=1)
-        rows = flights_departing_on(tomorrow)
+        rows = self.backend.flights_departing_on(tomorrow)
         if rows:
-            linhas = [self._build_flight_line(*r) for r in rows]
+            if self.remote:
+                status = {}
+            else:
+                with self.backend.bound():
+                    status = self.doc_health.check(r[6] for r in rows)
+            linhas = [self._build_flight_line(*r, doc_status=status.get(r[6])) for r in rows]
             if show_if_empty:
                 messagebox.showinfo("Voos de amanhã", f"Encontramos {len(rows)} voo(s) com ida amanhã:\n\n" + "\n\n".join(linhas))
             else:
@@ -880,16 +1645,80 @@ class App:
         elif show_if_empty:
             messagebox.showinfo("Voos de amanhã", "Nenhum voo com ida amanhã.")
 
-    def _build_flight_line(self, cid: int, nome: str, ida_iso: str, volta_iso: Optional[str], doc_tipo: str, doc_valor: str, path: Optional[str]) -> str:
+    BIRTHDAY_DAYS = 7
+
+    def show_birthdays(self) -> None:
+        hoje = date.today()
+        fim = hoje + timedelta(days=self.BIRTHDAY_DAYS - 1)
+        rows = self.backend.birthdays_between(hoje, fim)
+        if not rows:
+            messagebox.showinfo("Aniversariantes", f"Nenhum aniversário nos próximos {self.BIRTHDAY_DAYS} dias.")
+            return
+        linhas = []
+        for cid, nome, nasc_iso, doc_tipo, doc_valor in rows:
+            dia, mes, ano = iso_to_br(nasc_iso).split("/")
+            ano_festa = hoje.year if (int(mes), int(dia)) >= (hoje.month, hoje.day) else fim.year
+            quando = "hoje" if (int(mes), int(dia)) == (hoje.month, hoje.day) else f"{dia}/{mes}"
+            linhas.append(f"{quando} — {nome} ({ano_festa - int(ano)} anos) | {doc_tipo}: {doc_valor} | ID {cid}")
+        messagebox.showinfo("Aniversariantes", f"Próximos {self.BIRTHDAY_DAYS} dias:\n\n" + "\n".join(linhas))
+
+    def _build_flight_line(self, cid: int, nome: str, ida_iso: str, volta_iso: Optional[str], doc_tipo: str, doc_valor: str, path: Optional[str],
+                           doc_status: Optional[str] = None) -> str:
         ida_br = iso_to_br(ida_iso)
         volta_br = iso_to_br(volta_iso) if volta_iso else "—"
-        tem_doc = "Sim" if path else "Não"
+        if not path:
+            tem_doc = "Não"
+        elif doc_status == docstore.STATUS_AUSENTE:
+            tem_doc = "Não (arquivo não encontrado)"
+        elif doc_status == docstore.STATUS_ALTERADO:
+            tem_doc = "Sim, mas o arquivo foi alterado"
+        else:
+            tem_doc = "Sim"
         return (f"ID {cid} — {nome}\n"
                 f"Ida: {ida_br} | Volta: {volta_br} | {doc_tipo}: {doc_valor}\n"
                 f"Documento salvo: {tem_doc}")
 
     def schedule_hourly_check(self) -> None:
-        self.root.after(60 * 60 * 1000, lambda: (self.check_upcoming_flights(show_if_empty=False), self.schedule_hourly_check()))
+        self.root.after(60 * 60 * 1000, lambda: (self.check_alerts(), self.schedule_hourly_check()))
+
+    # ---------- Manutenção em segundo plano ----------
+    IDLE_MAINTENANCE_MIN = 5
+
+    def _mark_activity(self, _event=None) -> None:
+        self._last_activity = datetime.now()
+
+    def schedule_idle_maintenance(self) -> None:
+        def tick() -> None:
+            idle = datetime.now() - self._last_activity
+            if idle >= timedelta(minutes=self.IDLE_MAINTENANCE_MIN):
+                self._run_maintenance(full=False, notify=False)
+            self.schedule_idle_maintenance()
+        self.root.after(self.IDLE_MAINTENANCE_MIN * 60 * 1000, tick)
+
+    def _run_maintenance(self, full: bool, notify: bool) -> None:
+        if self._maintenance_thread is not None and self._maintenance_thread.is_alive():
+            return
+        result: "queue.Queue[tuple]" = queue.Queue()
+        session = self.backend
+        with session.bound():
+            self._maintenance_thread = start_maintenance_thread(full=full, on_done=lambda log, exc: result.put((log, exc)))
+
+        def poll() -> None:
+            try:
+                log, exc = result.get_nowait()
+            except queue.Empty:
+                self.root.after(200, poll)
+                return
+            if exc is not None:
+                self.status["text"] = "Falha na manutenção do banco."
+                if notify:
+                    messagebox.showerror("Manutenção", str(exc))
+            elif notify:
+                with session.bound():
+                    stats = format_stats(db_stats())
+                messagebox.showinfo("Manutenção", "\n".join(log) + "\n\n" + stats)
+
+        self.root.after(200, poll)
 
     # ---------- Validação de entrada p/ datas ----------
     def _validate_date_len(self, proposed: str, widget_name: str) -> bool:
@@ -1010,7 +1839,8 @@ class App:
         self.root.update_idletasks()
         x = self.root.winfo_rootx() + self.root.winfo_width() - 320
         y = self.root.winfo_rooty() + self.root.winfo_height() - 80
-        toast.geometry(f"300x50+{x}+{y}")
+        extra = 20 * text.count("\n")  # uma linha a mais por aviso
+        toast.geometry(f"300x{50 + extra}+{x}+{y - extra}")
         ttk.Label(toast, text=text, style="Status.TLabel", padding=(10, 8)).pack(fill="both", expand=True)
         toast.after(duration_ms, toast.destroy)
 
@@ -1024,12 +1854,26 @@ class App:
         entry.bind("<FocusOut>", on_focus_out)
 
 
-def main() -> None:
-    init_db()
+def main(argv: Optional[list] = None) -> None:
+    import argparse
+    parser = argparse.ArgumentParser(description="CRM da agência de viagens.")
+    parser.add_argument("--servidor", default=os.environ.get("TRAVELCRM_SERVER"),
+                        help="URL do server.py (modo cliente); sem ela usa o arquivo local")
+    args = parser.parse_args(argv)
+
+    backend = None
+    if args.servidor:
+        backend = RemoteDB(args.servidor)
+        backend.ping()
     root = tk.Tk()
-    App(root)
-    root.mainloop()
+    app = App(root, backend=backend)
+    try:
+        root.mainloop()
+    finally:
+        app.sessions.close_all()
 
 
 if __name__ == "__main__":
+    import multiprocessing
+    multiprocessing.freeze_support()  # pools de processos no executável do PyInstaller
     main()
@@ -0,0 +1,194 @@
+# backup.py
+from __future__ import annotations
+
+import argparse
+import gzip
+import os
+import shutil
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Callable, List, Optional
+
+import db
+
+# Passo pequeno + pausa entre passos: o banco fica livre para outros
+# escritores durante a cópia, mesmo em arquivos de vários GB.
+DEFAULT_PAGES = 256
+DEFAULT_SLEEP = 0.005
+DEFAULT_KEEP = 10
+
+ProgressFn = Callable[[int, int], None]
+
+
+def companion_path(backup_path: str) -> str:
+    """Onde fica a cópia do arquivo de viagens antigas de um backup: o nome
+    que db.archive_path() daria ao backup aberto como banco."""
+    gz = backup_path.endswith(".gz")
+    base, ext = os.path.splitext(backup_path[:-3] if gz else backup_path)
+    return f"{base}_arquivo{ext or '.db'}" + (".gz" if gz else "")
+
+
+def _copy(src: sqlite3.Connection, schema: str, dest_path: str, *, pages: int, sleep: float,
+          compress: bool, progress: Optional[ProgressFn]) -> None:
+    raw_path = dest_path[:-3] if compress else dest_path
+    tmp_path = raw_path + ".part"
+
+    def _progress(_status: int, remaining: int, total: int) -> None:
+        if progress is not None:
+            progress(total - remaining, total)
+
+    try:
+        dst = sqlite3.connect(tmp_path)
+        try:
+            src.backup(dst, name=schema, pages=pages, progress=_progress, sleep=sleep)
+        finally:
+            dst.close()
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    if compress:
+        with open(tmp_path, "rb") as f_in, gzip.open(dest_path + ".part", "wb") as f_out:
+            shutil.copyfileobj(f_in, f_out, 1024 * 1024)
+        os.remove(tmp_path)
+        tmp_path = dest_path + ".part"
+    os.replace(tmp_path, dest_path)
+
+
+def backup_to(
+    dest_path: str,
+    *,
+    pages: int = DEFAULT_PAGES,
+    sleep: float = DEFAULT_SLEEP,
+    compress: bool = False,
+    progress: Optional[ProgressFn] = None,
+) -> str:
+    """Copia o banco atual (online, seguro com WAL) para dest_path.
+    Com compress=True grava dest_path como .gz. Retorna o caminho final.
+    Havendo arquivo de viagens antigas, ele vai junto em companion_path():
+    as duas cópias saem da mesma transação de leitura (mesmo instante).
+    """
+    if compress and not dest_path.endswith(".gz"):
+        dest_path += ".gz"
+    src = db.get_conn()
+    try:
+        has_archive = os.path.exists(db.archive_path())
+        if has_archive:
+            src.execute(f"ATTACH DATABASE ? AS {db.ARCHIVE_ALIAS}", (db.archive_path(),))
+        # abre a leitura nos dois arquivos antes de copiar: um archive_before
+        # no meio não deixa viagens faltando (ou repetidas) entre as cópias
+        src.execute("BEGIN")
+        src.execute("SELECT COUNT(*) FROM main.sqlite_master").fetchone()
+        if has_archive:
+            src.execute(f"SELECT COUNT(*) FROM {db.ARCHIVE_ALIAS}.sqlite_master").fetchone()
+        opts = dict(pages=pages, sleep=sleep, compress=compress, progress=progress)
+        _copy(src, "main", dest_path, **opts)
+        companion = companion_path(dest_path)
+        if has_archive:
+            _copy(src, db.ARCHIVE_ALIAS, companion, **opts)
+        elif os.path.exists(companion):
+            os.remove(companion)
+        src.rollback()
+    finally:
+        src.close()
+    return dest_path
+
+
+# -------- Rotação ---------
+
+def _backup_prefix() -> str:
+    base = os.path.splitext(os.path.basename(db.current_path()))[0] or "agencia_viagens"
+    return f"{base}-"
+
+
+def list_backups(directory: str) -> List[str]:
+    """Backups gerados por rotating_backup, do mais antigo ao mais novo
+    (só os do banco principal; o do arquivo acompanha cada um)."""
+    if not os.path.isdir(directory):
+        return []
+    prefix = _backup_prefix()
+    names = [
+        n for n in os.listdir(directory)
+        if n.startswith(prefix) and (n.endswith(".db") or n.endswith(".db.gz"))
+        and not n.endswith(("_arquivo.db", "_arquivo.db.gz"))
+    ]
+    return [os.path.join(directory, n) for n in sorted(names)]
+
+
+def rotating_backup(
+    directory: str,
+    *,
+    keep: int = DEFAULT_KEEP,
+    compress: bool = False,
+    pages: int = DEFAULT_PAGES,
+    sleep: float = DEFAULT_SLEEP,
+    progress: Optional[ProgressFn] = None,
+) -> str:
+    """Gera um backup com data/hora no nome e mantém só os `keep` mais recentes."""
+    os.makedirs(directory, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    dest = os.path.join(directory, f"{_backup_prefix()}{stamp}.db")
+    final = backup_to(dest, pages=pages, sleep=sleep, compress=compress, progress=progress)
+    if keep > 0:
+        for old in list_backups(directory)[:-keep]:
+            for path in (old, companion_path(old)):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+    return final
+
+
+def start_backup_thread(
+    directory: str,
+    *,
+    keep: int = DEFAULT_KEEP,
+    compress: bool = False,
+    progress: Optional[ProgressFn] = None,
+    on_done: Optional[Callable[[Optional[str], Optional[BaseException]], None]] = None,
+) -> threading.Thread:
+    """Executa rotating_backup em uma thread daemon.
+    on_done(caminho, erro) é chamado na própria thread ao terminar.
+    """
+    source = db.current_path()
+
+    def run() -> None:
+        try:
+            with db.bound_to(source):
+                path = rotating_backup(directory, keep=keep, compress=compress, progress=progress)
+        except BaseException as exc:
+            if on_done is not None:
+                on_done(None, exc)
+            return
+        if on_done is not None:
+            on_done(path, None)
+
+    t = threading.Thread(target=run, name="backup", daemon=True)
+    t.start()
+    return t
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Backup online do banco da agência.")
+    parser.add_argument("destino", help="pasta dos backups rotativos")
+    parser.add_argument("--db", default=db.DB_PATH, help="arquivo do banco (padrão: %(default)s)")
+    parser.add_argument("--keep", type=int, default=DEFAULT_KEEP, help="quantos backups manter (0 = todos)")
+    parser.add_argument("--gzip", action="store_true", help="comprimir a saída com gzip")
+    parser.add_argument("--pages", type=int, default=DEFAULT_PAGES, help="páginas copiadas por passo")
+    parser.add_argument("--sleep", type=float, default=DEFAULT_SLEEP, help="pausa entre passos (s)")
+    args = parser.parse_args(argv)
+
+    db.DB_PATH = args.db
+
+    def show(done: int, total: int) -> None:
+        print(f"\r{done}/{total} páginas", end="", flush=True)
+
+    path = rotating_backup(args.destino, keep=args.keep, compress=args.gzip,
+                           pages=args.pages, sleep=args.sleep, progress=show)
+    print(f"\nBackup salvo em {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,692 @@
+# bench.py
+"""Benchmarks de desempenho sobre bancos gerados.
+
+Uso:
+    python bench.py gerar dados.db --linhas 1000000
+    python bench.py perfis dados.db
+    python bench.py servidor dados.db --agentes 20
+    python bench.py group-commit dados.db
+    python bench.py formatacao dados.db
+    python bench.py moeda --casos 200000
+    python bench.py memoria dados.db
+    python bench.py datas dados.db
+    python bench.py colunar dados.db
+    python bench.py painel dados.db
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+from datetime import date, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+import db
+import maintenance
+import utils
+from utils import _calc_digito, fold_nome, format_cents_br
+
+NOMES = ["Ana", "Álvaro", "Bruno", "Cecília", "Davi", "Élida", "Fábio", "Giovana", "Heitor", "Íris",
+         "João", "Júlia", "Lúcia", "Márcio", "Natália", "Otávio", "Paula", "Rafael", "Sônia", "Zé"]
+SOBRENOMES = ["Silva", "Souza", "Oliveira", "Araújo", "Conceição", "Gonçalves", "Lima", "Peçanha",
+              "Ribeiro", "Santos", "Simões", "Valadão"]
+
+# ordem das tuplas de gerar_linhas
+CAMPOS = ("nome_completo", "data_nascimento", "data_compra_voo", "doc_tipo", "doc_valor",
+          "valor_venda_cents", "valor_lucro_cents", "valor_pago_cents",
+          "data_ida", "data_volta", "doc_voo_path")
+
+
+# ========= Dataset =========
+
+def _cpf(rnd: random.Random) -> str:
+    base = "".join(str(rnd.randint(0, 9)) for _ in range(9))
+    d1 = _calc_digito(base)
+    return base + d1 + _calc_digito(base + d1)
+
+
+def gerar_linhas(n: int, seed: int = 42, first_year: int = 2015, last_year: int = 2025):
+    """Gera n tuplas na ordem das colunas de insert_cliente."""
+    rnd = random.Random(seed)
+    inicio = date(first_year, 1, 1).toordinal()
+    fim = date(last_year, 12, 31).toordinal()
+    for _ in range(n):
+        compra = date.fromordinal(rnd.randint(inicio, fim))
+        ida = compra + timedelta(days=rnd.randint(1, 240))
+        volta = ida + timedelta(days=rnd.randint(2, 30)) if rnd.random() < 0.8 else None
+        nasc = date(rnd.randint(1940, 2010), rnd.randint(1, 12), rnd.randint(1, 28))
+        if rnd.random() < 0.85:
+            doc_tipo, doc_valor = "CPF", _cpf(rnd)
+        else:
+            doc_tipo, doc_valor = "Passaporte", f"{chr(65 + rnd.randint(0, 25))}{chr(65 + rnd.randint(0, 25))}{rnd.randint(100000, 999999)}"
+        venda = rnd.randint(30_000, 2_500_000)
+        pago = venda + rnd.randint(-20_000, 150_000) if rnd.random() < 0.7 else rnd.randint(0, venda)
+        yield (
+            f"{rnd.choice(NOMES)} {rnd.choice(SOBRENOMES)} {rnd.choice(SOBRENOMES)}",
+            nasc.isoformat(), compra.isoformat(), doc_tipo, doc_valor,
+            venda, pago - venda, pago,
+            ida.isoformat(), volta.isoformat() if volta else None,
+            f"C:/voos/{doc_valor}.pdf" if rnd.random() < 0.3 else None,
+        )
+
+
+def gerar_dataset(path: str, n: int, seed: int = 42) -> str:
+    """Cria (ou completa) um banco em `path` com n linhas sintéticas."""
+    old = db.DB_PATH
+    db.DB_PATH = path
+    try:
+        db.init_db()
+        with db.get_conn() as conn:
+            conn.executemany(
+                """
+                INSERT INTO clientes (
+                    nome_completo, data_nascimento, data_compra_voo, doc_tipo, doc_valor,
+                    valor_venda_cents, valor_lucro_cents, valor_pago_cents,
+                    data_ida, data_volta, doc_voo_path, nome_sort
+                ) VALUES (?,?,?,?,?,?,?,?,?,?,?,?)
+                """,
+                ((*row, fold_nome(row[0])) for row in gerar_linhas(n, seed)),
+            )
+    finally:
+        db.DB_PATH = old
+    return path
+
+
+# ========= Medição =========
+
+def cronometrar(fn: Callable[[], object], repeticoes: int = 3) -> float:
+    """Melhor tempo (s) entre `repeticoes` execuções."""
+    best = float("inf")
+    for _ in range(repeticoes):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def imprimir_tabela(titulo: str, colunas: List[str], linhas: List[Tuple]) -> None:
+    print(f"\n{titulo}")
+    larg = [max(len(str(c)), *(len(f"{r[i]:.4f}" if isinstance(r[i], float) else str(r[i])) for r in linhas))
+            for i, c in enumerate(colunas)]
+    print("  ".join(str(c).ljust(w) for c, w in zip(colunas, larg)))
+    for r in linhas:
+        cells = [f"{v:.4f}" if isinstance(v, float) else str(v) for v in r]
+        print("  ".join(c.ljust(w) for c, w in zip(cells, larg)))
+
+
+# ========= Perfis de armazenamento =========
+
+def bench_perfis(dataset: str, perfis: Optional[List[str]] = None, insercoes: int = 500) -> None:
+    perfis = perfis or list(db.PROFILES)
+    years = None
+    linhas: List[Tuple] = []
+    old_path, old_prof = db.DB_PATH, db.DB_PROFILE
+    with tempfile.TemporaryDirectory() as tmp:
+        for nome in perfis:
+            copia = os.path.join(tmp, f"{nome}.db")
+            shutil.copyfile(dataset, copia)
+            db.DB_PATH, db.DB_PROFILE = copia, nome
+            try:
+                # init_db + reescrita com o page_size do perfil (passo offline)
+                t_mig = cronometrar(lambda: (db.init_db(), maintenance.change_page_size()), 1)
+                years = years or db.available_years()
+                res: Dict[str, float] = {
+                    "list_clientes": cronometrar(lambda: db.list_clientes()),
+                    "busca": cronometrar(lambda: db.list_clientes("Silva")),
+                    "mes_ano": cronometrar(lambda: [db.list_by_month_year(y, 6) for y in years]),
+                    "sum_lucro": cronometrar(lambda: [db.sum_lucro(y) for y in years]),
+                }
+                if db.get_profile(nome)["query_only"]:
+                    res["insert"] = float("nan")
+                else:
+                    amostra = list(gerar_linhas(insercoes, seed=7))
+                    def inserir() -> None:
+                        for row in amostra:
+                            db.insert_cliente(dict(zip(CAMPOS, row)))
+                    res["insert"] = cronometrar(inserir, 1)
+            finally:
+                db.DB_PATH, db.DB_PROFILE = old_path, old_prof
+            linhas.append((nome, t_mig, *res.values()))
+    imprimir_tabela(
+        f"Perfis sobre {os.path.basename(dataset)} (s, melhor de 3; insert = {insercoes} commits)",
+        ["perfil", "init_db", "list_clientes", "busca", "mes_ano", "sum_lucro", "insert"],
+        linhas,
+    )
+
+
+# ========= Servidor HTTP =========
+
+def bench_servidor(dataset: str, agentes: int = 20, segundos: float = 10.0, workers: int = 32) -> None:
+    """Carga com `agentes` clientes simultâneos contra server.py (mistura leitura/escrita)."""
+    import threading
+    import server
+    from client import RemoteDB
+
+    old_path = db.DB_PATH
+    with tempfile.TemporaryDirectory() as tmp:
+        copia = os.path.join(tmp, "servidor.db")
+        shutil.copyfile(dataset, copia)
+        db.DB_PATH = copia
+        httpd = server.make_server("127.0.0.1", 0, workers=workers)
+        threading.Thread(target=httpd.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{httpd.server_address[1]}"
+        anos = db.available_years()
+        lat: Dict[str, List[float]] = {}
+        erros = [0]
+        lock = threading.Lock()
+        fim = time.perf_counter() + segundos
+
+        def agente(n: int) -> None:
+            rnd = random.Random(n)
+            api = RemoteDB(url)
+            novos = gerar_linhas(10_000, seed=1000 + n)
+            meus: List[int] = []
+            while time.perf_counter() < fim:
+                r = rnd.random()
+                t0 = time.perf_counter()
+                try:
+                    if r < 0.55:
+                        op = "listar"
+                        api.list_clientes(rnd.choice(["", "Silva", "Ana", "Lima"]), limit=100, offset=rnd.randint(0, 5) * 100)
+                    elif r < 0.70:
+                        op = "lucro"
+                        api.sum_lucro(rnd.choice(anos), rnd.randint(1, 12))
+                    elif r < 0.80:
+                        op = "mes_ano"
+                        api.list_by_month_year(rnd.choice(anos), rnd.randint(1, 12))
+                    elif r < 0.95 or not meus:
+                        op = "inserir"
+                        meus.append(api.insert_cliente(dict(zip(CAMPOS, next(novos)))))
+                    else:
+                        op = "atualizar"
+                        api.update_cliente(rnd.choice(meus), dict(zip(CAMPOS, next(novos))))
+                except Exception:
+                    with lock:
+                        erros[0] += 1
+                    continue
+                with lock:
+                    lat.setdefault(op, []).append(time.perf_counter() - t0)
+
+        threads = [threading.Thread(target=agente, args=(i,)) for i in range(agentes)]
+        t0 = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        total_s = time.perf_counter() - t0
+        httpd.shutdown()
+        httpd.server_close()
+        db.disable_write_queue()
+        db.uninstall_pool()
+        db.DB_PATH = old_path
+
+    linhas = []
+    for op, xs in sorted(lat.items()):
+        xs.sort()
+        linhas.append((op, len(xs), len(xs) / total_s, xs[len(xs) // 2] * 1000, xs[int(len(xs) * 0.95)] * 1000))
+    total = sum(len(x) for x in lat.values())
+    linhas.append(("TOTAL", total, total / total_s, float("nan"), float("nan")))
+    imprimir_tabela(
+        f"{agentes} agentes × {segundos:.0f}s contra server.py ({workers} workers) — erros: {erros[0]}",
+        ["operação", "requisições", "req/s", "p50 ms", "p95 ms"],
+        linhas,
+    )
+
+
+# ========= Commit em grupo =========
+
+def bench_group_commit(dataset: str, escritores: int = 20, por_escritor: int = 100) -> None:
+    """Gravações/s e commits/s: um commit por linha vs fila de commit em grupo."""
+    import threading
+
+    linhas: List[Tuple] = []
+    old_path = db.DB_PATH
+    old_sync = os.environ.get("TRAVELCRM_DB_SYNCHRONOUS")
+    with tempfile.TemporaryDirectory() as tmp:
+        for sync in ("NORMAL", "FULL"):
+            os.environ["TRAVELCRM_DB_SYNCHRONOUS"] = sync
+            for modo in ("sequencial", "concorrente", "fila"):
+                copia = os.path.join(tmp, f"{sync}-{modo}.db")
+                shutil.copyfile(dataset, copia)
+                db.DB_PATH = copia
+                wq = db.enable_write_queue() if modo == "fila" else None
+                n_threads = 1 if modo == "sequencial" else escritores
+                lotes = [list(gerar_linhas(por_escritor, seed=100 + i)) for i in range(n_threads)]
+
+                def escrever(rows: List[Tuple]) -> None:
+                    for row in rows:
+                        db.insert_cliente(dict(zip(CAMPOS, row)))
+
+                threads = [threading.Thread(target=escrever, args=(rows,)) for rows in lotes]
+                t0 = time.perf_counter()
+                for t in threads:
+                    t.start()
+                for t in threads:
+                    t.join()
+                dt = time.perf_counter() - t0
+                total = n_threads * por_escritor
+                commits = wq.batches if wq is not None else total
+                db.disable_write_queue()
+                linhas.append((sync, modo, total, total / dt, commits, commits / dt))
+    db.DB_PATH = old_path
+    if old_sync is None:
+        os.environ.pop("TRAVELCRM_DB_SYNCHRONOUS", None)
+    else:
+        os.environ["TRAVELCRM_DB_SYNCHRONOUS"] = old_sync
+    imprimir_tabela(
+        f"insert_cliente: {escritores} escritores × {por_escritor} linhas",
+        ["synchronous", "modo", "linhas", "linhas/s", "commits", "commits/s"],
+        linhas,
+    )
+
+
+# ========= Formatação das linhas da tabela =========
+
+def bench_formatacao(dataset: str, limite: Optional[int] = None) -> None:
+    """Linhas/s: iso_to_br/format_cents_br célula a célula vs format_cliente_rows."""
+    old_path = db.DB_PATH
+    db.DB_PATH = dataset
+    try:
+        rows = db.list_clientes(limit=limite)
+    finally:
+        db.DB_PATH = old_path
+
+    def por_celula() -> List[Tuple]:
+        iso_to_br, fmt = utils.iso_to_br, utils.format_cents_br
+        return [
+            (cid, nome, iso_to_br(nasc), iso_to_br(comp), iso_to_br(ida), iso_to_br(volta) if volta else "",
+             f"{doc_tipo}: {doc_valor}", fmt(venda), fmt(pago), fmt(lucro))
+            for (cid, nome, nasc, comp, doc_tipo, doc_valor, venda, lucro, pago, ida, volta, _path) in rows
+        ]
+
+    def em_lote() -> List[Tuple]:
+        return utils.format_cliente_rows(rows)
+
+    if por_celula() != em_lote():
+        raise SystemExit("format_cliente_rows difere da formatação célula a célula")
+    utils.format_cents_br_cached.cache_clear()
+    frio = cronometrar(em_lote, repeticoes=1)
+    linhas = [
+        ("iso_to_br + format_cents_br", cronometrar(por_celula)),
+        ("format_cliente_rows (cache frio)", frio),
+        ("format_cliente_rows", cronometrar(em_lote)),
+    ]
+    imprimir_tabela(
+        f"formatação de {len(rows)} linhas (saídas idênticas)",
+        ["método", "s", "linhas/s"],
+        [(nome, t, len(rows) / t) for nome, t in linhas],
+    )
+
+
+# ========= Conversão de moeda =========
+
+def _texto_moeda(rnd: random.Random) -> str:
+    """Valor aleatório nos formatos que aparecem no formulário e em importações."""
+    cents = rnd.choice([rnd.randint(0, 999), rnd.randint(0, 10**7), rnd.randint(0, 10**12)])
+    reais, cent = divmod(cents, 100)
+    forma = rnd.randrange(10)
+    if forma == 0:
+        txt = format_cents_br(cents)
+    elif forma == 1:
+        txt = f"{reais}.{cent:02d}"
+    elif forma == 2:
+        txt = f"{reais},{cent % 10}"
+    elif forma == 3:
+        txt = str(reais)
+    elif forma == 4:
+        txt = f"{reais:,}.{cent:02d}"
+    elif forma == 5:
+        txt = f"{reais}.{rnd.randint(0, 999):03d}"
+    elif forma == 6:
+        txt = f"({format_cents_br(cents)})"
+    elif forma == 7:
+        txt = f"{reais:,}".replace(",", ".") + rnd.choice(["", "-", ",", ",5-"])
+    elif forma == 8:
+        txt = "".join(rnd.choice("0123456789.,R$- ()+\xa0x") for _ in range(rnd.randint(0, 12)))
+    else:
+        txt = f"{reais},{cent:02d}"
+    sinal = rnd.randrange(6)
+    if sinal == 0:
+        txt = "-" + txt
+    elif sinal == 1:
+        txt = txt.replace("R$ ", "R$ -")
+    return rnd.choice(["", " ", "\xa0"]) + txt + rnd.choice(["", " "])
+
+
+def _moeda_referencia(v: str) -> object:
+    """Resultado do caminho com Decimal (implementação original), ou a exceção."""
+    s = v.strip()
+    if s == "":
+        return 0
+    try:
+        return utils._parse_currency_slow(s)
+    except ValueError:
+        return ValueError
+
+
+def bench_moeda(casos: int = 200_000, seed: int = 7) -> None:
+    """Conversões/s do caminho Decimal, de parse_currency_to_cents e de
+    parse_currency_many (a equivalência entre eles fica em tests/test_utils.py).
+    """
+    rnd = random.Random(seed)
+    valores = [_texto_moeda(rnd) for _ in range(casos)]
+    _, erros = utils.parse_currency_many(valores)
+
+    comuns = [format_cents_br(rnd.randint(-10**7, 10**9)) for _ in range(casos // 2)]
+    comuns += [f"{rnd.randint(0, 10**6)}.{rnd.randint(0, 99):02d}" for _ in range(casos - len(comuns))]
+
+    def um_a_um(vals: List[str]) -> None:
+        for v in vals:
+            try:
+                utils.parse_currency_to_cents(v)
+            except ValueError:
+                pass
+
+    def so_decimal(vals: List[str]) -> None:
+        for v in vals:
+            _moeda_referencia(v)
+
+    linhas = []
+    for nome_vals, vals in (("formatos comuns", comuns), ("mistura aleatória", valores)):
+        linhas += [
+            (nome_vals, "caminho Decimal", casos / cronometrar(lambda: so_decimal(vals))),
+            (nome_vals, "parse_currency_to_cents", casos / cronometrar(lambda: um_a_um(vals))),
+            (nome_vals, "parse_currency_many", casos / cronometrar(lambda: utils.parse_currency_many(vals))),
+        ]
+    imprimir_tabela(
+        f"conversão de {casos} valores (mistura: {len(erros)} inválidos)",
+        ["entrada", "método", "valores/s"],
+        linhas,
+    )
+
+
+# ========= Memória por linha =========
+
+def bench_memoria(dataset: str) -> None:
+    """Bytes por linha em cache: tuplas de 12 colunas vs Cliente (__slots__),
+    com todas as colunas e com a projeção da visão Mês/Ano.
+    """
+    import gc
+    import sqlite3
+    import tracemalloc
+
+    def medir(ler: Callable[[sqlite3.Connection], List]) -> Tuple[int, float, float]:
+        with sqlite3.connect(dataset) as conn:
+            gc.collect()
+            tracemalloc.start()
+            t0 = time.perf_counter()
+            rows = ler(conn)
+            dt = time.perf_counter() - t0
+            usado, _pico = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        return len(rows), usado / max(len(rows), 1), dt
+
+    todas = "SELECT {campos} FROM clientes"
+    casos = [
+        ("tuplas (12 colunas)", lambda c: c.execute(todas.format(campos=", ".join(db.CLIENTE_CAMPOS))).fetchall()),
+        ("Cliente (12 colunas)", lambda c: db._select_clientes(c, todas)),
+        ("tuplas (projeção Mês/Ano)", lambda c: c.execute(todas.format(campos=", ".join(db.CAMPOS_MES_ANO))).fetchall()),
+        ("Cliente (projeção Mês/Ano)", lambda c: db._select_clientes(c, todas, campos=db.CAMPOS_MES_ANO)),
+    ]
+    linhas = []
+    for nome, ler in casos:
+        n, por_linha, dt = medir(ler)
+        linhas.append((nome, n, f"{por_linha:.0f}", dt))
+    imprimir_tabela("memória das linhas lidas (tracemalloc)", ["formato", "linhas", "bytes/linha", "s"], linhas)
+
+
+# ========= Datas: texto ISO vs número do dia =========
+
+def bench_datas(dataset: str) -> None:
+    """Tamanho dos índices e tempo de filtros por período: datas em texto
+    ISO (índices antigos, recriados numa cópia) vs colunas *_dia inteiras.
+    """
+    import sqlite3
+
+    old_path = db.DB_PATH
+    with tempfile.TemporaryDirectory() as tmp:
+        copia = os.path.join(tmp, "datas.db")
+        shutil.copyfile(dataset, copia)
+        db.DB_PATH = copia
+        try:
+            db.init_db()
+        finally:
+            db.DB_PATH = old_path
+        conn = sqlite3.connect(copia)
+        conn.execute("CREATE INDEX idx_texto_compra ON clientes (data_compra_voo)")
+        conn.execute("CREATE INDEX idx_texto_ida ON clientes (data_ida)")
+        conn.execute("ANALYZE")
+
+        try:
+            tamanhos = dict(conn.execute(
+                "SELECT name, SUM(pgsize) FROM dbstat WHERE name IN "
+                "('idx_texto_compra', 'idx_texto_ida', 'idx_clientes_compra_dia', 'idx_clientes_ida_dia') GROUP BY name"
+            ).fetchall())
+        except sqlite3.OperationalError:  # SQLite sem dbstat
+            tamanhos = {}
+        imprimir_tabela(
+            f"índices sobre {os.path.basename(dataset)}",
+            ["coluna", "texto ISO (KiB)", "número do dia (KiB)"],
+            [(col, tamanhos.get(t, 0) // 1024, tamanhos.get(i, 0) // 1024)
+             for col, t, i in (("compra", "idx_texto_compra", "idx_clientes_compra_dia"),
+                               ("ida", "idx_texto_ida", "idx_clientes_ida_dia"))],
+        )
+
+        ano = int(conn.execute("SELECT MAX(substr(data_compra_voo, 1, 4)) FROM clientes").fetchone()[0]) - 1
+        ida = conn.execute("SELECT data_ida FROM clientes LIMIT 1").fetchone()[0]
+        mes_lo, mes_hi = date(ano, 6, 1), date(ano, 6, 30)
+        soma = "SELECT COUNT(*), SUM(valor_lucro_cents) FROM clientes "
+        consultas = [
+            ("mês", "texto (strftime)", soma + "WHERE strftime('%Y', data_compra_voo)=? AND strftime('%m', data_compra_voo)=?",
+             (str(ano), "06")),
+            ("mês", "texto (BETWEEN)", soma + "INDEXED BY idx_texto_compra WHERE data_compra_voo BETWEEN ? AND ?",
+             (mes_lo.isoformat(), mes_hi.isoformat())),
+            ("mês", "número do dia", soma + "WHERE compra_dia BETWEEN ? AND ?",
+             (mes_lo.toordinal(), mes_hi.toordinal())),
+            ("ano", "texto (BETWEEN)", soma + "INDEXED BY idx_texto_compra WHERE data_compra_voo BETWEEN ? AND ?",
+             (f"{ano}-01-01", f"{ano}-12-31")),
+            ("ano", "número do dia", soma + "WHERE compra_dia BETWEEN ? AND ?",
+             (date(ano, 1, 1).toordinal(), date(ano, 12, 31).toordinal())),
+            ("dia da ida", "texto", "SELECT COUNT(*) FROM clientes INDEXED BY idx_texto_ida WHERE data_ida = ?", (ida,)),
+            ("dia da ida", "número do dia", "SELECT COUNT(*) FROM clientes WHERE ida_dia = ?",
+             (date.fromisoformat(ida).toordinal(),)),
+        ]
+        linhas = []
+        for filtro, forma, sql, args in consultas:
+            n = conn.execute(sql, args).fetchone()[0]
+            t = cronometrar(lambda: conn.execute(sql, args).fetchall(), repeticoes=5)
+            linhas.append((filtro, forma, n, t * 1000))
+        conn.close()
+    imprimir_tabela("filtros por período (ms, melhor de 5)", ["filtro", "datas como", "linhas", "ms"], linhas)
+
+
+# ========= Exportação: CSV vs colunar =========
+
+def bench_colunar(dataset: str) -> None:
+    """Tamanho, tempo de gravação e de leitura já tipada: CSV do app
+    (on_export_csv) vs Parquet/.npz de columnar.py.
+    """
+    import csv
+    import columnar
+
+    def gravar_csv(fpath: str) -> None:
+        with open(fpath, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f, delimiter=";")
+            writer.writerow(["ID", "Nome", "Nascimento", "Compra", "Ida", "Volta", "Documento", "Venda", "Pago", "Lucro"])
+            writer.writerows(utils.format_cliente_rows(db.list_clientes()))
+
+    def ler_csv(fpath: str) -> int:
+        # o que o analista precisa refazer: datas de volta ao tipo data, R$ de volta a centavos
+        with open(fpath, newline="", encoding="utf-8") as f:
+            reader = csv.reader(f, delimiter=";")
+            next(reader)
+            cols = list(zip(*reader))
+        datas = [[date.fromisoformat(utils.br_to_iso(v)) if v else None for v in c] for c in cols[2:6]]
+        valores = [utils.parse_currency_many(c)[0] for c in cols[7:10]]
+        return len(cols[0]) if datas and valores else 0
+
+    def ler_parquet(fpath: str) -> int:
+        return columnar.pq.read_table(fpath).num_rows
+
+    def ler_npz(fpath: str) -> int:
+        return len(columnar.load_npz(fpath)["id"])
+
+    old_path = db.DB_PATH
+    db.DB_PATH = dataset
+    linhas = []
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            casos = [("CSV (lista do app)", "clientes.csv", gravar_csv, ler_csv)]
+            for fmt in columnar.available_formats():
+                ler = ler_parquet if fmt == "parquet" else ler_npz
+                casos.append((fmt, f"clientes.{fmt}",
+                              lambda p, fmt=fmt: columnar.export_columnar(p, fmt=fmt), ler))
+            for nome, arquivo, gravar, ler in casos:
+                fpath = os.path.join(tmp, arquivo)
+                t0 = time.perf_counter()
+                gravar(fpath)
+                t_gravar = time.perf_counter() - t0
+                n = ler(fpath)
+                linhas.append((nome, n, os.path.getsize(fpath) // 1024, t_gravar,
+                               cronometrar(lambda: ler(fpath), repeticoes=3)))
+    finally:
+        db.DB_PATH = old_path
+    imprimir_tabela(f"exportação de {os.path.basename(dataset)}",
+                    ["formato", "linhas", "KiB", "gravar (s)", "ler tipado (s)"], linhas)
+
+
+# ========= Painel: consulta em cache e redesenho =========
+
+def bench_painel(dataset: str, larguras: Tuple[int, ...] = (320, 800, 1600)) -> None:
+    """grouped_report("mes") frio vs em cache na sessão, e tempo de redesenho
+    do painel por largura (num Canvas de verdade quando há display; sem
+    display, só a redução e as coordenadas das linhas).
+    """
+    import dashboard
+    from sessions import DatabaseSession
+
+    with tempfile.TemporaryDirectory() as tmp:
+        copia = os.path.join(tmp, "painel.db")
+        shutil.copyfile(dataset, copia)
+        session = DatabaseSession(copia)
+        try:
+            t0 = time.perf_counter()
+            rows = session.grouped_report("mes", None)
+            frio = time.perf_counter() - t0
+            quente = cronometrar(lambda: session.grouped_report("mes", None), repeticoes=5)
+        finally:
+            session.close()
+    imprimir_tabela("grouped_report(\"mes\") do painel", ["leitura", "ms"],
+                    [("sem cache", frio * 1000), ("em cache (sessão)", quente * 1000)])
+
+    labels, series = dashboard.monthly_series(rows)
+    # histórico longo sintético: mais pontos que pixels, a redução entra em ação
+    longo = {k: [v for _ in range(50) for v in vals] for k, vals in series.items()}
+    casos = [(f"{len(labels)} meses", labels, series),
+             (f"{len(labels) * 50} pontos", labels * 50, longo)]
+    try:
+        import tkinter as tk
+        root = tk.Tk()
+    except Exception:  # sem display
+        root = None
+    linhas = []
+    for nome, lbs, ser in casos:
+        for w in larguras:
+            h = w * 2 // 3
+            if root is not None:
+                canvas = tk.Canvas(root, width=w, height=h)
+                canvas.pack()
+
+                def desenhar() -> int:
+                    n = dashboard.draw_dashboard(canvas, lbs, ser, w, h)
+                    canvas.update_idletasks()
+                    return n
+            else:
+                def desenhar() -> int:
+                    pw = w - dashboard.MARGIN_LEFT - dashboard.MARGIN_RIGHT
+                    return sum(len(dashboard.polyline(v, 0, 0, pw, h / 3, min(v), max(v))) // 2
+                               for v in ser.values())
+            pontos = desenhar()
+            linhas.append((nome, w, pontos, cronometrar(desenhar, repeticoes=5) * 1000))
+            if root is not None:
+                canvas.destroy()
+    if root is not None:
+        root.destroy()
+    imprimir_tabela("redesenho do painel" + ("" if root is not None else " (sem display: só coordenadas)"),
+                    ["série", "largura", "pontos", "ms"], linhas)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmarks do CRM da agência.")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p = sub.add_parser("gerar", help="gera um banco sintético")
+    p.add_argument("destino")
+    p.add_argument("--linhas", type=int, default=100_000)
+    p.add_argument("--seed", type=int, default=42)
+
+    p = sub.add_parser("perfis", help="compara os perfis de armazenamento")
+    p.add_argument("dataset")
+    p.add_argument("--perfil", action="append", choices=list(db.PROFILES))
+
+    p = sub.add_parser("servidor", help="teste de carga do server.py")
+    p.add_argument("dataset")
+    p.add_argument("--agentes", type=int, default=20)
+    p.add_argument("--segundos", type=float, default=10.0)
+    p.add_argument("--workers", type=int, default=32)
+
+    p = sub.add_parser("group-commit", help="commit por linha vs commit em grupo")
+    p.add_argument("dataset")
+    p.add_argument("--escritores", type=int, default=20)
+    p.add_argument("--por-escritor", type=int, default=100)
+
+    p = sub.add_parser("formatacao", help="formatação das linhas da tabela")
+    p.add_argument("dataset")
+    p.add_argument("--limite", type=int)
+
+    p = sub.add_parser("moeda", help="velocidade da conversão de valores")
+    p.add_argument("--casos", type=int, default=200_000)
+    p.add_argument("--seed", type=int, default=7)
+
+    p = sub.add_parser("memoria", help="bytes por linha: tuplas vs Cliente")
+    p.add_argument("dataset")
+
+    p = sub.add_parser("datas", help="índices e filtros: texto ISO vs número do dia")
+    p.add_argument("dataset")
+
+    p = sub.add_parser("colunar", help="exportação: CSV vs Parquet/.npz")
+    p.add_argument("dataset")
+
+    p = sub.add_parser("painel", help="consulta do painel (cache) e tempo de redesenho")
+    p.add_argument("dataset")
+
+    args = parser.parse_args(argv)
+    if args.cmd == "gerar":
+        t0 = time.perf_counter()
+        gerar_dataset(args.destino, args.linhas, args.seed)
+        print(f"{args.linhas} linhas em {time.perf_counter() - t0:.1f}s → {args.destino}")
+    elif args.cmd == "perfis":
+        bench_perfis(args.dataset, args.perfil)
+    elif args.cmd == "servidor":
+        bench_servidor(args.dataset, args.agentes, args.segundos, args.workers)
+    elif args.cmd == "group-commit":
+        bench_group_commit(args.dataset, args.escritores, args.por_escritor)
+    elif args.cmd == "formatacao":
+        bench_formatacao(args.dataset, args.limite)
+    elif args.cmd == "moeda":
+        bench_moeda(args.casos, args.seed)
+    elif args.cmd == "memoria":
+        bench_memoria(args.dataset)
+    elif args.cmd == "datas":
+        bench_datas(args.dataset)
+    elif args.cmd == "colunar":
+        bench_colunar(args.dataset)
+    elif args.cmd == "painel":
+        bench_painel(args.dataset)
+
+
+if __name__ == "__main__":
+    main()
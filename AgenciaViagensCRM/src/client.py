@@ -0,0 +1,129 @@
+# client.py
+"""Cliente do server.py com a mesma interface das funções de db.py."""
+from __future__ import annotations
+
+import json
+import os
+import urllib.error
+import urllib.request
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlencode
+
+from db import Cliente
+
+
+class RemoteError(Exception):
+    def __init__(self, msg: str, status: Optional[int] = None) -> None:
+        super().__init__(msg)
+        self.status = status  # código HTTP; None = servidor indisponível
+
+
+class RemoteDB:
+    def __init__(self, base_url: str, token: Optional[str] = None, timeout: float = 15.0) -> None:
+        self.base_url = base_url.rstrip("/")
+        self.token = token if token is not None else os.environ.get("TRAVELCRM_TOKEN")
+        self.timeout = timeout
+
+    def _call(self, method: str, path: str, params: Optional[Dict[str, Any]] = None,
+              body: Optional[Dict[str, object]] = None) -> Dict[str, Any]:
+        url = self.base_url + path
+        if params:
+            clean = {k: v for k, v in params.items() if v is not None and v != ""}
+            if clean:
+                url += "?" + urlencode(clean)
+        data = json.dumps(body).encode("utf-8") if body is not None else None
+        req = urllib.request.Request(url, data=data, method=method)
+        if data is not None:
+            req.add_header("Content-Type", "application/json")
+        if self.token:
+            req.add_header("X-Token", self.token)
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+                return json.loads(resp.read().decode("utf-8"))
+        except urllib.error.HTTPError as exc:
+            try:
+                msg = json.loads(exc.read().decode("utf-8")).get("erro", str(exc))
+            except ValueError:
+                msg = str(exc)
+            if exc.code == 400:
+                raise ValueError(msg) from None
+            raise RemoteError(msg, exc.code) from None
+        except (urllib.error.URLError, OSError) as exc:
+            raise RemoteError(f"Servidor indisponível: {exc}") from None
+
+    @staticmethod
+    def _rows(payload: Dict[str, Any]) -> List[Tuple]:
+        return [tuple(r) for r in payload["rows"]]
+
+    @staticmethod
+    def _clientes(payload: Dict[str, Any]) -> List[Cliente]:
+        return [Cliente(*r) for r in payload["rows"]]
+
+    # ---------- mesma interface de db.py ----------
+    def ping(self) -> Dict[str, Any]:
+        return self._call("GET", "/saude")
+
+    def list_clientes(self, search: str = "", include_archive: bool = False,
+                      limit: Optional[int] = None, offset: int = 0) -> List[Cliente]:
+        params = {"busca": search, "limite": limit, "offset": offset or None,
+                  "arquivo": 1 if include_archive else None}
+        return self._clientes(self._call("GET", "/clientes", params))
+
+    def list_clientes_by_name(self, prefix: str = "", limit: int = 200,
+                              after: Optional[Tuple[str, int]] = None) -> List[Cliente]:
+        params: Dict[str, Any] = {"prefixo": prefix, "limite": limit}
+        if after is not None:
+            params.update(apos_nome=after[0], apos_id=after[1])
+        return self._clientes(self._call("GET", "/clientes-por-nome", params))
+
+    def count_clientes(self, search: str = "") -> int:
+        return int(self._call("GET", "/total-clientes", {"busca": search})["total"])
+
+    def get_cliente(self, cid: int) -> Optional[Cliente]:
+        try:
+            return Cliente(*self._call("GET", f"/clientes/{int(cid)}")["row"])
+        except RemoteError as exc:
+            if exc.status == 404:
+                return None
+            raise  # queda ou erro do servidor não é "cliente não encontrado"
+
+    def customer_history(self, cid: int) -> List[Cliente]:
+        return self._clientes(self._call("GET", f"/clientes/{int(cid)}/historico"))
+
+    def insert_cliente(self, data: Dict[str, object]) -> int:
+        return int(self._call("POST", "/clientes", body=data)["id"])
+
+    def update_cliente(self, cid: int, data: Dict[str, object]) -> None:
+        self._call("PUT", f"/clientes/{int(cid)}", body=data)
+
+    def delete_cliente(self, cid: int) -> None:
+        self._call("DELETE", f"/clientes/{int(cid)}")
+
+    def list_by_month_year(self, year: int, month: Optional[int]) -> List[Cliente]:
+        return self._clientes(self._call("GET", "/mes-ano", {"ano": year, "mes": month}))
+
+    def sum_lucro(self, year: Optional[int] = None, month: Optional[int] = None) -> int:
+        return int(self._call("GET", "/lucro", {"ano": year, "mes": month})["total"])
+
+    def available_years(self) -> List[int]:
+        return [int(y) for y in self._call("GET", "/anos")["anos"]]
+
+    def flights_departing_on(self, target: date) -> List[Tuple]:
+        return self._rows(self._call("GET", "/partidas", {"data": target.isoformat()}))
+
+    def list_receivables(self, limit: int = 200, after: Optional[Tuple[str, int]] = None) -> List[Cliente]:
+        params: Dict[str, Any] = {"limite": limit}
+        if after is not None:
+            params.update(apos_ida=after[0], apos_id=after[1])
+        return self._clientes(self._call("GET", "/recebiveis", params))
+
+    def receivables_total(self) -> Tuple[int, int]:
+        r = self._call("GET", "/total-recebiveis")
+        return int(r["quantidade"]), int(r["total"])
+
+    def birthdays_between(self, start: date, end: date) -> List[Tuple]:
+        return self._rows(self._call("GET", "/aniversarios", {"de": start.isoformat(), "ate": end.isoformat()}))
+
+    def grouped_report(self, by: str = "mes", year: Optional[int] = None) -> List[Tuple]:
+        return self._rows(self._call("GET", "/relatorio", {"por": by, "ano": year}))
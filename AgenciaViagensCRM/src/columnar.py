@@ -0,0 +1,191 @@
+# columnar.py
+"""Exportação colunar tipada para ferramentas de BI.
+
+Em vez do texto do CSV ("R$ 1.234,56", dd/mm/aaaa), cada coluna sai com o
+seu tipo: centavos em int64, datas como data, doc_tipo como categoria.
+Com pyarrow instalado grava Parquet (zstd); sem ele, um .npz (zip com um
+.npy por coluna e por grupo de linhas). Em ambos as linhas vêm do cursor em
+grupos de ROW_GROUP, sem carregar a tabela inteira na memória.
+
+    python columnar.py --db agencia_viagens.db clientes.parquet
+    python columnar.py --db agencia_viagens.db clientes.npz --busca silva
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import zipfile
+from datetime import date
+from typing import Dict, List, Optional, Sequence
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - pyarrow é opcional
+    pa = pc = pq = None
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - NumPy é opcional
+    np = None
+
+import db
+
+ROW_GROUP = 65536
+DOC_TIPOS = ("CPF", "Passaporte")
+
+# coluna de db.EXPORT_COLUMNS → nome no arquivo
+COLUMN_NAMES: Dict[str, str] = {
+    "id": "id",
+    "nome_completo": "nome",
+    "nascimento_dia": "nascimento",
+    "compra_dia": "compra",
+    "ida_dia": "ida",
+    "volta_dia": "volta",
+    "doc_tipo": "doc_tipo",
+    "doc_valor": "doc_valor",
+    "valor_venda_cents": "venda_cents",
+    "valor_pago_cents": "pago_cents",
+    "valor_lucro_cents": "lucro_cents",
+}
+DATE_COLUMNS = ("nascimento_dia", "compra_dia", "ida_dia", "volta_dia")
+TEXT_COLUMNS = ("nome_completo", "doc_valor")
+
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+_DOC_CODES = {t: i for i, t in enumerate(DOC_TIPOS)}
+
+
+def available_formats() -> List[str]:
+    return (["parquet"] if pq is not None else []) + (["npz"] if np is not None else [])
+
+
+def format_for(fpath: str) -> str:
+    """Formato pela extensão (.parquet/.npz); sem extensão conhecida, o melhor disponível."""
+    ext = os.path.splitext(fpath)[1].lower()
+    fmt = {".parquet": "parquet", ".npz": "npz"}.get(ext)
+    formats = available_formats()
+    if fmt is None:
+        if not formats:
+            raise RuntimeError("Exportação colunar requer pyarrow ou numpy.")
+        return formats[0]
+    if fmt not in formats:
+        raise RuntimeError(f"Formato {fmt} indisponível: instale {'pyarrow' if fmt == 'parquet' else 'numpy'}.")
+    return fmt
+
+
+# ---------- Parquet ----------
+def _arrow_schema():
+    fields = []
+    for col, name in COLUMN_NAMES.items():
+        if col in DATE_COLUMNS:
+            typ = pa.date32()
+        elif col in TEXT_COLUMNS:
+            typ = pa.string()
+        elif col == "doc_tipo":
+            typ = pa.dictionary(pa.int8(), pa.string())
+        else:
+            typ = pa.int64()
+        # datas malformadas no texto viram NULL nas colunas *_dia
+        fields.append(pa.field(name, typ, nullable=(col in DATE_COLUMNS)))
+    return pa.schema(fields)
+
+
+def _arrow_table(batch: List[Sequence], schema):
+    cols = list(zip(*batch))
+    categorias = pa.array(DOC_TIPOS)
+    arrays = []
+    for col, values in zip(db.EXPORT_COLUMNS, cols):
+        if col in DATE_COLUMNS:
+            days = pc.subtract(pa.array(values, pa.int32()), pa.scalar(_EPOCH_ORDINAL, pa.int32()))
+            arrays.append(days.cast(pa.date32()))
+        elif col in TEXT_COLUMNS:
+            arrays.append(pa.array(values, pa.string()))
+        elif col == "doc_tipo":
+            codes = pa.array([_DOC_CODES[v] for v in values], pa.int8())
+            arrays.append(pa.DictionaryArray.from_arrays(codes, categorias))
+        else:
+            arrays.append(pa.array(values, pa.int64()))
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+
+def _write_parquet(fpath: str, search: str, row_group: int) -> int:
+    schema = _arrow_schema()
+    n = 0
+    with pq.ParquetWriter(fpath, schema, compression="zstd") as writer:
+        for batch in db.iter_export_batches(search, row_group):
+            writer.write_table(_arrow_table(batch, schema), row_group_size=row_group)
+            n += len(batch)
+    return n
+
+
+# ---------- NumPy .npz ----------
+def _numpy_columns(batch: List[Sequence]) -> Dict[str, "np.ndarray"]:
+    cols = list(zip(*batch))
+    out: Dict[str, np.ndarray] = {}
+    for col, values in zip(db.EXPORT_COLUMNS, cols):
+        name = COLUMN_NAMES[col]
+        if col in DATE_COLUMNS:
+            days = np.fromiter((_EPOCH_ORDINAL if v is None else v for v in values), "i8", len(values))
+            arr = (days - _EPOCH_ORDINAL).astype("datetime64[D]")
+            # sem volta ou data malformada (coluna *_dia NULL) → NaT
+            arr[np.fromiter((v is None for v in values), bool, len(values))] = np.datetime64("NaT")
+            out[name] = arr
+        elif col in TEXT_COLUMNS:
+            out[name] = np.array(values, dtype=str)
+        elif col == "doc_tipo":
+            out[name] = np.fromiter((_DOC_CODES[v] for v in values), "i1", len(values))
+        else:
+            out[name] = np.fromiter(values, "i8", len(values))
+    return out
+
+
+def _write_npz(fpath: str, search: str, row_group: int) -> int:
+    n = 0
+    with zipfile.ZipFile(fpath, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        with zf.open("doc_tipo.categorias.npy", "w") as f:
+            np.lib.format.write_array(f, np.array(DOC_TIPOS), allow_pickle=False)
+        for g, batch in enumerate(db.iter_export_batches(search, row_group)):
+            for name, arr in _numpy_columns(batch).items():
+                with zf.open(f"{name}.g{g:05d}.npy", "w", force_zip64=True) as f:
+                    np.lib.format.write_array(f, arr, allow_pickle=False)
+            n += len(batch)
+    return n
+
+
+def load_npz(fpath: str) -> Dict[str, "np.ndarray"]:
+    """Lê um .npz de export_columnar juntando os grupos: {coluna: array}."""
+    groups: Dict[str, List[np.ndarray]] = {}
+    with np.load(fpath, allow_pickle=False) as data:
+        for key in sorted(data.files):
+            name, _, part = key.partition(".")
+            groups.setdefault(name if part.startswith("g") else key, []).append(data[key])
+    return {name: (parts[0] if len(parts) == 1 else np.concatenate(parts)) for name, parts in groups.items()}
+
+
+def export_columnar(fpath: str, search: str = "", fmt: Optional[str] = None, row_group: int = ROW_GROUP) -> int:
+    """Grava as vendas do filtro `search` (o mesmo da tabela) em `fpath`.
+    Retorna o número de linhas.
+    """
+    fmt = fmt or format_for(fpath)
+    if fmt == "parquet":
+        return _write_parquet(fpath, search, row_group)
+    return _write_npz(fpath, search, row_group)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Exportação colunar (Parquet ou .npz) para BI.")
+    parser.add_argument("--db", default=db.DB_PATH, help="arquivo do banco (padrão: %(default)s)")
+    parser.add_argument("saida", help="arquivo .parquet ou .npz")
+    parser.add_argument("--busca", default="", help="mesmo filtro da busca do app (nome ou documento)")
+    parser.add_argument("--grupo", type=int, default=ROW_GROUP, help="linhas por grupo")
+    args = parser.parse_args(argv)
+
+    db.DB_PATH = args.db
+    db.init_db()
+    n = export_columnar(args.saida, args.busca, row_group=args.grupo)
+    print(f"{n} linha(s) em {args.saida} ({os.path.getsize(args.saida) / 1e6:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
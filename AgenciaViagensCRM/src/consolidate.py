@@ -0,0 +1,137 @@
+# consolidate.py
+"""Fechamento consolidado de várias filiais (um .db por agência).
+
+Cada arquivo é lido em um processo próprio, com conexão só leitura:
+lucro total (sum_lucro) e quebra mensal de reports.grouped_report. Os
+resultados são juntados em um relatório único e, opcionalmente, em CSV.
+
+    python consolidate.py centro.db norte.db sul.db --ano 2024 --csv fechamento.csv
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import os
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+import db
+import reports
+from utils import format_cents_br
+
+READ_PROFILE = "readonly-analytics"
+
+
+class FileSummary(NamedTuple):
+    path: str
+    lucro: int                      # db.sum_lucro do arquivo
+    meses: List[reports.ReportRow]  # (mês, qtd, venda, pago, lucro, a receber)
+    erro: Optional[str] = None
+
+
+def summarize_file(path: str, year: Optional[int] = None, migrate: bool = False) -> FileSummary:
+    """Resumo de um arquivo por uma única conexão com o perfil só leitura
+    (query_only), usada por sum_lucro e grouped_report. migrate=True roda
+    init_db antes (única gravação feita no arquivo). Nada global muda: o
+    mesmo processo (ou worker do pool) pode resumir vários arquivos.
+    """
+    if not os.path.exists(path):
+        return FileSummary(path, 0, [], "arquivo não encontrado")
+    try:
+        if migrate:
+            with db.bound_to(path):
+                db.init_db()
+        conn = db.connect(path, READ_PROFILE)
+        try:
+            with db.bound_to(path, conn):
+                return FileSummary(path, db.sum_lucro(year), reports.grouped_report("mes", year))
+        finally:
+            conn.close()
+    except sqlite3.Error as exc:
+        # ex.: banco ainda não migrado para esta versão (abra no app ou use --migrar)
+        return FileSummary(path, 0, [], f"{exc} (banco de versão anterior? use --migrar)")
+
+
+def consolidate(paths: Sequence[str], year: Optional[int] = None,
+                workers: Optional[int] = None, migrate: bool = False) -> List[FileSummary]:
+    """Resumos na ordem de `paths`, calculados em paralelo."""
+    if not paths:
+        return []
+    workers = workers or min(len(paths), os.cpu_count() or 1)
+    if workers <= 1:
+        return [summarize_file(p, year, migrate) for p in paths]
+    n = len(paths)
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        return list(ex.map(summarize_file, paths, [year] * n, [migrate] * n))
+
+
+def merge_months(summaries: Sequence[FileSummary]) -> List[reports.ReportRow]:
+    """Soma, mês a mês, as quebras de todos os arquivos."""
+    acc: Dict[str, List[int]] = {}
+    for s in summaries:
+        for mes, n, venda, pago, lucro, _ in s.meses:
+            a = acc.setdefault(mes, [0, 0, 0, 0])
+            a[0] += n
+            a[1] += venda
+            a[2] += pago
+            a[3] += lucro
+    return [(mes, n, v, p, lu, v - p) for mes, (n, v, p, lu) in sorted(acc.items())]
+
+
+def _labels(summaries: Sequence[FileSummary]) -> Dict[str, str]:
+    """Nome curto de cada arquivo; o caminho inteiro quando o nome se repete."""
+    short = {s.path: os.path.splitext(os.path.basename(s.path))[0] for s in summaries}
+    seen: Dict[str, int] = {}
+    for name in short.values():
+        seen[name] = seen.get(name, 0) + 1
+    return {p: (name if seen[name] == 1 else os.path.splitext(p)[0]) for p, name in short.items()}
+
+
+def format_consolidated(summaries: Sequence[FileSummary]) -> str:
+    label = _labels(summaries)
+    per_file = [(label[s.path], sum(r[1] for r in s.meses), *reports.totals(s.meses)[2:])
+                for s in summaries if s.erro is None]
+    parts = ["Por arquivo", reports.format_report(per_file), "", "Consolidado por mês",
+             reports.format_report(merge_months(summaries))]
+    for s in summaries:
+        if s.erro is None and s.lucro != reports.totals(s.meses)[4]:
+            parts.append(f"AVISO: {label[s.path]}: sum_lucro difere da soma mensal")
+    for s in summaries:
+        if s.erro is not None:
+            parts.append(f"ERRO: {s.path}: {s.erro}")
+    return "\n".join(parts)
+
+
+def write_csv(fpath: str, summaries: Sequence[FileSummary]) -> None:
+    """Uma linha por (arquivo, mês) e as linhas 'Consolidado' no fim."""
+    label = _labels(summaries)
+    with open(fpath, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f, delimiter=";")
+        writer.writerow(["Arquivo", "Mês", "Qtd", "Venda", "Pago", "Lucro", "A receber"])
+        for s in summaries:
+            for mes, n, *valores in s.meses:
+                writer.writerow([label[s.path], mes, n, *(format_cents_br(v) for v in valores)])
+        for mes, n, *valores in merge_months(summaries):
+            writer.writerow(["Consolidado", mes, n, *(format_cents_br(v) for v in valores)])
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Relatório consolidado de vários bancos de filiais.")
+    parser.add_argument("bancos", nargs="+", help="arquivos .db das filiais")
+    parser.add_argument("--ano", type=int, help="só compras deste ano")
+    parser.add_argument("--csv", metavar="ARQUIVO", help="grava também o consolidado em CSV")
+    parser.add_argument("--migrar", action="store_true",
+                        help="atualiza o esquema de bancos de versões anteriores (grava nos arquivos)")
+    parser.add_argument("--processos", type=int, help="processos em paralelo (padrão: um por arquivo, até o nº de CPUs)")
+    args = parser.parse_args(argv)
+
+    summaries = consolidate(args.bancos, args.ano, args.processos, args.migrar)
+    print(format_consolidated(summaries))
+    if args.csv:
+        write_csv(args.csv, summaries)
+        print(f"\nCSV gravado em {args.csv}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+# dashboard.py
+"""Painel com lucro, venda e pago mês a mês, desenhado num tk.Canvas.
+
+Os dados vêm de um único reports.grouped_report("mes") (na sessão local,
+em cache até a próxima gravação). Cada série vira uma única linha
+(create_line com todos os pontos). Quando há mais meses do que pixels, cada
+coluna de pixels fica só com o primeiro, o menor, o maior e o último ponto
+do trecho: picos e vales continuam visíveis e o desenho não passa de
+4 pontos por pixel de largura, qualquer que seja o histórico.
+"""
+from __future__ import annotations
+
+import math
+from typing import Dict, List, Sequence, Tuple
+
+from reports import ReportRow
+from utils import format_cents_br
+
+# (chave, título, índice em ReportRow, cor)
+SERIES: Tuple[Tuple[str, str, int, str], ...] = (
+    ("lucro", "Lucro", 4, "#2e7d32"),
+    ("venda", "Venda", 2, "#1565c0"),
+    ("pago", "Pago", 3, "#ef6c00"),
+)
+
+MARGIN_LEFT = 130
+MARGIN_RIGHT = 16
+MARGIN_TOP = 24
+MARGIN_BOTTOM = 22
+GAP = 12
+MIN_TICK_SPACING = 48  # px entre rótulos de ano
+
+
+def monthly_series(rows: Sequence[ReportRow]) -> Tuple[List[str], Dict[str, List[int]]]:
+    """Rótulos AAAA-MM contínuos (meses sem venda entram com 0) e
+    {chave: centavos por mês} para cada série de SERIES.
+    """
+    by_month = {r[0]: r for r in rows}
+    labels: List[str] = []
+    if by_month:
+        first, last = min(by_month), max(by_month)
+        y, m = int(first[:4]), int(first[5:7])
+        y_end, m_end = int(last[:4]), int(last[5:7])
+        while (y, m) <= (y_end, m_end):
+            labels.append(f"{y:04d}-{m:02d}")
+            y, m = (y + 1, 1) if m == 12 else (y, m + 1)
+    empty = ("", 0, 0, 0, 0, 0)
+    series = {key: [by_month.get(lb, empty)[idx] for lb in labels] for key, _, idx, _ in SERIES}
+    return labels, series
+
+
+def downsample(values: Sequence[int], width: int) -> Tuple[List[int], List[int]]:
+    """(índices, valores) com no máximo 4 pontos por coluna de pixels:
+    primeiro, mínimo, máximo e último de cada trecho, na ordem original.
+    """
+    n = len(values)
+    if width <= 0 or n <= width:
+        return list(range(n)), list(values)
+    idx: List[int] = []
+    for col in range(width):
+        a, b = col * n // width, (col + 1) * n // width
+        if a >= b:
+            continue
+        chunk = values[a:b]
+        lo = a + chunk.index(min(chunk))
+        hi = a + chunk.index(max(chunk))
+        idx.extend(sorted({a, lo, hi, b - 1}))
+    return idx, [values[i] for i in idx]
+
+
+def polyline(values: Sequence[int], x0: float, y0: float, w: float, h: float,
+             lo: int, hi: int) -> List[float]:
+    """Coordenadas [x1, y1, x2, y2, ...] da série no retângulo, já reduzida
+    à largura em pixels. O eixo x é a posição do mês no histórico inteiro.
+    """
+    n = len(values)
+    idx, vals = downsample(values, int(w))
+    span = (hi - lo) or 1
+    sx = w / max(n - 1, 1)
+    coords: List[float] = []
+    for i, v in zip(idx, vals):
+        coords.append(x0 + i * sx)
+        coords.append(y0 + h - (v - lo) * h / span)
+    return coords
+
+
+def _year_ticks(labels: Sequence[str], w: float) -> List[Tuple[int, str]]:
+    """(posição, ano) dos janeiros, espaçados pelo menos MIN_TICK_SPACING px."""
+    firsts = [(i, lb[:4]) for i, lb in enumerate(labels) if lb.endswith("-01") or i == 0]
+    if len(labels) < 2 or not firsts:
+        return firsts
+    px_per_year = 12 * w / (len(labels) - 1)
+    step = max(1, math.ceil(MIN_TICK_SPACING / px_per_year))
+    return firsts[::step]
+
+
+def draw_dashboard(canvas, labels: Sequence[str], series: Dict[str, Sequence[int]],
+                   width: int, height: int, font: Tuple = ("TkDefaultFont", 9)) -> int:
+    """Redesenha o painel inteiro (um gráfico por série, empilhados).
+    Retorna o número de pontos desenhados.
+    """
+    canvas.delete("all")
+    if not labels:
+        canvas.create_text(width / 2, height / 2, text="Sem vendas para exibir.", font=font)
+        return 0
+    x0 = MARGIN_LEFT
+    w = max(width - MARGIN_LEFT - MARGIN_RIGHT, 10)
+    ph = max((height - MARGIN_BOTTOM - GAP * (len(SERIES) - 1)) / len(SERIES) - MARGIN_TOP, 10)
+    ticks = _year_ticks(labels, w)
+    sx = w / max(len(labels) - 1, 1)
+    pontos = 0
+    for k, (key, title, _, color) in enumerate(SERIES):
+        values = series[key]
+        y0 = k * (ph + MARGIN_TOP + GAP) + MARGIN_TOP
+        lo, hi = min(0, min(values)), max(0, max(values))
+        canvas.create_text(x0, y0 - 4, text=f"{title} por mês", anchor="sw", font=font, fill=color)
+        canvas.create_rectangle(x0, y0, x0 + w, y0 + ph, outline="#c8c8c8")
+        for pos, _ in ticks:
+            canvas.create_line(x0 + pos * sx, y0, x0 + pos * sx, y0 + ph, fill="#eeeeee")
+        if lo < 0 < hi:
+            yz = y0 + ph - (0 - lo) * ph / (hi - lo)
+            canvas.create_line(x0, yz, x0 + w, yz, fill="#9e9e9e", dash=(2, 2))
+        canvas.create_text(x0 - 6, y0, text=format_cents_br(hi), anchor="ne", font=font)
+        canvas.create_text(x0 - 6, y0 + ph, text=format_cents_br(lo), anchor="se", font=font)
+        coords = polyline(values, x0, y0, w, ph, lo, hi)
+        if len(coords) >= 4:
+            canvas.create_line(*coords, fill=color, width=2)
+        else:
+            canvas.create_oval(coords[0] - 2, coords[1] - 2, coords[0] + 2, coords[1] + 2, fill=color, outline=color)
+        pontos += len(coords) // 2
+    y_axis = len(SERIES) * (ph + MARGIN_TOP + GAP) - GAP + 4
+    for pos, ano in ticks:
+        canvas.create_text(x0 + pos * sx, y_axis, text=ano, anchor="n", font=font)
+    return pontos
@@ -1,27 +1,275 @@
 from __future__ import annotations
+import calendar
+import json
 import os
+import queue
+import re
 import sqlite3
-from typing import Dict, List, Optional, Tuple
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import date
+from operator import itemgetter
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from utils import fold_nome, normalize_doc
 
 DEFAULT_DB_PATH = os.environ.get("TRAVELCRM_DB", "agencia_viagens.db")
 DB_PATH = DEFAULT_DB_PATH
 
+# Banco das operações da thread/contexto atual. bound_to(path) troca só para
+# quem está dentro do `with` (sessões do app, workers); fora dele vale DB_PATH.
+# Threads novas começam sem vínculo: quem dispara uma thread passa o caminho.
+# Com `conn`, as leituras dentro do `with` usam essa conexão (ex.: uma só
+# conexão query_only por arquivo em consolidate.py).
+_bound_path: ContextVar[Optional[str]] = ContextVar("db_path", default=None)
+_bound_conn: ContextVar[Optional[sqlite3.Connection]] = ContextVar("db_conn", default=None)
+
+def current_path() -> str:
+    return _bound_path.get() or DB_PATH
+
+@contextmanager
+def bound_to(path: str, conn: Optional[sqlite3.Connection] = None) -> Iterator[str]:
+    token = _bound_path.set(path)
+    conn_token = _bound_conn.set(conn)
+    try:
+        yield path
+    finally:
+        _bound_conn.reset(conn_token)
+        _bound_path.reset(token)
+
+# ========= Perfis de armazenamento =========
+# cache_size negativo = KiB (padrão SQLite). page_size não muda sozinho: o
+# arquivo precisa ser reescrito com o banco fechado (maintenance.py --page-size).
+PROFILES: Dict[str, Dict[str, object]] = {
+    # notebooks dos agentes: pouca RAM, disco lento, durabilidade padrão WAL
+    "laptop": {
+        "synchronous": "NORMAL",
+        "cache_size": -16_000,
+        "mmap_size": 64 * 1024 * 1024,
+        "temp_store": "DEFAULT",
+        "page_size": 4096,
+        "query_only": False,
+    },
+    # servidor de relatórios: RAM sobrando, fsync a cada commit
+    "server": {
+        "synchronous": "FULL",
+        "cache_size": -256_000,
+        "mmap_size": 1024 * 1024 * 1024,
+        "temp_store": "MEMORY",
+        "page_size": 8192,
+        "query_only": False,
+    },
+    # cópia só leitura para análises: páginas grandes e scans em memória
+    "readonly-analytics": {
+        "synchronous": "OFF",
+        "cache_size": -512_000,
+        "mmap_size": 4 * 1024 * 1024 * 1024,
+        "temp_store": "MEMORY",
+        "page_size": 16384,
+        "query_only": True,
+    },
+}
+DEFAULT_PROFILE = os.environ.get("TRAVELCRM_DB_PROFILE", "laptop")
+DB_PROFILE = DEFAULT_PROFILE
+
+_SYNC_MODES = {"OFF", "NORMAL", "FULL", "EXTRA"}
+_TEMP_STORES = {"DEFAULT", "FILE", "MEMORY"}
+
+def get_profile(name: Optional[str] = None) -> Dict[str, object]:
+    """Perfil ativo, com ajustes individuais via TRAVELCRM_DB_<PRAGMA>
+    (ex.: TRAVELCRM_DB_CACHE_SIZE=-64000, TRAVELCRM_DB_SYNCHRONOUS=FULL).
+    """
+    name = name or DB_PROFILE
+    try:
+        prof = dict(PROFILES[name])
+    except KeyError:
+        raise ValueError(f"Perfil de banco desconhecido: {name!r} (use {', '.join(PROFILES)})") from None
+    for key in ("cache_size", "mmap_size", "page_size"):
+        env = os.environ.get(f"TRAVELCRM_DB_{key.upper()}")
+        if env:
+            prof[key] = int(env)
+    for key, allowed in (("synchronous", _SYNC_MODES), ("temp_store", _TEMP_STORES)):
+        env = os.environ.get(f"TRAVELCRM_DB_{key.upper()}")
+        if env:
+            if env.upper() not in allowed:
+                raise ValueError(f"TRAVELCRM_DB_{key.upper()} inválido: {env!r}")
+            prof[key] = env.upper()
+    return prof
+
 def get_conn() -> sqlite3.Connection:
-    conn = sqlite3.connect(DB_PATH)
+    return _configure(sqlite3.connect(current_path()))
+
+def connect(path: str, profile: Optional[str] = None) -> sqlite3.Connection:
+    """Conexão nova em `path` com os PRAGMAs de `profile` (padrão: DB_PROFILE)."""
+    return _configure(sqlite3.connect(path), profile)
+
+def _configure(conn: sqlite3.Connection, profile: Optional[str] = None) -> sqlite3.Connection:
+    prof = get_profile(profile)
     conn.execute("PRAGMA foreign_keys = ON;")
     try:
         conn.execute("PRAGMA journal_mode=WAL;")
-        conn.execute("PRAGMA synchronous=NORMAL;")
+        conn.execute(f"PRAGMA synchronous={prof['synchronous']};")
+        conn.execute(f"PRAGMA cache_size={int(prof['cache_size'])};")
+        conn.execute(f"PRAGMA mmap_size={int(prof['mmap_size'])};")
+        conn.execute(f"PRAGMA temp_store={prof['temp_store']};")
+        if prof["query_only"]:
+            conn.execute("PRAGMA query_only=ON;")
     except sqlite3.DatabaseError:
         pass
     return conn
 
+# ========= Pool de conexões =========
+# Por padrão cada operação abre a sua conexão (get_conn). Processos de longa
+# duração (server.py) instalam um pool: um único escritor serializado e N
+# leitores com query_only, reaproveitados entre threads.
+
+class ConnectionPool:
+    def __init__(self, path: str, readers: int = 4) -> None:
+        self.path = path
+        self._write_lock = threading.Lock()
+        self._writer = self._open()
+        self._readers: "queue.Queue[sqlite3.Connection]" = queue.Queue()
+        for _ in range(max(1, readers)):
+            conn = self._open()
+            conn.execute("PRAGMA query_only=ON;")
+            self._readers.put(conn)
+
+    def _open(self) -> sqlite3.Connection:
+        return _configure(sqlite3.connect(self.path, check_same_thread=False))
+
+    @contextmanager
+    def writer(self) -> Iterator[sqlite3.Connection]:
+        with self._write_lock:
+            with self._writer as conn:
+                yield conn
+
+    @contextmanager
+    def reader(self) -> Iterator[sqlite3.Connection]:
+        conn = self._readers.get()
+        try:
+            yield conn
+        finally:
+            self._readers.put(conn)
+
+    def close(self) -> None:
+        with self._write_lock:
+            self._writer.close()
+        while not self._readers.empty():
+            self._readers.get_nowait().close()
+
+# um pool por arquivo: server.py instala o do DB_PATH; o app mantém um por
+# sessão aberta (sessions.py) e as operações usam o de current_path()
+_pools: Dict[str, ConnectionPool] = {}
+
+def install_pool(readers: int = 4, path: Optional[str] = None) -> ConnectionPool:
+    """Passa a servir as operações de `path` (padrão: current_path()) a partir de um pool."""
+    path = path or current_path()
+    uninstall_pool(path)
+    pool = _pools[path] = ConnectionPool(path, readers=readers)
+    return pool
+
+def uninstall_pool(path: Optional[str] = None) -> None:
+    pool = _pools.pop(path or current_path(), None)
+    if pool is not None:
+        pool.close()
+
+@contextmanager
+def _writer() -> Iterator[sqlite3.Connection]:
+    pool = _pools.get(current_path())
+    if pool is not None:
+        with pool.writer() as conn:
+            yield conn
+    else:
+        with get_conn() as conn:
+            yield conn
+
+@contextmanager
+def _reader() -> Iterator[sqlite3.Connection]:
+    bound = _bound_conn.get()
+    if bound is not None:
+        yield bound
+        return
+    pool = _pools.get(current_path())
+    if pool is not None:
+        with pool.reader() as conn:
+            yield conn
+    else:
+        with get_conn() as conn:
+            yield conn
+
+# updated_at com milissegundos: base da detecção de conflitos na sincronização
+NOW_TS = "strftime('%Y-%m-%d %H:%M:%f','now')"
+
 def _column_exists(conn: sqlite3.Connection, table: str, col: str) -> bool:
     cur = conn.execute(f"PRAGMA table_info({table})")
     return any(r[1] == col for r in cur.fetchall())
 
+# ========= Datas como número do dia =========
+# As datas continuam gravadas em ISO (TEXT): é o que app, CDC, sync e
+# arquivo leem e escrevem. Cada uma ganha uma coluna gerada VIRTUAL com o
+# número do dia (date.toordinal()), que não ocupa espaço na tabela; os
+# índices e os filtros por período usam essas colunas (entrada de índice
+# de 3 bytes e comparação inteira em vez de texto de 10 bytes).
+# julianday('0001-01-01') = 1721425.5 = date(1, 1, 1).toordinal() + 1721424.5
+_ORDINAL_SQL = "CAST(julianday({col}) - 1721424.5 AS INTEGER)"
+
+DAY_COLUMNS: Dict[str, str] = {
+    "compra_dia": "data_compra_voo",
+    "ida_dia": "data_ida",
+    "volta_dia": "data_volta",
+    "nascimento_dia": "data_nascimento",
+}
+
+# mês*100 + dia do nascimento (101..1231): aniversariantes por faixa de índice
+GENERATED_COLUMNS: Dict[str, str] = {
+    **{col: _ORDINAL_SQL.format(col=src) for col, src in DAY_COLUMNS.items()},
+    "nascimento_md": "CAST(strftime('%m%d', data_nascimento) AS INTEGER)",
+}
+
+_REPORT_INDEX_COLS = "compra_dia, ida_dia, volta_dia, valor_venda_cents, valor_pago_cents, valor_lucro_cents"
+_REPORT_VALUE_COLS = "valor_venda_cents, valor_pago_cents, valor_lucro_cents"
+
+def _add_generated_columns(conn: sqlite3.Connection, schema: str = "main") -> None:
+    have = {r[1] for r in conn.execute(f"PRAGMA {schema}.table_xinfo(clientes)")}
+    for col, expr in GENERATED_COLUMNS.items():
+        if col not in have:
+            conn.execute(f"ALTER TABLE {schema}.clientes ADD COLUMN {col} INTEGER GENERATED ALWAYS AS ({expr}) VIRTUAL")
+
+def _period_days(year: int, month: Optional[int] = None) -> Tuple[int, int]:
+    """Primeiro e último dia (date.toordinal()) do ano ou do mês."""
+    if month:
+        first = date(year, month, 1)
+        nxt = date(year + (month == 12), month % 12 + 1, 1)
+    else:
+        first, nxt = date(year, 1, 1), date(year + 1, 1, 1)
+    return first.toordinal(), nxt.toordinal() - 1
+
 def init_db() -> None:
+    # o perfil só leitura não grava nada: o arquivo precisa ter passado por um
+    # init_db com outro perfil. Converter auto_vacuum (VACUUM completo) também
+    # não é feito aqui: ver maintenance.convert_auto_vacuum.
+    if get_profile()["query_only"]:
+        return
     with get_conn() as conn:
+        # uma linha por pessoa (documento normalizado); cada venda em clientes
+        # aponta para ela por pessoa_id
+        conn.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS pessoas (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                doc_tipo TEXT NOT NULL,
+                doc_norm TEXT NOT NULL,
+                nome_completo TEXT NOT NULL,
+                nome_sort TEXT,
+                data_nascimento TEXT,
+                updated_at TEXT DEFAULT ({NOW_TS})
+            );
+            """
+        )
+        conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_pessoas_doc ON pessoas (doc_tipo, doc_norm);")
         conn.execute(
             """
             CREATE TABLE IF NOT EXISTS clientes (
@@ -37,6 +285,8 @@ def init_db() -> None:
                 data_ida TEXT NOT NULL,
                 data_volta TEXT,
                 doc_voo_path TEXT,
+                nome_sort TEXT,
+                pessoa_id INTEGER REFERENCES pessoas(id),
                 created_at TEXT DEFAULT (DATE('now')),
                 updated_at TEXT DEFAULT (DATE('now'))
             );
@@ -47,145 +297,1159 @@ def init_db() -> None:
             ("data_ida", "ALTER TABLE clientes ADD COLUMN data_ida TEXT NOT NULL DEFAULT DATE('now');"),
             ("data_volta", "ALTER TABLE clientes ADD COLUMN data_volta TEXT;"),
             ("doc_voo_path", "ALTER TABLE clientes ADD COLUMN doc_voo_path TEXT;"),
+            ("nome_sort", "ALTER TABLE clientes ADD COLUMN nome_sort TEXT;"),
+            ("pessoa_id", "ALTER TABLE clientes ADD COLUMN pessoa_id INTEGER REFERENCES pessoas(id);"),
         ]:
             if not _column_exists(conn, "clientes", col):
                 conn.execute(ddl)
-        conn.execute("CREATE INDEX IF NOT EXISTS idx_clientes_data_compra ON clientes (data_compra_voo);")
-        conn.execute("CREATE INDEX IF NOT EXISTS idx_clientes_nome ON clientes (nome_completo);")
-        conn.execute("CREATE INDEX IF NOT EXISTS idx_clientes_data_ida ON clientes (data_ida);")
-
-def insert_cliente(data: Dict[str, object]) -> int:
-    with get_conn() as conn:
-        cur = conn.execute(
+        _add_generated_columns(conn)
+        conn.execute("DROP INDEX IF EXISTS idx_clientes_data_compra;")
+        conn.execute("DROP INDEX IF EXISTS idx_clientes_data_ida;")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_clientes_compra_dia ON clientes (compra_dia);")
+        conn.execute("DROP INDEX IF EXISTS idx_clientes_nome;")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_clientes_nome_sort ON clientes (nome_sort);")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_clientes_ida_dia ON clientes (ida_dia);")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_clientes_nascimento_md ON clientes (nascimento_md);")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_clientes_pessoa ON clientes (pessoa_id, ida_dia);")
+        # reports.py: o índice guarda os *_dia já calculados e os valores, e
+        # GROUP BY compra_dia percorre na ordem dele, sem ler a tabela
+        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_clientes_relatorio ON clientes ({_REPORT_INDEX_COLS});")
+        # antecedência/duração sem filtro de ano: índice na própria expressão,
+        # o GROUP BY sai na ordem dele em vez de ordenar todas as linhas
+        for key, name in _REPORT_KEY_INDEXES.items():
+            conn.execute(
+                f"CREATE INDEX IF NOT EXISTS idx_clientes_{name} "
+                f"ON clientes ({REPORT_KEYS[key]}, {_REPORT_VALUE_COLS});"
+            )
+        # formato novo (só colunas da viagem) para código que já lê por pessoa
+        conn.execute(
+            """
+            CREATE VIEW IF NOT EXISTS viagens AS
+            SELECT id, uid, pessoa_id, data_compra_voo, data_ida, data_volta,
+                   valor_venda_cents, valor_pago_cents, valor_lucro_cents, doc_voo_path,
+                   compra_dia, ida_dia, volta_dia, created_at, updated_at
+            FROM clientes;
             """
-            INSERT INTO clientes (
-                nome_completo, data_nascimento, data_compra_voo, doc_tipo, doc_valor,
-                valor_venda_cents, valor_lucro_cents, valor_pago_cents,
-                data_ida, data_volta, doc_voo_path, updated_at
-            ) VALUES (?,?,?,?,?,?,?,?,?,?,?, DATE('now'))
-            """,
-            (
-                data["nome_completo"],
-                data["data_nascimento"],
-                data["data_compra_voo"],
-                data["doc_tipo"],
-                data["doc_valor"],
-                data["valor_venda_cents"],
-                data["valor_lucro_cents"],
-                data.get("valor_pago_cents", 0),
-                data["data_ida"],
-                data.get("data_volta"),
-                data.get("doc_voo_path"),
-            ),
         )
-        return cur.lastrowid
-
-def update_cliente(cid: int, data: Dict[str, object]) -> None:
-    with get_conn() as conn:
+        # índice parcial: só as viagens com saldo em aberto entram nele; venda e
+        # pago no índice deixam o total sem ler a tabela
         conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_clientes_em_aberto "
+            f"ON clientes (ida_dia, valor_venda_cents, valor_pago_cents) WHERE {_OPEN_BALANCE};"
+        )
+        conn.execute("CREATE TABLE IF NOT EXISTS meta (chave TEXT PRIMARY KEY, valor TEXT);")
+        _install_change_log(conn)
+        _backfill_nome_sort(conn)
+        _backfill_pessoas(conn)
+        if os.path.exists(archive_path()):
+            conn.commit()  # ATTACH não roda dentro de transação
+            _attach_archive(conn)
+            _sync_archive_schema(conn)
+            _backfill_nome_sort(conn, ARCHIVE_ALIAS)
+            _backfill_pessoas(conn, ARCHIVE_ALIAS)
+            conn.commit()
+            conn.execute(f"DETACH DATABASE {ARCHIVE_ALIAS}")
+        conn.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS documentos (
+                hash TEXT PRIMARY KEY,
+                tamanho INTEGER NOT NULL,
+                mime TEXT,
+                nome_original TEXT,
+                criado_em TEXT DEFAULT ({NOW_TS})
+            );
             """
-            UPDATE clientes SET
-                nome_completo=?, data_nascimento=?, data_compra_voo=?,
-                doc_tipo=?, doc_valor=?, valor_venda_cents=?, valor_lucro_cents=?, valor_pago_cents=?,
-                data_ida=?, data_volta=?, doc_voo_path=?,
-                updated_at=DATE('now')
-            WHERE id=?
-            """,
-            (
-                data["nome_completo"],
-                data["data_nascimento"],
-                data["data_compra_voo"],
-                data["doc_tipo"],
-                data["doc_valor"],
-                data["valor_venda_cents"],
-                data["valor_lucro_cents"],
-                data.get("valor_pago_cents", 0),
-                data["data_ida"],
-                data.get("data_volta"),
-                data.get("doc_voo_path"),
-                cid,
-            ),
+        )
+        # quality.py: achados por venda e o updated_at de cada venda já verificada
+        conn.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS qualidade (
+                cliente_id INTEGER NOT NULL,
+                regra TEXT NOT NULL,
+                detalhe TEXT,
+                verificado_em TEXT DEFAULT ({NOW_TS}),
+                PRIMARY KEY (cliente_id, regra)
+            ) WITHOUT ROWID;
+            """
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_qualidade_regra ON qualidade (regra);")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS qualidade_verificados (cliente_id INTEGER PRIMARY KEY, updated_at TEXT);"
         )
 
+def insert_cliente(data: Dict[str, object]) -> int:
+    wq = _active_write_queue()
+    if wq is not None:
+        return wq.submit(_insert_cliente, data).result()
+    with _writer() as conn:
+        return _insert_cliente(conn, data)
+
+def update_cliente(cid: int, data: Dict[str, object]) -> None:
+    wq = _active_write_queue()
+    if wq is not None:
+        wq.submit(_update_cliente, cid, data).result()
+        return
+    with _writer() as conn:
+        _update_cliente(conn, cid, data)
+
 def delete_cliente(cid: int) -> None:
-    with get_conn() as conn:
-        conn.execute("DELETE FROM clientes WHERE id=?", (cid,))
+    wq = _active_write_queue()
+    if wq is not None:
+        wq.submit(_delete_cliente, cid).result()
+        return
+    with _writer() as conn:
+        _delete_cliente(conn, cid)
 
-def list_clientes(search: str = "") -> List[Tuple]:
-    with get_conn() as conn:
-        base_sql = """
-            SELECT id, nome_completo, data_nascimento, data_compra_voo,
-                   doc_tipo, doc_valor, valor_venda_cents, valor_lucro_cents, valor_pago_cents,
-                   data_ida, data_volta, doc_voo_path
-            FROM clientes
-        """
+def _backfill_nome_sort(conn: sqlite3.Connection, schema: str = "main") -> None:
+    """Preenche nome_sort de linhas antigas (ou gravadas por fora do db.py)."""
+    rows = conn.execute(f"SELECT id, nome_completo FROM {schema}.clientes WHERE nome_sort IS NULL").fetchall()
+    if not rows:
+        return
+    _pause_change_log(conn)  # chave derivada: não é alteração do cliente
+    conn.executemany(f"UPDATE {schema}.clientes SET nome_sort=? WHERE id=?", [(fold_nome(n), i) for i, n in rows])
+    _resume_change_log(conn)
+
+_PESSOA_CAMPOS = ("nome_completo", "data_nascimento", "doc_tipo", "doc_valor")
+
+def _upsert_pessoa(conn: sqlite3.Connection, nome: str, nascimento: Optional[str],
+                   doc_tipo: str, doc_valor: str) -> Optional[int]:
+    """id da pessoa dona do documento, criada se preciso. Nome e nascimento
+    ficam com os da gravação mais recente. None se o documento é vazio.
+    """
+    norm = normalize_doc(doc_tipo, doc_valor)
+    if not norm:
+        return None
+    conn.execute(
+        f"""
+        INSERT INTO main.pessoas (doc_tipo, doc_norm, nome_completo, nome_sort, data_nascimento, updated_at)
+        VALUES (?, ?, ?, ?, ?, {NOW_TS})
+        ON CONFLICT (doc_tipo, doc_norm) DO UPDATE SET
+            nome_completo=excluded.nome_completo, nome_sort=excluded.nome_sort,
+            data_nascimento=excluded.data_nascimento, updated_at=excluded.updated_at
+        """,
+        (doc_tipo, norm, nome, fold_nome(nome), nascimento),
+    )
+    return conn.execute("SELECT id FROM main.pessoas WHERE doc_tipo=? AND doc_norm=?", (doc_tipo, norm)).fetchone()[0]
+
+def _backfill_pessoas(conn: sqlite3.Connection, schema: str = "main") -> None:
+    """Liga a pessoas as vendas sem pessoa_id (bancos anteriores, arquivo)."""
+    rows = conn.execute(
+        f"SELECT id, nome_completo, data_nascimento, doc_tipo, doc_valor FROM {schema}.clientes "
+        "WHERE pessoa_id IS NULL ORDER BY id"
+    ).fetchall()
+    if not rows:
+        return
+    latest: Dict[Tuple[str, str], Tuple[str, str]] = {}  # a venda mais recente dá nome/nascimento
+    trips: List[Tuple[Tuple[str, str], int]] = []
+    for cid, nome, nasc, tipo, valor in rows:
+        key = (tipo, normalize_doc(tipo, valor))
+        if key[1]:
+            latest[key] = (nome, nasc)
+            trips.append((key, cid))
+    conn.executemany(
+        f"""
+        INSERT INTO main.pessoas (doc_tipo, doc_norm, nome_completo, nome_sort, data_nascimento)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT (doc_tipo, doc_norm) DO NOTHING
+        """,
+        [(t, n, nome, fold_nome(nome), nasc) for (t, n), (nome, nasc) in latest.items()],
+    )
+    ids = {(t, n): i for i, t, n in conn.execute("SELECT id, doc_tipo, doc_norm FROM main.pessoas")}
+    _pause_change_log(conn)  # vínculo local: pessoa_id não vai para as outras filiais
+    conn.executemany(f"UPDATE {schema}.clientes SET pessoa_id=? WHERE id=?", [(ids[k], cid) for k, cid in trips])
+    _resume_change_log(conn)
+
+def _insert_cliente(conn: sqlite3.Connection, data: Dict[str, object]) -> int:
+    pessoa_id = _upsert_pessoa(conn, data["nome_completo"], data["data_nascimento"], data["doc_tipo"], data["doc_valor"])
+    cur = conn.execute(
+        f"""
+        INSERT INTO clientes (
+            nome_completo, data_nascimento, data_compra_voo, doc_tipo, doc_valor,
+            valor_venda_cents, valor_lucro_cents, valor_pago_cents,
+            data_ida, data_volta, doc_voo_path, nome_sort, pessoa_id, updated_at
+        ) VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?, {NOW_TS})
+        """,
+        (
+            data["nome_completo"],
+            data["data_nascimento"],
+            data["data_compra_voo"],
+            data["doc_tipo"],
+            data["doc_valor"],
+            data["valor_venda_cents"],
+            data["valor_lucro_cents"],
+            data.get("valor_pago_cents", 0),
+            data["data_ida"],
+            data.get("data_volta"),
+            data.get("doc_voo_path"),
+            fold_nome(data["nome_completo"]),
+            pessoa_id,
+        ),
+    )
+    return cur.lastrowid
+
+def _update_cliente(conn: sqlite3.Connection, cid: int, data: Dict[str, object]) -> None:
+    pessoa_id = _upsert_pessoa(conn, data["nome_completo"], data["data_nascimento"], data["doc_tipo"], data["doc_valor"])
+    conn.execute(
+        f"""
+        UPDATE clientes SET
+            nome_completo=?, data_nascimento=?, data_compra_voo=?,
+            doc_tipo=?, doc_valor=?, valor_venda_cents=?, valor_lucro_cents=?, valor_pago_cents=?,
+            data_ida=?, data_volta=?, doc_voo_path=?, nome_sort=?, pessoa_id=?,
+            updated_at={NOW_TS}
+        WHERE id=?
+        """,
+        (
+            data["nome_completo"],
+            data["data_nascimento"],
+            data["data_compra_voo"],
+            data["doc_tipo"],
+            data["doc_valor"],
+            data["valor_venda_cents"],
+            data["valor_lucro_cents"],
+            data.get("valor_pago_cents", 0),
+            data["data_ida"],
+            data.get("data_volta"),
+            data.get("doc_voo_path"),
+            fold_nome(data["nome_completo"]),
+            pessoa_id,
+            cid,
+        ),
+    )
+
+def _delete_cliente(conn: sqlite3.Connection, cid: int) -> None:
+    conn.execute("DELETE FROM clientes WHERE id=?", (cid,))
+
+# ========= Registro de cliente =========
+# Linhas de leitura chegam como Cliente (__slots__: sem __dict__ por linha)
+# via row_factory do cursor. Consultas de listagem podem projetar só parte
+# das colunas; as não lidas ficam None. Iterar devolve os 12 campos na
+# ordem abaixo, então código que desempacota tuplas continua funcionando.
+
+CLIENTE_CAMPOS = (
+    "id", "nome_completo", "data_nascimento", "data_compra_voo",
+    "doc_tipo", "doc_valor", "valor_venda_cents", "valor_lucro_cents", "valor_pago_cents",
+    "data_ida", "data_volta", "doc_voo_path",
+)
+# o que a visão Mês/Ano mostra (sem nascimento nem anexo)
+CAMPOS_MES_ANO = tuple(c for c in CLIENTE_CAMPOS if c not in ("data_nascimento", "doc_voo_path"))
+
+
+class Cliente:
+    __slots__ = CLIENTE_CAMPOS
+
+    def __init__(self, id=None, nome_completo=None, data_nascimento=None, data_compra_voo=None,
+                 doc_tipo=None, doc_valor=None, valor_venda_cents=None, valor_lucro_cents=None,
+                 valor_pago_cents=None, data_ida=None, data_volta=None, doc_voo_path=None) -> None:
+        self.id = id
+        self.nome_completo = nome_completo
+        self.data_nascimento = data_nascimento
+        self.data_compra_voo = data_compra_voo
+        self.doc_tipo = doc_tipo
+        self.doc_valor = doc_valor
+        self.valor_venda_cents = valor_venda_cents
+        self.valor_lucro_cents = valor_lucro_cents
+        self.valor_pago_cents = valor_pago_cents
+        self.data_ida = data_ida
+        self.data_volta = data_volta
+        self.doc_voo_path = doc_voo_path
+
+    def __iter__(self) -> Iterator:
+        return (getattr(self, c) for c in CLIENTE_CAMPOS)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Cliente):
+            return NotImplemented
+        return tuple(self) == tuple(other)
+
+    def __repr__(self) -> str:
+        return f"Cliente(id={self.id!r}, nome_completo={self.nome_completo!r})"
+
+    def as_list(self) -> List[object]:
+        """Para JSON (server.py)."""
+        return list(self)
+
+    @staticmethod
+    def row_factory(campos: Tuple[str, ...] = CLIENTE_CAMPOS):
+        if campos == CLIENTE_CAMPOS:
+            return lambda _cur, row: Cliente(*row)
+        # posição de cada campo na linha projetada; ausentes apontam para o None do fim
+        pick = itemgetter(*(campos.index(c) if c in campos else len(campos) for c in CLIENTE_CAMPOS))
+        return lambda _cur, row: Cliente(*pick(row + (None,)))
+
+
+def _select_clientes(conn: sqlite3.Connection, sql: str, params: Tuple = (),
+                     campos: Tuple[str, ...] = CLIENTE_CAMPOS) -> List[Cliente]:
+    """Executa `SELECT <campos> ...` (sql recebe {campos}) e devolve Clientes."""
+    cur = conn.cursor()
+    cur.row_factory = Cliente.row_factory(campos)
+    return cur.execute(sql.format(campos=", ".join(campos)), params).fetchall()
+
+def list_clientes(
+    search: str = "",
+    include_archive: bool = False,
+    limit: Optional[int] = None,
+    offset: int = 0,
+) -> List[Cliente]:
+    with _reader() as conn:
+        src = _clientes_from(conn, None) if include_archive else "clientes"
+        base_sql = f"SELECT {{campos}} FROM {src}"
+        page = " LIMIT ? OFFSET ?" if limit is not None else ""
+        page_args: Tuple = (int(limit), int(offset)) if limit is not None else ()
         if search:
-            like = f"%{search}%"
-            cur = conn.execute(
-                base_sql + " WHERE nome_completo LIKE ? OR doc_valor LIKE ? ORDER BY data_compra_voo DESC, id DESC",
-                (like, like),
+            return _select_clientes(
+                conn,
+                base_sql + " WHERE nome_sort LIKE ? OR doc_valor LIKE ? ORDER BY compra_dia DESC, id DESC" + page,
+                (f"%{fold_nome(search)}%", f"%{search}%") + page_args,
             )
-        else:
-            cur = conn.execute(base_sql + " ORDER BY data_compra_voo DESC, id DESC")
-        return list(cur.fetchall())
+        return _select_clientes(conn, base_sql + " ORDER BY compra_dia DESC, id DESC" + page, page_args)
 
-def list_by_month_year(year: int, month: Optional[int]) -> List[Tuple]:
-    with get_conn() as conn:
-        if month:
+def _prefix_upper(prefix: str) -> str:
+    """Menor texto maior que todos os que começam com `prefix`."""
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+def list_clientes_by_name(
+    prefix: str = "",
+    limit: int = 200,
+    after: Optional[Tuple[str, int]] = None,
+) -> List[Cliente]:
+    """Clientes em ordem alfabética sem acento/caixa ("João" = "joao"),
+    opcionalmente só os que começam com `prefix`. Paginação por chave:
+    after = (nome_completo, id) da última linha da página anterior.
+    """
+    where: List[str] = []
+    args: List[object] = []
+    key = fold_nome(prefix)
+    if key:
+        where.append("nome_sort >= ? AND nome_sort < ?")
+        args += [key, _prefix_upper(key)]
+    if after is not None:
+        where.append("(nome_sort, id) > (?, ?)")
+        args += [fold_nome(after[0]), int(after[1])]
+    sql = "SELECT {campos} FROM clientes"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    with _reader() as conn:
+        return _select_clientes(conn, sql + " ORDER BY nome_sort, id LIMIT ?", (*args, int(limit)))
+
+def count_clientes(search: str = "") -> int:
+    with _reader() as conn:
+        if search:
             cur = conn.execute(
-                """
-                SELECT id, nome_completo, data_nascimento, data_compra_voo,
-                       doc_tipo, doc_valor, valor_venda_cents, valor_lucro_cents, valor_pago_cents,
-                       data_ida, data_volta, doc_voo_path
-                FROM clientes
-                WHERE strftime('%Y', data_compra_voo)=? AND strftime('%m', data_compra_voo)=?
-                ORDER BY data_compra_voo DESC, id DESC
-                """,
-                (f"{year:04d}", f"{month:02d}"),
+                "SELECT COUNT(*) FROM clientes WHERE nome_sort LIKE ? OR doc_valor LIKE ?",
+                (f"%{fold_nome(search)}%", f"%{search}%"),
             )
         else:
-            cur = conn.execute(
-                """
-                SELECT id, nome_completo, data_nascimento, data_compra_voo,
-                       doc_tipo, doc_valor, valor_venda_cents, valor_lucro_cents, valor_pago_cents,
-                       data_ida, data_volta, doc_voo_path
-                FROM clientes
-                WHERE strftime('%Y', data_compra_voo)=?
-                ORDER BY data_compra_voo DESC, id DESC
-                """,
-                (f"{year:04d}",),
-            )
-        return list(cur.fetchall())
+            cur = conn.execute("SELECT COUNT(*) FROM clientes")
+        return int(cur.fetchone()[0])
+
+def get_cliente(cid: int) -> Optional[Cliente]:
+    with _reader() as conn:
+        rows = _select_clientes(conn, "SELECT {campos} FROM clientes WHERE id=?", (cid,))
+        return rows[0] if rows else None
+
+def customer_history(cid: int) -> List[Cliente]:
+    """Viagens da mesma pessoa da venda `cid`, arquivadas inclusive, da ida
+    mais recente para a mais antiga (índice pessoa_id, ida_dia).
+    """
+    with _reader() as conn:
+        src = _clientes_from(conn, None)
+        row = conn.execute(f"SELECT pessoa_id FROM {src} WHERE id=?", (cid,)).fetchone()
+        if row is None:
+            return []
+        if row[0] is None:
+            return _select_clientes(conn, f"SELECT {{campos}} FROM {src} WHERE id=?", (cid,))
+        return _select_clientes(
+            conn, f"SELECT {{campos}} FROM {src} WHERE pessoa_id=? ORDER BY ida_dia DESC, id DESC", (row[0],)
+        )
+
+def list_by_month_year(year: int, month: Optional[int]) -> List[Cliente]:
+    """Compras do ano/mês; só as colunas de CAMPOS_MES_ANO são lidas."""
+    with _report_conn() as conn:
+        src = _clientes_from(conn, year)
+        return _select_clientes(
+            conn,
+            f"""
+            SELECT {{campos}}
+            FROM {src}
+            WHERE compra_dia BETWEEN ? AND ?
+            ORDER BY compra_dia DESC, id DESC
+            """,
+            _period_days(year, month),
+            CAMPOS_MES_ANO,
+        )
 
 def sum_lucro(year: Optional[int] = None, month: Optional[int] = None) -> int:
-    with get_conn() as conn:
-        if year and month:
-            cur = conn.execute(
-                "SELECT COALESCE(SUM(valor_lucro_cents),0) FROM clientes WHERE strftime('%Y', data_compra_voo)=? AND strftime('%m', data_compra_voo)=?",
-                (f"{year:04d}", f"{month:02d}"),
-            )
-        elif year:
+    with _report_conn() as conn:
+        src = _clientes_from(conn, year)
+        if year:
             cur = conn.execute(
-                "SELECT COALESCE(SUM(valor_lucro_cents),0) FROM clientes WHERE strftime('%Y', data_compra_voo)=?",
-                (f"{year:04d}",),
+                f"SELECT COALESCE(SUM(valor_lucro_cents),0) FROM {src} WHERE compra_dia BETWEEN ? AND ?",
+                _period_days(year, month),
             )
         else:
-            cur = conn.execute("SELECT COALESCE(SUM(valor_lucro_cents),0) FROM clientes")
+            cur = conn.execute(f"SELECT COALESCE(SUM(valor_lucro_cents),0) FROM {src}")
         return int(cur.fetchone()[0])
 
 def available_years() -> List[int]:
     import datetime as _dt
-    with get_conn() as conn:
-        cur = conn.execute("SELECT DISTINCT strftime('%Y', data_compra_voo) AS y FROM clientes ORDER BY y ASC")
+    with _report_conn() as conn:
+        src = _clientes_from(conn, None)
+        # só o índice de compra_dia é lido (número do dia → julianday)
+        cur = conn.execute(f"SELECT DISTINCT strftime('%Y', compra_dia + 1721424.5) AS y FROM {src} ORDER BY y ASC")
         rows = [int(r[0]) for r in cur.fetchall() if r[0] is not None]
         if not rows:
             rows = [_dt.datetime.now().year]
         return rows
 
-def flights_departing_on(target: "date") -> List[Tuple]:
-    with get_conn() as conn:
+# chave de agrupamento dos relatórios → expressão em dias (reports.py junta
+# os dias em meses, anos, dias da semana e faixas)
+REPORT_KEYS: Dict[str, str] = {
+    "compra": "compra_dia",
+    "antecedencia": "ida_dia - compra_dia",
+    "duracao": "volta_dia - ida_dia",
+}
+
+# chaves com índice de expressão próprio (sufixo do nome do índice)
+_REPORT_KEY_INDEXES: Dict[str, str] = {"antecedencia": "antecedencia", "duracao": "duracao"}
+
+def report_totals(key: str, year: Optional[int] = None) -> List[Tuple[int, int, int, int, int]]:
+    """(dias, qtd, venda, pago, lucro) agregados no SQLite pela expressão de
+    REPORT_KEYS[key], sobre o índice de relatório ou, para antecedência e
+    duração sem ano, o índice da expressão (uma linha por dia
+    distinto, não por viagem). Ficam de fora as viagens sem a chave (sem
+    volta na duração, data malformada); com o arquivo no período vem uma
+    linha por dia e tabela, o chamador soma.
+    """
+    expr = REPORT_KEYS[key]
+    params: Tuple = ()
+    cond = ""
+    if year:
+        cond = " WHERE compra_dia BETWEEN ? AND ?"
+        params = _period_days(year)
+    with _report_conn() as conn:
+        # com ano, a faixa de compra_dia no índice de relatório lê menos
+        suffix = "relatorio" if year or key not in _REPORT_KEY_INDEXES else _REPORT_KEY_INDEXES[key]
+        tables = [("main", f"idx_clientes_{suffix}")]
+        through = archived_through_year(conn)
+        if through is not None and (year is None or year <= through) and _attach_archive(conn):
+            tables.append((ARCHIVE_ALIAS, f"idx_arquivo_{suffix}"))
+        out: List[Tuple[int, int, int, int, int]] = []
+        for schema, index in tables:
+            has_index = conn.execute(
+                f"SELECT 1 FROM {schema}.sqlite_master WHERE type='index' AND name=?", (index,)
+            ).fetchone()
+            # o planejador não vê o índice como cobrindo colunas geradas
+            hint = f" INDEXED BY {index}" if has_index else ""
+            out.extend(conn.execute(
+                f"SELECT {expr} AS k, COUNT(*), SUM(valor_venda_cents), SUM(valor_pago_cents), "
+                f"SUM(valor_lucro_cents) FROM {schema}.clientes{hint}{cond} GROUP BY k HAVING k IS NOT NULL",
+                params,
+            ))
+        return out
+
+EXPORT_COLUMNS = (
+    "id", "nome_completo", "nascimento_dia", "compra_dia", "ida_dia", "volta_dia",
+    "doc_tipo", "doc_valor", "valor_venda_cents", "valor_pago_cents", "valor_lucro_cents",
+)
+
+def iter_export_batches(search: str = "", size: int = 65536) -> Iterator[List[Tuple]]:
+    """Lotes de até `size` linhas com EXPORT_COLUMNS (datas como
+    date.toordinal(), volta None quando não há), no filtro de list_clientes.
+    """
+    sql = f"SELECT {', '.join(EXPORT_COLUMNS)} FROM clientes"
+    params: Tuple = ()
+    if search:
+        sql += " WHERE nome_sort LIKE ? OR doc_valor LIKE ?"
+        params = (f"%{fold_nome(search)}%", f"%{search}%")
+    with _reader() as conn:
+        cur = conn.execute(sql + " ORDER BY compra_dia DESC, id DESC", params)
+        while True:
+            batch = cur.fetchmany(size)
+            if not batch:
+                break
+            yield batch
+
+def flights_departing_on(target: date) -> List[Tuple]:
+    with _reader() as conn:
         cur = conn.execute(
-            "SELECT id, nome_completo, data_ida, data_volta, doc_tipo, doc_valor, doc_voo_path FROM clientes WHERE data_ida = ? ORDER BY id DESC",
-            (target.strftime("%Y-%m-%d"),),
+            "SELECT id, nome_completo, data_ida, data_volta, doc_tipo, doc_valor, doc_voo_path FROM clientes WHERE ida_dia = ? ORDER BY id DESC",
+            (target.toordinal(),),
         )
         return list(cur.fetchall())
+
+# precisa aparecer igual no WHERE para o SQLite usar idx_clientes_em_aberto
+_OPEN_BALANCE = "valor_pago_cents < valor_venda_cents"
+
+def list_receivables(limit: int = 200, after: Optional[Tuple[str, int]] = None) -> List[Cliente]:
+    """Viagens com saldo em aberto (pago < venda) por data de ida. Paginação
+    por chave: after = (data_ida, id) da última linha da página anterior.
+    Só a tabela principal (viagens arquivadas já terminaram).
+    """
+    with _reader() as conn:
+        if after is None:
+            return _select_clientes(
+                conn,
+                f"SELECT {{campos}} FROM clientes WHERE {_OPEN_BALANCE} ORDER BY ida_dia, id LIMIT ?",
+                (int(limit),),
+            )
+        ida_iso, last_id = after
+        return _select_clientes(
+            conn,
+            f"SELECT {{campos}} FROM clientes WHERE {_OPEN_BALANCE} AND (ida_dia, id) > (?, ?) "
+            "ORDER BY ida_dia, id LIMIT ?",
+            (date.fromisoformat(ida_iso).toordinal(), int(last_id), int(limit)),
+        )
+
+def receivables_total() -> Tuple[int, int]:
+    """(viagens com saldo em aberto, soma de venda - pago em centavos)."""
+    with _reader() as conn:
+        n, total = conn.execute(
+            f"SELECT COUNT(*), COALESCE(SUM(valor_venda_cents - valor_pago_cents), 0) "
+            f"FROM clientes WHERE {_OPEN_BALANCE}"
+        ).fetchone()
+    return int(n), int(total)
+
+def _md_ranges(start: date, end: date) -> List[Tuple[int, int]]:
+    """Faixas de nascimento_md que cobrem os dias de start a end (inclusive)."""
+    if (end - start).days >= 365:
+        return [(101, 1231)]
+    lo, hi = start.month * 100 + start.day, end.month * 100 + end.day
+    ranges = [(lo, hi)] if start.year == end.year else [(lo, 1231), (101, hi)]
+    # nascidos em 29/02 comemoram em 28/02 nos anos não bissextos
+    for y in range(start.year, end.year + 1):
+        if not calendar.isleap(y) and start <= date(y, 2, 28) <= end:
+            ranges.append((229, 229))
+    return ranges
+
+def birthdays_between(start: date, end: date) -> List[Tuple[int, str, str, str, str]]:
+    """Clientes que fazem aniversário de start a end (inclusive, pode virar o
+    ano): (id, nome, data_nascimento, doc_tipo, doc_valor), uma linha por
+    pessoa (pessoa_id: o documento normalizado, então '123.456.789-09' e
+    '12345678909' são a mesma), com os dados da viagem mais recente, na
+    ordem das datas.
+    """
+    if end < start:
+        return []
+    ranges = _md_ranges(start, end)
+    where = " OR ".join("nascimento_md BETWEEN ? AND ?" for _ in ranges)
+    args = tuple(v for r in ranges for v in r)
+    with _reader() as conn:
+        src = _clientes_from(conn, None)
+        rows = conn.execute(
+            f"""
+            SELECT MAX(id), nome_completo, data_nascimento, doc_tipo, doc_valor
+            FROM {src} WHERE {where}
+            GROUP BY COALESCE(pessoa_id, -id)
+            """,
+            args,
+        ).fetchall()
+
+    def next_birthday(nasc: str) -> date:
+        month, day = int(nasc[5:7]), int(nasc[8:10])
+        for y in range(start.year, end.year + 1):
+            if month == 2 and day == 29 and not calendar.isleap(y):
+                d = date(y, 2, 28)
+            else:
+                d = date(y, month, day)
+            if d >= start:
+                return d
+        return end
+
+    rows.sort(key=lambda r: (next_birthday(r[2]), r[1]))
+    return rows
+
+def register_documento(hash_hex: str, tamanho: int, mime: Optional[str], nome_original: Optional[str]) -> None:
+    with _writer() as conn:
+        conn.execute(
+            "INSERT OR IGNORE INTO documentos (hash, tamanho, mime, nome_original) VALUES (?,?,?,?)",
+            (hash_hex, int(tamanho), mime, nome_original),
+        )
+
+def get_documento(hash_hex: str) -> Optional[Tuple]:
+    with _reader() as conn:
+        return conn.execute(
+            "SELECT hash, tamanho, mime, nome_original, criado_em FROM documentos WHERE hash=?", (hash_hex,)
+        ).fetchone()
+
+def list_documentos() -> List[Tuple]:
+    with _reader() as conn:
+        return list(conn.execute("SELECT hash, tamanho, mime, nome_original, criado_em FROM documentos ORDER BY hash"))
+
+def list_doc_paths() -> List[Tuple[int, str]]:
+    """(id, doc_voo_path) de todas as linhas com documento."""
+    with _reader() as conn:
+        return list(conn.execute("SELECT id, doc_voo_path FROM clientes WHERE doc_voo_path IS NOT NULL AND doc_voo_path <> ''"))
+
+def set_doc_path(cid: int, path: Optional[str]) -> None:
+    with _writer() as conn:
+        conn.execute(f"UPDATE clientes SET doc_voo_path=?, updated_at={NOW_TS} WHERE id=?", (path, cid))
+
+# ========= Arquivo de viagens antigas =========
+# Viagens encerradas antes de um corte saem de `clientes` e vão para um
+# segundo arquivo (<banco>_arquivo.db). As consultas por período fazem ATTACH
+# dele só quando o ano pedido (ou "todo o período") alcança anos arquivados.
+
+ARCHIVE_ALIAS = "arq"
+_ARCHIVE_COLS = (
+    "id, nome_completo, data_nascimento, data_compra_voo, doc_tipo, doc_valor, "
+    "valor_venda_cents, valor_lucro_cents, valor_pago_cents, data_ida, data_volta, doc_voo_path, nome_sort, pessoa_id, "
+    + ", ".join(GENERATED_COLUMNS)
+)
+
+def archive_path() -> str:
+    base, ext = os.path.splitext(current_path())
+    return f"{base}_arquivo{ext or '.db'}"
+
+def get_meta(conn: sqlite3.Connection, chave: str) -> Optional[str]:
+    row = conn.execute("SELECT valor FROM main.meta WHERE chave=?", (chave,)).fetchone()
+    return row[0] if row else None
+
+def set_meta(conn: sqlite3.Connection, chave: str, valor: Optional[str]) -> None:
+    conn.execute("INSERT OR REPLACE INTO main.meta (chave, valor) VALUES (?, ?)", (chave, valor))
+
+def archived_through_year(conn: sqlite3.Connection) -> Optional[int]:
+    """Ano de compra mais recente presente no arquivo (None = nada arquivado)."""
+    v = get_meta(conn, "arquivo_compra_max")
+    return int(v[:4]) if v else None
+
+def _attach_archive(conn: sqlite3.Connection, create: bool = False) -> bool:
+    if any(r[1] == ARCHIVE_ALIAS for r in conn.execute("PRAGMA database_list")):
+        return True
+    path = archive_path()
+    if not create and not os.path.exists(path):
+        return False
+    conn.execute(f"ATTACH DATABASE ? AS {ARCHIVE_ALIAS}", (path,))
+    return True
+
+def _clientes_from(conn: sqlite3.Connection, year: Optional[int]) -> str:
+    """Fonte para FROM: só `clientes`, ou a união com o arquivo quando o
+    período (year; None = todo o período) alcança anos arquivados.
+    """
+    through = archived_through_year(conn)
+    if through is None or (year is not None and year > through):
+        return "clientes"
+    if not _attach_archive(conn):
+        return "clientes"
+    return (
+        f"(SELECT {_ARCHIVE_COLS} FROM main.clientes "
+        f"UNION ALL SELECT {_ARCHIVE_COLS} FROM {ARCHIVE_ALIAS}.clientes) AS clientes"
+    )
+
+def _sync_archive_schema(conn: sqlite3.Connection) -> None:
+    sql = conn.execute("SELECT sql FROM main.sqlite_master WHERE type='table' AND name='clientes'").fetchone()[0]
+    ddl = re.sub(r"^CREATE TABLE\s+(IF NOT EXISTS\s+)?\"?clientes\"?",
+                 f"CREATE TABLE IF NOT EXISTS {ARCHIVE_ALIAS}.clientes", sql, count=1, flags=re.I)
+    # pessoas só existe no banco principal: a FK não vale dentro do arquivo
+    ddl = re.sub(r"\s+REFERENCES\s+\w+\s*\([^)]*\)", "", ddl, flags=re.I)
+    conn.execute(ddl)
+    have = {r[1] for r in conn.execute(f"PRAGMA {ARCHIVE_ALIAS}.table_info(clientes)")}
+    for r in conn.execute("PRAGMA main.table_info(clientes)").fetchall():
+        if r[1] not in have:
+            conn.execute(f"ALTER TABLE {ARCHIVE_ALIAS}.clientes ADD COLUMN {r[1]} {r[2]}")
+    _add_generated_columns(conn, ARCHIVE_ALIAS)
+    conn.execute(f"DROP INDEX IF EXISTS {ARCHIVE_ALIAS}.idx_arquivo_data_compra;")
+    conn.execute(f"CREATE INDEX IF NOT EXISTS {ARCHIVE_ALIAS}.idx_arquivo_compra_dia ON clientes (compra_dia);")
+    conn.execute(f"CREATE INDEX IF NOT EXISTS {ARCHIVE_ALIAS}.idx_arquivo_nascimento_md ON clientes (nascimento_md);")
+    conn.execute(f"CREATE INDEX IF NOT EXISTS {ARCHIVE_ALIAS}.idx_arquivo_nome_sort ON clientes (nome_sort);")
+    conn.execute(f"CREATE INDEX IF NOT EXISTS {ARCHIVE_ALIAS}.idx_arquivo_pessoa ON clientes (pessoa_id, ida_dia);")
+    conn.execute(f"CREATE INDEX IF NOT EXISTS {ARCHIVE_ALIAS}.idx_arquivo_uid ON clientes (uid);")
+    conn.execute(f"CREATE INDEX IF NOT EXISTS {ARCHIVE_ALIAS}.idx_arquivo_relatorio ON clientes ({_REPORT_INDEX_COLS});")
+    for key, name in _REPORT_KEY_INDEXES.items():
+        conn.execute(
+            f"CREATE INDEX IF NOT EXISTS {ARCHIVE_ALIAS}.idx_arquivo_{name} "
+            f"ON clientes ({REPORT_KEYS[key]}, {_REPORT_VALUE_COLS});"
+        )
+
+def archive_before(cutoff: date) -> int:
+    """Move para o arquivo as viagens cuja volta (ou ida, sem volta) é anterior
+    a `cutoff`. Retorna quantas linhas foram movidas. Reexecutar é seguro:
+    o arquivo usa INSERT OR REPLACE pelo id.
+    """
+    cutoff_iso = cutoff.strftime("%Y-%m-%d")
+    where = "COALESCE(volta_dia, ida_dia) < ?"
+    with _writer() as conn:
+        _attach_archive(conn, create=True)
+        _sync_archive_schema(conn)
+        cols = ", ".join(r[1] for r in conn.execute("PRAGMA main.table_info(clientes)").fetchall())
+        _pause_change_log(conn)  # arquivar é local: não vira exclusão nas outras filiais
+        conn.execute(
+            f"INSERT OR REPLACE INTO {ARCHIVE_ALIAS}.clientes ({cols}) SELECT {cols} FROM main.clientes WHERE {where}",
+            (cutoff.toordinal(),),
+        )
+        moved = conn.execute(f"DELETE FROM main.clientes WHERE {where}", (cutoff.toordinal(),)).rowcount
+        last = conn.execute(f"SELECT MAX(compra_dia) FROM {ARCHIVE_ALIAS}.clientes").fetchone()[0]
+        set_meta(conn, "arquivo_compra_max", date.fromordinal(last).isoformat() if last else None)
+        set_meta(conn, "arquivo_corte", cutoff_iso)
+        _resume_change_log(conn)
+    return moved
+
+# ========= Espelho em memória para relatórios =========
+# Opcional (enable_mirror ou TRAVELCRM_DB_MIRROR=1): uma cópia :memory: do
+# banco, feita pela API de backup, atende list_by_month_year, sum_lucro e
+# available_years sem disputar o WAL com as gravações. O espelho só é usado
+# enquanto PRAGMA data_version não muda (ou dentro de max_lag segundos); do
+# contrário a consulta vai ao disco e uma nova cópia é feita em segundo plano.
+# Cada cópia é um banco :memory: com nome (cache compartilhado): toda consulta
+# abre a própria conexão nele, então uma troca não espera relatório nenhum e
+# a cópia antiga some quando a última consulta nela fecha.
+
+MIRROR_ENABLED_BY_ENV = os.environ.get("TRAVELCRM_DB_MIRROR", "") not in ("", "0")
+# intervalo mínimo entre cópias automáticas, por MB do banco (cada cópia lê o
+# arquivo inteiro): 100 MB → no máximo uma a cada 5 s
+MIRROR_MIN_GAP_S = 1.0
+MIRROR_GAP_S_PER_MB = 0.05
+
+class AnalyticsMirror:
+    def __init__(self, path: str, max_lag: float = 0.0, pages: int = 4096) -> None:
+        self.path = path
+        self.max_lag = max_lag
+        self.pages = pages
+        self.refreshed_at = 0.0
+        self.min_gap = MIRROR_MIN_GAP_S
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._generation = 0
+        # conexão que mantém viva a cópia atual; as consultas abrem outras em _uri
+        self._conn: Optional[sqlite3.Connection] = None
+        self._uri: Optional[str] = None
+        self._version: Optional[int] = None
+        # data_version desta conexão muda a cada commit de *outra* conexão,
+        # o que inclui todas as gravações feitas via get_conn().
+        self._watch = sqlite3.connect(path, check_same_thread=False)
+        self._stop = threading.Event()
+
+    def _current_version(self) -> int:
+        with self._lock:
+            return int(self._watch.execute("PRAGMA data_version").fetchone()[0])
+
+    def is_fresh(self) -> bool:
+        if self._conn is None:
+            return False
+        if self.max_lag and time.monotonic() - self.refreshed_at < self.max_lag:
+            return True
+        return self._current_version() == self._version
+
+    def refresh(self) -> None:
+        """Copia o banco inteiro para um novo :memory: e troca o atual."""
+        with self._refresh_lock:
+            version = self._current_version()
+            self._generation += 1
+            uri = f"file:espelho-{id(self):x}-{self._generation}?mode=memory&cache=shared"
+            mem = sqlite3.connect(uri, uri=True, check_same_thread=False)
+            src = sqlite3.connect(self.path)
+            try:
+                src.backup(mem, pages=self.pages, sleep=0)
+                pages = src.execute("PRAGMA page_count").fetchone()[0]
+                size_mb = pages * src.execute("PRAGMA page_size").fetchone()[0] / 1_048_576
+            except BaseException:
+                mem.close()
+                raise
+            finally:
+                src.close()
+            with self._lock:
+                old, self._conn, self._uri = self._conn, mem, uri
+                self._version = version
+                self.refreshed_at = time.monotonic()
+                self.min_gap = max(MIRROR_MIN_GAP_S, size_mb * MIRROR_GAP_S_PER_MB)
+            if old is not None:
+                old.close()
+
+    def refresh_if_changed(self) -> bool:
+        """Nova cópia se o banco mudou, respeitando min_gap desde a última."""
+        if self._conn is not None:
+            if time.monotonic() - self.refreshed_at < self.min_gap:
+                return False
+            if self._current_version() == self._version:
+                return False
+        self.refresh()
+        return True
+
+    def refresh_in_background(self) -> None:
+        if self._refresh_lock.locked() or time.monotonic() - self.refreshed_at < self.min_gap:
+            return
+        threading.Thread(target=self.refresh_if_changed, name="mirror-refresh", daemon=True).start()
+
+    def start_auto_refresh(self, interval: float = 30.0) -> None:
+        def loop() -> None:
+            while not self._stop.wait(interval):
+                try:
+                    self.refresh_if_changed()
+                except sqlite3.Error:
+                    pass
+        threading.Thread(target=loop, name="mirror-timer", daemon=True).start()
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        # conexão própria da consulta, aberta na cópia atual: o lock só cobre
+        # a abertura (a cópia não pode sumir entre ler _uri e conectar), nunca
+        # a consulta
+        with self._lock:
+            if self._uri is None:
+                raise RuntimeError("Espelho ainda não carregado.")
+            conn = sqlite3.connect(self._uri, uri=True)
+        try:
+            conn.execute("PRAGMA query_only=ON;")
+            yield conn
+        finally:
+            conn.close()
+
+    def close(self) -> None:
+        self._stop.set()
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+                self._uri = None
+            self._watch.close()
+
+_mirror: Optional[AnalyticsMirror] = None
+
+def enable_mirror(max_lag: float = 0.0, refresh_interval: float = 30.0) -> AnalyticsMirror:
+    """Liga o espelho em memória para o banco atual (faz a primeira cópia já)."""
+    global _mirror
+    disable_mirror()
+    m = AnalyticsMirror(current_path(), max_lag=max_lag)
+    m.refresh()
+    if refresh_interval:
+        m.start_auto_refresh(refresh_interval)
+    _mirror = m
+    return m
+
+def disable_mirror() -> None:
+    global _mirror
+    if _mirror is not None:
+        _mirror.close()
+        _mirror = None
+
+def mirror_enabled() -> bool:
+    return _mirror is not None
+
+@contextmanager
+def _report_conn() -> Iterator[sqlite3.Connection]:
+    m = _mirror
+    if m is not None and m.path == current_path() and _bound_conn.get() is None:
+        if m.is_fresh():
+            with m.connection() as conn:
+                yield conn
+            return
+        m.refresh_in_background()
+    with _reader() as conn:
+        yield conn
+
+# ========= Fila de gravação com commit em grupo =========
+# Com muitos escritores simultâneos (server.py, importações), cada
+# insert/update/delete custaria um commit (um fsync com synchronous=FULL).
+# A fila junta as mutações que chegam dentro de `window` segundos e grava
+# todas em uma única transação; cada operação roda em seu SAVEPOINT, então
+# um erro desfaz só aquela chamada e é devolvido só para ela.
+
+class WriteQueue:
+    def __init__(self, path: str, window: float = 0.005, max_batch: int = 256) -> None:
+        self.path = path
+        self.window = window
+        self.max_batch = max_batch
+        self.batches = 0
+        self.operations = 0
+        self._q: "queue.Queue[Optional[tuple]]" = queue.Queue()
+        self._conn = _configure(sqlite3.connect(path, check_same_thread=False, isolation_level=None))
+        self._thread = threading.Thread(target=self._run, name="write-queue", daemon=True)
+        self._thread.start()
+
+    def submit(self, fn, *args) -> Future:
+        """Enfileira fn(conn, *args); o Future recebe o retorno ou a exceção."""
+        fut: Future = Future()
+        self._q.put((fn, args, fut))
+        return fut
+
+    def _run(self) -> None:
+        while True:
+            item = self._q.get()
+            if item is None:
+                break
+            batch = [item]
+            stop = False
+            deadline = time.monotonic() + self.window
+            while len(batch) < self.max_batch:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    nxt = self._q.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if nxt is None:
+                    stop = True
+                    break
+                batch.append(nxt)
+            self._commit(batch)
+            if stop:
+                break
+        self._conn.close()
+
+    def _commit(self, batch: List[tuple]) -> None:
+        conn = self._conn
+        done: List[Tuple[Future, object, Optional[BaseException]]] = []
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for fn, args, fut in batch:
+                conn.execute("SAVEPOINT op")
+                try:
+                    res = fn(conn, *args)
+                except Exception as exc:
+                    conn.execute("ROLLBACK TO op")
+                    conn.execute("RELEASE op")
+                    done.append((fut, None, exc))
+                    continue
+                conn.execute("RELEASE op")
+                done.append((fut, res, None))
+            conn.execute("COMMIT")
+        except Exception as exc:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            for _fn, _args, fut in batch:
+                fut.set_exception(exc)
+            return
+        self.batches += 1
+        self.operations += len(batch)
+        for fut, res, err in done:
+            if err is not None:
+                fut.set_exception(err)
+            else:
+                fut.set_result(res)
+
+    def close(self) -> None:
+        self._q.put(None)
+        self._thread.join()
+
+_write_queue: Optional[WriteQueue] = None
+
+def enable_write_queue(window_ms: float = 5.0, max_batch: int = 256) -> WriteQueue:
+    """insert/update/delete_cliente do banco atual passam a usar commit em grupo."""
+    global _write_queue
+    disable_write_queue()
+    _write_queue = WriteQueue(current_path(), window=window_ms / 1000.0, max_batch=max_batch)
+    return _write_queue
+
+def disable_write_queue() -> None:
+    global _write_queue
+    if _write_queue is not None:
+        _write_queue.close()
+        _write_queue = None
+
+def _active_write_queue() -> Optional[WriteQueue]:
+    wq = _write_queue
+    return wq if wq is not None and wq.path == current_path() else None
+
+# ========= Log de alterações (CDC) para sincronizar filiais =========
+# Gatilhos gravam cada INSERT/UPDATE/DELETE em clientes_changes com um seq
+# crescente. Entre bancos as linhas são identificadas por `uid` (os ids locais
+# colidem entre filiais). export_changes_since(seq) lê só o delta pelo índice
+# do seq; apply_changes(lote) aplica pelo índice de uid e detecta conflitos
+# comparando updated_at. Mudanças aplicadas vindas de fora não são
+# registradas de novo (evita eco entre filiais).
+
+CDC_COLS = (
+    "nome_completo", "data_nascimento", "data_compra_voo", "doc_tipo", "doc_valor",
+    "valor_venda_cents", "valor_lucro_cents", "valor_pago_cents",
+    "data_ida", "data_volta", "doc_voo_path",
+)
+_CDC_ON = "(SELECT valor FROM meta WHERE chave='cdc_pausado') IS NULL"
+
+def _install_change_log(conn: sqlite3.Connection) -> None:
+    if not _column_exists(conn, "clientes", "uid"):
+        conn.execute("ALTER TABLE clientes ADD COLUMN uid TEXT;")
+    conn.execute("UPDATE clientes SET uid = lower(hex(randomblob(16))) WHERE uid IS NULL;")
+    conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_clientes_uid ON clientes (uid);")
+    is_new = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name='clientes_changes'"
+    ).fetchone() is None
+    conn.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS clientes_changes (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            op TEXT NOT NULL CHECK(op IN ('I','U','D')),
+            cliente_id INTEGER NOT NULL,
+            uid TEXT NOT NULL,
+            cols TEXT,
+            dados TEXT,
+            base_updated_at TEXT,
+            updated_at TEXT,
+            registrado_em TEXT DEFAULT ({NOW_TS})
+        );
+        """
+    )
+    if get_meta(conn, "db_uid") is None:
+        set_meta(conn, "db_uid", conn.execute("SELECT lower(hex(randomblob(16)))").fetchone()[0])
+    if is_new:
+        # linhas anteriores ao log entram como inserções: a 1ª sincronização leva tudo
+        row_json = "json_object(" + ", ".join(f"'{c}', {c}" for c in CDC_COLS) + ")"
+        conn.execute(
+            f"""
+            INSERT INTO clientes_changes (op, cliente_id, uid, cols, dados, base_updated_at, updated_at)
+            SELECT 'I', id, uid, NULL, {row_json}, NULL, updated_at FROM clientes ORDER BY id
+            """
+        )
+
+    new_json = "json_object(" + ", ".join(f"'{c}', NEW.{c}" for c in CDC_COLS) + ")"
+    changed = "rtrim(" + " || ".join(
+        f"CASE WHEN OLD.{c} IS NOT NEW.{c} THEN '{c},' ELSE '' END" for c in CDC_COLS
+    ) + ", ',')"
+    # recriados a cada init_db para acompanhar novas colunas
+    for name in ("trg_clientes_cdc_ins", "trg_clientes_cdc_upd", "trg_clientes_cdc_del"):
+        conn.execute(f"DROP TRIGGER IF EXISTS {name};")
+    conn.execute(
+        f"""
+        CREATE TRIGGER trg_clientes_cdc_ins AFTER INSERT ON clientes
+        BEGIN
+            UPDATE clientes SET uid = lower(hex(randomblob(16))) WHERE id = NEW.id AND uid IS NULL;
+            INSERT INTO clientes_changes (op, cliente_id, uid, cols, dados, base_updated_at, updated_at)
+            SELECT 'I', NEW.id, c.uid, NULL, {new_json}, NULL, NEW.updated_at
+            FROM clientes c WHERE c.id = NEW.id AND {_CDC_ON};
+        END;
+        """
+    )
+    conn.execute(
+        f"""
+        CREATE TRIGGER trg_clientes_cdc_upd AFTER UPDATE ON clientes
+        WHEN OLD.uid IS NOT NULL AND {_CDC_ON}
+        BEGIN
+            INSERT INTO clientes_changes (op, cliente_id, uid, cols, dados, base_updated_at, updated_at)
+            VALUES ('U', NEW.id, NEW.uid, {changed}, {new_json}, OLD.updated_at, NEW.updated_at);
+        END;
+        """
+    )
+    conn.execute(
+        f"""
+        CREATE TRIGGER trg_clientes_cdc_del AFTER DELETE ON clientes
+        WHEN OLD.uid IS NOT NULL AND {_CDC_ON}
+        BEGIN
+            INSERT INTO clientes_changes (op, cliente_id, uid, cols, dados, base_updated_at, updated_at)
+            VALUES ('D', OLD.id, OLD.uid, NULL, NULL, OLD.updated_at, NULL);
+        END;
+        """
+    )
+
+def _pause_change_log(conn: sqlite3.Connection) -> None:
+    # vale só dentro da transação corrente: set e remoção no mesmo commit
+    set_meta(conn, "cdc_pausado", "1")
+
+def _resume_change_log(conn: sqlite3.Connection) -> None:
+    conn.execute("DELETE FROM main.meta WHERE chave='cdc_pausado'")
+
+def database_uid() -> str:
+    with _reader() as conn:
+        return get_meta(conn, "db_uid") or ""
+
+def latest_change_seq() -> int:
+    with _reader() as conn:
+        return int(conn.execute("SELECT COALESCE(MAX(seq), 0) FROM clientes_changes").fetchone()[0])
+
+def export_changes_since(seq: int, limit: Optional[int] = None) -> List[Dict[str, object]]:
+    """Alterações com seq > `seq`, em ordem. Cada item: seq, op ('I'/'U'/'D'),
+    uid, cols (colunas alteradas, em 'U'), dados (valores novos),
+    base_updated_at (updated_at antes da mudança) e updated_at.
+    """
+    sql = """
+        SELECT seq, op, uid, cols, dados, base_updated_at, updated_at
+        FROM clientes_changes WHERE seq > ? ORDER BY seq
+    """
+    args: Tuple = (int(seq),)
+    if limit is not None:
+        sql += " LIMIT ?"
+        args += (int(limit),)
+    with _reader() as conn:
+        out = []
+        for s_, op, uid, cols, dados, base, upd in conn.execute(sql, args):
+            out.append({
+                "seq": s_, "op": op, "uid": uid,
+                "cols": [c for c in (cols or "").split(",") if c],
+                "dados": json.loads(dados) if dados else None,
+                "base_updated_at": base, "updated_at": upd,
+            })
+        return out
+
+def sync_position(origem_uid: str) -> int:
+    """Último seq do banco `origem_uid` já aplicado aqui."""
+    with _reader() as conn:
+        return int(get_meta(conn, f"sync_seq:{origem_uid}") or 0)
+
+def apply_changes(batch: List[Dict[str, object]], origem_uid: Optional[str] = None) -> Dict[str, object]:
+    """Aplica um lote de export_changes_since de outro banco, em uma transação.
+    Conflito = a linha local mudou depois do estado em que a alteração se
+    baseou (updated_at local diferente do base_updated_at). Conflitos não são
+    aplicados e voltam em "conflitos". Reaplicar o mesmo lote é inofensivo.
+    Viagens que aqui já foram para o arquivo e alterações de viagens excluídas
+    aqui também voltam como conflito (não são recriadas em `clientes`).
+    Com origem_uid, a posição (sync_position) é gravada no mesmo commit.
+    """
+    aplicadas = 0
+    conflitos: List[Dict[str, object]] = []
+    ultimo = 0
+    with _writer() as conn:
+        arquivo = _attach_archive(conn)  # ATTACH não pode ficar dentro da transação
+        if arquivo:
+            _sync_archive_schema(conn)
+        _pause_change_log(conn)
+        for ch in batch:
+            ultimo = max(ultimo, int(ch["seq"]))
+            op, uid = ch["op"], ch["uid"]
+            row = conn.execute("SELECT id, updated_at FROM main.clientes WHERE uid=?", (uid,)).fetchone()
+            local_ts = row[1] if row else None
+            if row is None and arquivo:
+                arq = conn.execute(
+                    f"SELECT updated_at FROM {ARCHIVE_ALIAS}.clientes WHERE uid=?", (uid,)
+                ).fetchone()
+                if arq is not None:
+                    if op != "D" and arq[0] == ch["updated_at"]:
+                        continue  # já aplicada antes de arquivar
+                    conflitos.append({"seq": ch["seq"], "uid": uid, "op": op, "motivo": "arquivada localmente"})
+                    continue
+            if op == "D":
+                if row is None:
+                    continue
+                if local_ts != ch["base_updated_at"]:
+                    conflitos.append({"seq": ch["seq"], "uid": uid, "op": op, "motivo": "alterado localmente"})
+                    continue
+                conn.execute("DELETE FROM main.clientes WHERE id=?", (row[0],))
+                aplicadas += 1
+                continue
+
+            dados = ch["dados"] or {}
+            if row is None and op == "U":
+                # o 'I' dela já passou por aqui: só falta porque foi excluída
+                conflitos.append({"seq": ch["seq"], "uid": uid, "op": op, "motivo": "excluído localmente"})
+            elif row is None:
+                cols = [c for c in CDC_COLS if c in dados]
+                pessoa_id = _upsert_pessoa(conn, dados.get("nome_completo"), dados.get("data_nascimento"),
+                                           dados.get("doc_tipo"), dados.get("doc_valor"))
+                conn.execute(
+                    f"INSERT INTO clientes (uid, updated_at, nome_sort, pessoa_id, {', '.join(cols)}) "
+                    f"VALUES (?, ?, ?, ?, {', '.join('?' * len(cols))})",
+                    (uid, ch["updated_at"], fold_nome(dados.get("nome_completo")), pessoa_id, *[dados[c] for c in cols]),
+                )
+                aplicadas += 1
+            elif local_ts == ch["updated_at"]:
+                continue  # já aplicada
+            elif op == "U" and local_ts == ch["base_updated_at"]:
+                cols = [c for c in ch["cols"] if c in CDC_COLS]
+                vals = [dados[c] for c in cols]
+                if "nome_completo" in cols:
+                    cols.append("nome_sort")
+                    vals.append(fold_nome(dados["nome_completo"]))
+                sets = "".join(f"{c}=?, " for c in cols)
+                conn.execute(
+                    f"UPDATE clientes SET {sets}updated_at=? WHERE id=?",
+                    (*vals, ch["updated_at"], row[0]),
+                )
+                if set(cols) & set(_PESSOA_CAMPOS):
+                    atual = conn.execute(
+                        f"SELECT {', '.join(_PESSOA_CAMPOS)} FROM clientes WHERE id=?", (row[0],)
+                    ).fetchone()
+                    conn.execute("UPDATE clientes SET pessoa_id=? WHERE id=?", (_upsert_pessoa(conn, *atual), row[0]))
+                aplicadas += 1
+            else:
+                conflitos.append({"seq": ch["seq"], "uid": uid, "op": op, "motivo": "alterado localmente"})
+        if origem_uid and ultimo:
+            set_meta(conn, f"sync_seq:{origem_uid}", str(ultimo))
+        _resume_change_log(conn)
+    return {"aplicadas": aplicadas, "conflitos": conflitos, "ultimo_seq": ultimo}
@@ -0,0 +1,276 @@
+# docstore.py
+"""Repositório de documentos de voo endereçado por conteúdo.
+
+Os arquivos ficam em <banco>_documentos/<2 primeiros hex>/<sha256><ext>, e
+doc_voo_path guarda a referência "sha256:<hex>". O mesmo PDF anexado a
+várias viagens é guardado uma vez só. Caminhos antigos (absolutos) continuam
+funcionando e podem ser trazidos para o repositório com import_legacy_paths.
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import mimetypes
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import db
+
+REF_PREFIX = "sha256:"
+CHUNK = 1024 * 1024
+
+
+def store_dir() -> str:
+    base, _ext = os.path.splitext(db.current_path())
+    return f"{base}_documentos"
+
+
+def is_ref(value: Optional[str]) -> bool:
+    return bool(value) and str(value).startswith(REF_PREFIX)
+
+
+def _hash_from_ref(ref: str) -> str:
+    return ref[len(REF_PREFIX):].split(".", 1)[0]
+
+
+def _stored_path(hash_hex: str, ext: str) -> str:
+    return os.path.join(store_dir(), hash_hex[:2], hash_hex + ext.lower())
+
+
+def resolve(value: Optional[str]) -> Optional[str]:
+    """Caminho real para um doc_voo_path (referência do repositório ou caminho antigo)."""
+    if not value:
+        return None
+    if not is_ref(value):
+        return value
+    ref = value[len(REF_PREFIX):]
+    hash_hex, _, ext = ref.partition(".")
+    return _stored_path(hash_hex, f".{ext}" if ext else "")
+
+
+def exists(value: Optional[str]) -> bool:
+    path = resolve(value)
+    return bool(path) and os.path.isfile(path)
+
+
+def import_file(src_path: str) -> str:
+    """Copia src_path para o repositório calculando o SHA-256 no mesmo passo
+    (em blocos, sem carregar o arquivo inteiro). Retorna a referência.
+    """
+    ext = os.path.splitext(src_path)[1].lower()
+    os.makedirs(store_dir(), exist_ok=True)
+    h = hashlib.sha256()
+    size = 0
+    fd, tmp = tempfile.mkstemp(prefix=".import-", dir=store_dir())
+    try:
+        with open(src_path, "rb") as f_in, os.fdopen(fd, "wb") as f_out:
+            while True:
+                chunk = f_in.read(CHUNK)
+                if not chunk:
+                    break
+                h.update(chunk)
+                f_out.write(chunk)
+                size += len(chunk)
+        hash_hex = h.hexdigest()
+        dest = _stored_path(hash_hex, ext)
+        if os.path.exists(dest):
+            os.remove(tmp)  # já temos este conteúdo
+        else:
+            os.makedirs(os.path.dirname(dest), exist_ok=True)
+            os.replace(tmp, dest)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    mime = mimetypes.guess_type(src_path)[0]
+    db.register_documento(hash_hex, size, mime, os.path.basename(src_path))
+    return f"{REF_PREFIX}{hash_hex}{ext}"
+
+
+def import_legacy_paths() -> Tuple[int, List[str]]:
+    """Traz para o repositório os doc_voo_path ainda com caminho absoluto.
+    Retorna (quantos importados, caminhos não encontrados).
+    """
+    imported = 0
+    missing: List[str] = []
+    cache: Dict[str, str] = {}
+    for cid, path in db.list_doc_paths():
+        if is_ref(path):
+            continue
+        if path not in cache:
+            if not os.path.isfile(path):
+                missing.append(path)
+                continue
+            cache[path] = import_file(path)
+        db.set_doc_path(cid, cache[path])
+        imported += 1
+    return imported, missing
+
+
+def scan(verify_hash: bool = False) -> List[Tuple[str, str]]:
+    """Verifica o repositório. Rápido por padrão (só stat: existência e
+    tamanho contra a tabela documentos); verify_hash=True recalcula os
+    SHA-256. Retorna [(hash, problema)].
+    """
+    problems: List[Tuple[str, str]] = []
+    root = store_dir()
+    on_disk: Dict[str, str] = {}
+    if os.path.isdir(root):
+        for sub in os.scandir(root):
+            if not sub.is_dir():
+                continue
+            for entry in os.scandir(sub.path):
+                if entry.is_file() and not entry.name.startswith("."):
+                    on_disk[entry.name.split(".", 1)[0]] = entry.path
+    for hash_hex, tamanho, _mime, _nome, _criado in db.list_documentos():
+        path = on_disk.pop(hash_hex, None)
+        if path is None:
+            problems.append((hash_hex, "arquivo ausente"))
+            continue
+        if os.path.getsize(path) != tamanho:
+            problems.append((hash_hex, "tamanho diferente do registrado"))
+            continue
+        if verify_hash:
+            h = hashlib.sha256()
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(CHUNK), b""):
+                    h.update(chunk)
+            if h.hexdigest() != hash_hex:
+                problems.append((hash_hex, "conteúdo corrompido (hash não confere)"))
+    for hash_hex in on_disk:
+        problems.append((hash_hex, "arquivo sem registro"))
+    for _cid, path in db.list_doc_paths():
+        if is_ref(path) and db.get_documento(_hash_from_ref(path)) is None:
+            problems.append((_hash_from_ref(path), "referenciado mas não registrado"))
+    return problems
+
+
+# ========= Verificação de anexos em paralelo =========
+
+STATUS_OK = "ok"
+STATUS_AUSENTE = "ausente"
+STATUS_ALTERADO = "alterado"
+
+
+class HealthChecker:
+    """Verifica muitos doc_voo_path de uma vez com um pool de threads (stat é
+    I/O puro; em compartilhamento de rede cada um custa uma ida e volta).
+
+    Cache por pasta: enquanto o mtime da pasta não muda, nenhum arquivo foi
+    criado, removido ou renomeado nela e o status anterior é reaproveitado,
+    custando um stat por pasta em vez de um por arquivo. Após
+    `full_recheck_s` os arquivos são conferidos de novo (tamanho alterado).
+    """
+
+    def __init__(self, workers: int = 16, full_recheck_s: float = 600.0) -> None:
+        self.full_recheck_s = full_recheck_s
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="doc-check")
+        self._lock = threading.Lock()
+        self._dirs: Dict[str, Tuple[int, float]] = {}
+        self._status: Dict[str, str] = {}
+
+    @staticmethod
+    def _dir_mtime(path: str) -> Optional[int]:
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+    @staticmethod
+    def _file_status(path: str, expected_size: Optional[int]) -> str:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return STATUS_AUSENTE
+        if expected_size is not None and st.st_size != expected_size:
+            return STATUS_ALTERADO
+        return STATUS_OK
+
+    def check(self, values: Iterable[Optional[str]]) -> Dict[str, str]:
+        """Status ("ok", "ausente", "alterado") por valor de doc_voo_path."""
+        resolved = {v: resolve(v) for v in set(values) if v}
+        if not resolved:
+            return {}
+        sizes: Dict[str, int] = {}
+        if any(is_ref(v) for v in resolved):
+            known = {h: t for h, t, _m, _n, _c in db.list_documentos()}
+            sizes = {p: known[_hash_from_ref(v)] for v, p in resolved.items()
+                     if is_ref(v) and _hash_from_ref(v) in known}
+
+        by_dir: Dict[str, List[str]] = {}
+        for p in set(resolved.values()):
+            by_dir.setdefault(os.path.dirname(os.path.abspath(p)), []).append(p)
+        dirs = list(by_dir)
+        mtimes = dict(zip(dirs, self._pool.map(self._dir_mtime, dirs)))
+
+        now = time.monotonic()
+        to_check: List[str] = []
+        fresh: Dict[str, str] = {}
+        with self._lock:
+            for d, paths in by_dir.items():
+                cached = self._dirs.get(d)
+                reuse = (mtimes[d] is not None and cached is not None and cached[0] == mtimes[d]
+                         and now - cached[1] < self.full_recheck_s)
+                for p in paths:
+                    if mtimes[d] is None:
+                        fresh[p] = STATUS_AUSENTE
+                    elif reuse and p in self._status:
+                        fresh[p] = self._status[p]
+                    else:
+                        to_check.append(p)
+        for p, st in zip(to_check, self._pool.map(lambda p: self._file_status(p, sizes.get(p)), to_check)):
+            fresh[p] = st
+        with self._lock:
+            self._status.update(fresh)
+            for d in dirs:
+                if mtimes[d] is not None:
+                    cached = self._dirs.get(d)
+                    revalidated = any(os.path.dirname(os.path.abspath(p)) == d for p in to_check)
+                    if cached is None or cached[0] != mtimes[d] or revalidated:
+                        self._dirs[d] = (mtimes[d], now)
+        return {v: fresh[p] for v, p in resolved.items()}
+
+    def check_in_background(self, values: Iterable[Optional[str]], on_done) -> threading.Thread:
+        """Roda check() numa thread; on_done(resultado) é chamado nela."""
+        vals = list(values)
+        path = db.current_path()
+
+        def run() -> None:
+            with db.bound_to(path):
+                result = self.check(vals)
+            on_done(result)
+
+        t = threading.Thread(target=run, name="doc-health", daemon=True)
+        t.start()
+        return t
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Repositório de documentos de voo.")
+    parser.add_argument("--db", default=db.DB_PATH, help="arquivo do banco (padrão: %(default)s)")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("importar-antigos", help="copia caminhos absolutos antigos para o repositório")
+    p = sub.add_parser("verificar", help="verificação de integridade")
+    p.add_argument("--hash", action="store_true", help="recalcula o SHA-256 de cada arquivo")
+    args = parser.parse_args(argv)
+
+    db.DB_PATH = args.db
+    db.init_db()
+    if args.cmd == "importar-antigos":
+        n, missing = import_legacy_paths()
+        print(f"{n} referência(s) migrada(s); {len(missing)} caminho(s) não encontrado(s).")
+        for m in missing:
+            print(f"  ausente: {m}")
+    else:
+        problems = scan(verify_hash=args.hash)
+        print("Repositório íntegro." if not problems else f"{len(problems)} problema(s):")
+        for hash_hex, msg in problems:
+            print(f"  {hash_hex}: {msg}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+# maintenance.py
+from __future__ import annotations
+
+import argparse
+import gc
+import os
+import shutil
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+import db
+
+# Só vale a pena devolver espaço ao SO quando há páginas livres suficientes.
+VACUUM_MIN_FREE_PAGES = 256
+# Páginas devolvidas por rodada; mantém cada rodada curta.
+VACUUM_STEP_PAGES = 2048
+
+
+def db_stats() -> Dict[str, int]:
+    """Tamanho do banco em páginas, páginas livres e tamanho do -wal (bytes)."""
+    with db.get_conn() as conn:
+        page_size = int(conn.execute("PRAGMA page_size").fetchone()[0])
+        page_count = int(conn.execute("PRAGMA page_count").fetchone()[0])
+        freelist = int(conn.execute("PRAGMA freelist_count").fetchone()[0])
+        auto_vacuum = int(conn.execute("PRAGMA auto_vacuum").fetchone()[0])
+    wal_path = db.current_path() + "-wal"
+    wal_bytes = os.path.getsize(wal_path) if os.path.exists(wal_path) else 0
+    return {
+        "page_size": page_size,
+        "page_count": page_count,
+        "freelist_count": freelist,
+        "db_bytes": page_size * page_count,
+        "wal_bytes": wal_bytes,
+        "auto_vacuum": auto_vacuum,
+    }
+
+
+def optimize(analyze: bool = False) -> None:
+    """PRAGMA optimize (ANALYZE só nas tabelas que precisam); analyze=True força ANALYZE completo."""
+    with db.get_conn() as conn:
+        if analyze:
+            conn.execute("ANALYZE")
+        conn.execute("PRAGMA optimize")
+
+
+def checkpoint(mode: str = "TRUNCATE") -> Tuple[int, int, int]:
+    """Checkpoint do WAL. Retorna (busy, páginas no log, páginas copiadas)."""
+    mode = mode.upper()
+    if mode not in ("PASSIVE", "FULL", "RESTART", "TRUNCATE"):
+        raise ValueError(f"Modo de checkpoint inválido: {mode}")
+    with db.get_conn() as conn:
+        row = conn.execute(f"PRAGMA wal_checkpoint({mode})").fetchone()
+    return int(row[0]), int(row[1]), int(row[2])
+
+
+def incremental_vacuum(max_pages: Optional[int] = VACUUM_STEP_PAGES) -> int:
+    """Devolve até max_pages páginas livres ao SO. Retorna quantas foram liberadas."""
+    with db.get_conn() as conn:
+        if int(conn.execute("PRAGMA auto_vacuum").fetchone()[0]) != 2:
+            return 0
+        before = int(conn.execute("PRAGMA freelist_count").fetchone()[0])
+        if max_pages:
+            conn.execute(f"PRAGMA incremental_vacuum({int(max_pages)})").fetchall()
+        else:
+            conn.execute("PRAGMA incremental_vacuum").fetchall()
+        after = int(conn.execute("PRAGMA freelist_count").fetchone()[0])
+    return before - after
+
+
+def convert_auto_vacuum() -> bool:
+    """Liga auto_vacuum=INCREMENTAL, uma vez por arquivo. Só vale após um
+    VACUUM completo, que reescreve o banco (demora em arquivos grandes e
+    precisa de espaço livre do tamanho dele), por isso não roda no init_db.
+    Retorna False se já estava ligado.
+    """
+    with db.get_conn() as conn:
+        if int(conn.execute("PRAGMA auto_vacuum").fetchone()[0]) == 2:
+            return False
+        page_size = int(conn.execute("PRAGMA page_size").fetchone()[0])
+        size = page_size * int(conn.execute("PRAGMA page_count").fetchone()[0])
+        free = shutil.disk_usage(os.path.dirname(os.path.abspath(db.current_path()))).free
+        if free < size:
+            raise RuntimeError(f"Espaço livre insuficiente para o VACUUM ({size / 1_048_576:.0f} MB necessários).")
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL;")
+        conn.execute("VACUUM;")
+    return True
+
+
+def change_page_size(page_size: Optional[int] = None) -> Tuple[int, int]:
+    """Reescreve o arquivo com outro page_size (padrão: o do perfil ativo).
+    Em WAL isso exige sair do WAL e fazer VACUUM, então só funciona com
+    nenhuma outra conexão aberta. Retorna (page_size antes, depois).
+    """
+    page_size = int(page_size or db.get_profile()["page_size"])
+    if not 512 <= page_size <= 65536 or page_size & (page_size - 1):
+        raise ValueError(f"page_size inválido: {page_size} (potência de 2 entre 512 e 65536)")
+    # `with db.get_conn()` só faz commit; conexões deste processo que ficaram
+    # para trás (ex.: a do init_db) só fecham quando o gc passa
+    gc.collect()
+    conn = sqlite3.connect(db.current_path(), timeout=1.0)
+    try:
+        before = int(conn.execute("PRAGMA page_size").fetchone()[0])
+        if before == page_size:
+            return before, before
+        try:
+            mode = conn.execute("PRAGMA journal_mode=DELETE").fetchone()[0]
+        except sqlite3.OperationalError:
+            mode = "wal"
+        if mode.lower() != "delete":
+            raise RuntimeError("Banco em uso por outro programa; feche-o e tente de novo.")
+        try:
+            conn.execute(f"PRAGMA page_size={page_size}")
+            conn.execute("VACUUM")
+        finally:
+            conn.execute("PRAGMA journal_mode=WAL")
+        return before, int(conn.execute("PRAGMA page_size").fetchone()[0])
+    finally:
+        conn.close()
+
+
+def run_maintenance(full: bool = False) -> List[str]:
+    """Rodada completa: optimize, vacuum incremental (se compensar) e checkpoint TRUNCATE.
+    Retorna um resumo legível do que foi feito.
+    """
+    log: List[str] = []
+    optimize(analyze=full)
+    log.append("ANALYZE + PRAGMA optimize" if full else "PRAGMA optimize")
+
+    stats = db_stats()
+    if full and stats["auto_vacuum"] != 2:
+        try:
+            convert_auto_vacuum()
+            log.append("auto_vacuum=INCREMENTAL (VACUUM completo)")
+        except (RuntimeError, sqlite3.OperationalError) as exc:
+            log.append(f"auto_vacuum não convertido: {exc}")
+    if full or stats["freelist_count"] >= VACUUM_MIN_FREE_PAGES:
+        freed = incremental_vacuum(None if full else VACUUM_STEP_PAGES)
+        log.append(f"incremental_vacuum: {freed} página(s) liberada(s)")
+
+    busy, wal_pages, copied = checkpoint("TRUNCATE")
+    if busy:
+        log.append(f"wal_checkpoint: ocupado ({copied}/{wal_pages} páginas copiadas)")
+    else:
+        log.append(f"wal_checkpoint(TRUNCATE): {copied} página(s)")
+    return log
+
+
+def format_stats(stats: Dict[str, int]) -> str:
+    modos = {0: "NONE", 1: "FULL", 2: "INCREMENTAL"}
+    return (
+        f"Páginas: {stats['page_count']} × {stats['page_size']} B "
+        f"({stats['db_bytes'] / 1_048_576:.1f} MB)\n"
+        f"Páginas livres: {stats['freelist_count']}\n"
+        f"WAL: {stats['wal_bytes'] / 1_048_576:.1f} MB\n"
+        f"auto_vacuum: {modos.get(stats['auto_vacuum'], stats['auto_vacuum'])}"
+        + ("" if stats["auto_vacuum"] == 2 else " (a manutenção completa converte para INCREMENTAL)")
+    )
+
+
+def start_maintenance_thread(
+    full: bool = False,
+    on_done: Optional[Callable[[Optional[List[str]], Optional[BaseException]], None]] = None,
+) -> threading.Thread:
+    path = db.current_path()
+
+    def run() -> None:
+        try:
+            with db.bound_to(path):
+                log = run_maintenance(full=full)
+        except BaseException as exc:
+            if on_done is not None:
+                on_done(None, exc)
+            return
+        if on_done is not None:
+            on_done(log, None)
+
+    t = threading.Thread(target=run, name="maintenance", daemon=True)
+    t.start()
+    return t
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Manutenção do banco da agência.")
+    parser.add_argument("--db", default=db.DB_PATH, help="arquivo do banco (padrão: %(default)s)")
+    parser.add_argument("--stats", action="store_true", help="só mostra as estatísticas")
+    parser.add_argument("--full", action="store_true", help="ANALYZE completo e vacuum de todas as páginas livres")
+    parser.add_argument("--auto-vacuum", action="store_true",
+                        help="converte o arquivo para auto_vacuum=INCREMENTAL (VACUUM completo)")
+    parser.add_argument("--page-size", nargs="?", type=int, const=0, metavar="BYTES",
+                        help="reescreve o arquivo com este page_size (sem valor: o do perfil); feche o app antes")
+    parser.add_argument("--arquivar-antes", metavar="DD/MM/AAAA",
+                        help="move para o arquivo as viagens encerradas antes desta data")
+    args = parser.parse_args(argv)
+
+    db.DB_PATH = args.db
+    db.init_db()
+    if args.auto_vacuum:
+        print("auto_vacuum convertido para INCREMENTAL" if convert_auto_vacuum() else "auto_vacuum já é INCREMENTAL")
+    if args.page_size is not None:
+        before, after = change_page_size(args.page_size)
+        print(f"page_size: {before} → {after}" if before != after else f"page_size já é {after}")
+    if args.arquivar_antes:
+        cutoff = datetime.strptime(args.arquivar_antes, "%d/%m/%Y").date()
+        moved = db.archive_before(cutoff)
+        print(f"{moved} viagem(ns) movida(s) para {db.archive_path()}")
+    if not args.stats:
+        for line in run_maintenance(full=args.full):
+            print(line)
+    print(format_stats(db_stats()))
+
+
+if __name__ == "__main__":
+    main()
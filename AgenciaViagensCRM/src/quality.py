@@ -0,0 +1,193 @@
+# quality.py
+"""Verificação de qualidade dos dados de clientes.
+
+A tabela é lida em faixas de id, cada faixa em um processo do pool (conexão
+só leitura), com as mesmas regras do formulário: CPF válido, datas válidas,
+volta depois da ida e lucro = pago − venda. Os achados vão para a tabela
+`qualidade`. A verificação é incremental: só as vendas cujo updated_at
+mudou desde a última passada são relidas (qualidade_verificados).
+
+    python quality.py --db agencia_viagens.db            # incremental
+    python quality.py --db agencia_viagens.db --completo --listar
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import db
+from utils import format_cents_br, valido_cpf
+
+CHUNK_IDS = 50_000
+
+ERRO = "erro"
+AVISO = "aviso"
+
+# regra → (gravidade, descrição)
+RULES: Dict[str, Tuple[str, str]] = {
+    "cpf_invalido": (ERRO, "CPF com dígitos verificadores inválidos"),
+    "data_invalida": (ERRO, "Data fora do formato AAAA-MM-DD ou inexistente"),
+    "volta_antes_ida": (ERRO, "Data de volta anterior à data de ida"),
+    "venda_negativa": (ERRO, "Valor de venda negativo"),
+    "lucro_divergente": (AVISO, "Lucro diferente de pago − venda"),
+    "ida_antes_compra": (AVISO, "Data de ida anterior à compra"),
+}
+
+# (id, regra, detalhe)
+Finding = Tuple[int, str, str]
+
+_COLS = ("c.id, c.updated_at, c.doc_tipo, c.doc_valor, c.data_nascimento, c.data_compra_voo, "
+         "c.data_ida, c.data_volta, c.valor_venda_cents, c.valor_pago_cents, c.valor_lucro_cents")
+
+
+def _valid_iso(s: Optional[str]) -> bool:
+    try:
+        date.fromisoformat(s)  # type: ignore[arg-type]
+    except (TypeError, ValueError):
+        return False
+    return len(s) == 10  # type: ignore[arg-type]
+
+
+def check_row(row: Sequence) -> List[Finding]:
+    """Regras para uma linha no formato de _COLS."""
+    cid, _upd, doc_tipo, doc_valor, nasc, compra, ida, volta, venda, pago, lucro = row
+    out: List[Finding] = []
+    if doc_tipo == "CPF" and not valido_cpf(doc_valor or ""):
+        out.append((cid, "cpf_invalido", str(doc_valor or "")))
+    bad = [nome for nome, v in (("nascimento", nasc), ("compra", compra), ("ida", ida)) if not _valid_iso(v)]
+    if volta and not _valid_iso(volta):
+        bad.append("volta")
+    if bad:
+        out.append((cid, "data_invalida", ", ".join(bad)))
+    if volta and "ida" not in bad and "volta" not in bad and volta < ida:
+        out.append((cid, "volta_antes_ida", f"ida {ida}, volta {volta}"))
+    if "ida" not in bad and "compra" not in bad and ida < compra:
+        out.append((cid, "ida_antes_compra", f"compra {compra}, ida {ida}"))
+    if venda is not None and venda < 0:
+        out.append((cid, "venda_negativa", format_cents_br(venda)))
+    # mesma conta de utils.compute_lucro_cents_from_strings (pago vazio = 0)
+    esperado = (pago or 0) - (venda or 0)
+    if lucro != esperado:
+        out.append((cid, "lucro_divergente", f"gravado {format_cents_br(lucro)}, esperado {format_cents_br(esperado)}"))
+    return out
+
+
+def scan_range(path: str, lo: int, hi: int, full: bool) -> Tuple[List[Tuple[int, str]], List[Finding]]:
+    """Roda no processo do pool: verifica as vendas lo..hi que mudaram
+    (todas com full=True). Retorna ([(id, updated_at)], achados).
+    """
+    checked: List[Tuple[int, str]] = []
+    findings: List[Finding] = []
+    conn = db._configure(sqlite3.connect(path))
+    try:
+        conn.execute("PRAGMA query_only=ON;")
+        cur = conn.execute(
+            f"""
+            SELECT {_COLS} FROM clientes c
+            LEFT JOIN qualidade_verificados v ON v.cliente_id = c.id
+            WHERE c.id BETWEEN ? AND ? AND (? OR v.updated_at IS NOT c.updated_at)
+            """,
+            (lo, hi, 1 if full else 0),
+        )
+        for row in cur:
+            checked.append((row[0], row[1]))
+            findings.extend(check_row(row))
+    finally:
+        conn.close()
+    return checked, findings
+
+
+def _save(conn, checked: List[Tuple[int, str]], findings: List[Finding]) -> None:
+    conn.executemany("DELETE FROM qualidade WHERE cliente_id=?", [(cid,) for cid, _ in checked])
+    conn.executemany("INSERT OR REPLACE INTO qualidade (cliente_id, regra, detalhe) VALUES (?, ?, ?)", findings)
+    conn.executemany("INSERT OR REPLACE INTO qualidade_verificados (cliente_id, updated_at) VALUES (?, ?)", checked)
+
+
+def scan(full: bool = False, workers: Optional[int] = None, chunk: int = CHUNK_IDS,
+         progress: Optional[Callable[[int, int], None]] = None) -> Dict[str, int]:
+    """Verifica o banco atual. full=True ignora o que já foi verificado.
+    Retorna {"verificadas", "achados", "faixas"}; progress(feitas, total) por faixa.
+    """
+    path = db.current_path()
+    with db.get_conn() as conn:
+        lo, hi = conn.execute("SELECT MIN(id), MAX(id) FROM clientes").fetchone()
+        # vendas excluídas ou arquivadas saem do relatório
+        conn.execute("DELETE FROM qualidade WHERE cliente_id NOT IN (SELECT id FROM clientes)")
+        conn.execute("DELETE FROM qualidade_verificados WHERE cliente_id NOT IN (SELECT id FROM clientes)")
+    if lo is None:
+        return {"verificadas": 0, "achados": 0, "faixas": 0}
+
+    ranges = [(a, min(a + chunk - 1, hi)) for a in range(lo, hi + 1, chunk)]
+    workers = workers or min(len(ranges), os.cpu_count() or 1)
+    n_checked = n_found = 0
+    with db.get_conn() as conn:
+        if workers <= 1:
+            results = (scan_range(path, a, b, full) for a, b in ranges)
+            ex = None
+        else:
+            ex = ProcessPoolExecutor(max_workers=workers)
+            n = len(ranges)
+            results = ex.map(scan_range, [path] * n, [a for a, _ in ranges], [b for _, b in ranges], [full] * n)
+        try:
+            for i, (checked, findings) in enumerate(results, 1):
+                _save(conn, checked, findings)
+                conn.commit()  # uma faixa por commit: interromper não perde o já feito
+                n_checked += len(checked)
+                n_found += len(findings)
+                if progress is not None:
+                    progress(i, len(ranges))
+        finally:
+            if ex is not None:
+                ex.shutdown()
+    return {"verificadas": n_checked, "achados": n_found, "faixas": len(ranges)}
+
+
+def summary() -> List[Tuple[str, int]]:
+    """(regra, quantidade) na ordem de RULES."""
+    with db.get_conn() as conn:
+        counts = dict(conn.execute("SELECT regra, COUNT(*) FROM qualidade GROUP BY regra"))
+    return [(r, counts[r]) for r in RULES if r in counts]
+
+
+def list_findings(regra: Optional[str] = None, limit: Optional[int] = 1000) -> List[Tuple[int, str, str, str]]:
+    """(id, nome, regra, detalhe) por id; `regra` filtra uma regra só."""
+    sql = ("SELECT q.cliente_id, c.nome_completo, q.regra, q.detalhe FROM qualidade q "
+           "JOIN clientes c ON c.id = q.cliente_id")
+    params: Tuple = ()
+    if regra:
+        sql += " WHERE q.regra = ?"
+        params = (regra,)
+    sql += " ORDER BY q.cliente_id, q.regra"
+    if limit:
+        sql += f" LIMIT {int(limit)}"
+    with db.get_conn() as conn:
+        return list(conn.execute(sql, params))
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Verificação de qualidade dos dados de clientes.")
+    parser.add_argument("--db", default=db.DB_PATH, help="arquivo do banco (padrão: %(default)s)")
+    parser.add_argument("--completo", action="store_true", help="reverifica todas as vendas")
+    parser.add_argument("--processos", type=int, help="processos em paralelo (padrão: nº de CPUs)")
+    parser.add_argument("--listar", action="store_true", help="lista os achados")
+    parser.add_argument("--regra", choices=list(RULES), help="só esta regra na listagem")
+    args = parser.parse_args(argv)
+
+    db.DB_PATH = args.db
+    db.init_db()
+    res = scan(full=args.completo, workers=args.processos)
+    print(f"{res['verificadas']} venda(s) verificada(s) em {res['faixas']} faixa(s).")
+    for regra, n in summary():
+        grav, desc = RULES[regra]
+        print(f"  {n:>7}  [{grav}] {desc}")
+    if args.listar:
+        for cid, nome, regra, detalhe in list_findings(args.regra, limit=None):
+            print(f"{cid:>8}  {nome}  {regra}: {detalhe}")
+
+
+if __name__ == "__main__":
+    main()
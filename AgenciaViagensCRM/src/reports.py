@@ -0,0 +1,175 @@
+# reports.py
+"""Relatórios agrupados de venda, pago, lucro e a receber.
+
+O SQLite agrega primeiro por dia (data da compra, ou dias entre compra e
+ida / ida e volta) sobre um índice que já guarda os dias e os valores:
+voltam alguns milhares de linhas em vez de uma por viagem, que era o que
+custava caro no cursor. Os dias viram meses, anos, dias da semana ou faixas
+em NumPy (ordenação + np.add.reduceat, em int64, sem perder centavos); sem
+NumPy instalado cai num laço Python equivalente.
+
+    python reports.py --por mes --ano 2024
+"""
+from __future__ import annotations
+
+import argparse
+from datetime import date
+from typing import Dict, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - NumPy é opcional
+    np = None
+
+import db
+from utils import format_cents_br
+
+# (rótulo, qtd, venda, pago, lucro, a receber); valores em centavos
+ReportRow = Tuple[str, int, int, int, int, int]
+
+GROUPINGS: Dict[str, str] = {
+    "mes": "Mês da compra",
+    "ano": "Ano da compra",
+    "dia_semana": "Dia da semana da compra",
+    "antecedencia": "Antecedência (compra → ida)",
+    "duracao": "Duração da viagem",
+}
+
+WEEKDAYS = ("Seg", "Ter", "Qua", "Qui", "Sex", "Sáb", "Dom")
+
+# limites inferiores das faixas (dias)
+LEAD_EDGES = (0, 8, 31, 91, 181)
+LEAD_LABELS = ("0–7 dias", "8–30 dias", "31–90 dias", "91–180 dias", "181+ dias")
+LENGTH_EDGES = (0, 1, 4, 8, 15, 31)
+LENGTH_LABELS = ("Bate e volta", "1–3 dias", "4–7 dias", "8–14 dias", "15–30 dias", "31+ dias")
+
+# data 1970-01-01 em date.toordinal()
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+# agrupamento → chave de db.REPORT_KEYS
+_SOURCE_KEY = {"mes": "compra", "ano": "compra", "dia_semana": "compra",
+               "antecedencia": "antecedencia", "duracao": "duracao"}
+
+
+def has_numpy() -> bool:
+    return np is not None
+
+
+def _bucket_label(days: int, edges: Sequence[int], labels: Sequence[str], below: str) -> str:
+    if days < edges[0]:
+        return below
+    i = 0
+    while i + 1 < len(edges) and days >= edges[i + 1]:
+        i += 1
+    return labels[i]
+
+
+# ---------- caminho NumPy ----------
+def _keys_numpy(days, by: str):
+    """(chave inteira por linha, função chave → rótulo) a partir dos dias."""
+    if by in ("mes", "ano"):
+        months = (days - _EPOCH_ORDINAL).astype("datetime64[D]").astype("datetime64[M]").astype("i8")
+        if by == "ano":
+            return months // 12 + 1970, lambda k: f"{k:04d}"
+        return months, lambda k: f"{k // 12 + 1970:04d}-{k % 12 + 1:02d}"
+    if by == "dia_semana":
+        return (days + 6) % 7, lambda k: WEEKDAYS[k]
+    if by == "antecedencia":
+        # faixa 0 reservada para ida antes da compra (dado inconsistente)
+        keys = np.searchsorted(np.asarray(LEAD_EDGES), days, side="right")
+        return keys, lambda k: "Ida antes da compra" if k == 0 else LEAD_LABELS[k - 1]
+    if by == "duracao":
+        keys = np.searchsorted(np.asarray(LENGTH_EDGES), days, side="right")
+        return keys, lambda k: "Volta antes da ida" if k == 0 else LENGTH_LABELS[k - 1]
+    raise ValueError(f"Agrupamento desconhecido: {by}")
+
+
+def _grouped_numpy(day_totals: List[Tuple[int, int, int, int, int]], by: str) -> List[ReportRow]:
+    if not day_totals:
+        if by not in GROUPINGS:
+            raise ValueError(f"Agrupamento desconhecido: {by}")
+        return []
+    agg = np.array(day_totals, dtype="i8")  # dias, qtd, venda, pago, lucro
+    keys, label = _keys_numpy(agg[:, 0], by)
+    order = np.argsort(keys, kind="stable")
+    sk = keys[order]
+    starts = np.concatenate(([0], np.flatnonzero(sk[1:] != sk[:-1]) + 1))
+    sums = np.add.reduceat(agg[order, 1:], starts, axis=0)
+    out: List[ReportRow] = []
+    for k, (n, venda, pago, lucro) in zip(sk[starts].tolist(), sums.tolist()):
+        out.append((label(k), n, venda, pago, lucro, venda - pago))
+    return out
+
+
+# ---------- caminho Python ----------
+def _grouped_python(day_totals: List[Tuple[int, int, int, int, int]], by: str) -> List[ReportRow]:
+    if by not in GROUPINGS:
+        raise ValueError(f"Agrupamento desconhecido: {by}")
+    acc: Dict[object, List[int]] = {}
+    labels: Dict[object, str] = {}
+    for days, n, venda, pago, lucro in day_totals:
+        if by in ("mes", "ano"):
+            d = date.fromordinal(days)
+            key: object = d.year if by == "ano" else (d.year, d.month)
+            lbl = f"{d.year:04d}" if by == "ano" else f"{d.year:04d}-{d.month:02d}"
+        elif by == "dia_semana":
+            key = (days + 6) % 7
+            lbl = WEEKDAYS[key]
+        elif by == "antecedencia":
+            lbl = _bucket_label(days, LEAD_EDGES, LEAD_LABELS, "Ida antes da compra")
+            key = (-1,) if days < 0 else (LEAD_LABELS.index(lbl),)
+        else:
+            lbl = _bucket_label(days, LENGTH_EDGES, LENGTH_LABELS, "Volta antes da ida")
+            key = (-1,) if days < 0 else (LENGTH_LABELS.index(lbl),)
+        a = acc.get(key)
+        if a is None:
+            a = acc[key] = [0, 0, 0, 0]
+            labels[key] = lbl
+        a[0] += n
+        a[1] += venda
+        a[2] += pago
+        a[3] += lucro
+    return [(labels[k], n, v, p, lu, v - p) for k, (n, v, p, lu) in sorted(acc.items())]
+
+
+def grouped_report(by: str = "mes", year: Optional[int] = None) -> List[ReportRow]:
+    """Agregados por grupo, em ordem de chave."""
+    if by not in GROUPINGS:
+        raise ValueError(f"Agrupamento desconhecido: {by}")
+    day_totals = db.report_totals(_SOURCE_KEY[by], year)
+    if np is not None:
+        return _grouped_numpy(day_totals, by)
+    return _grouped_python(day_totals, by)
+
+
+def totals(rows: List[ReportRow]) -> ReportRow:
+    n = sum(r[1] for r in rows)
+    venda, pago, lucro = (sum(r[i] for r in rows) for i in (2, 3, 4))
+    return ("Total", n, venda, pago, lucro, venda - pago)
+
+
+def format_report(rows: List[ReportRow]) -> str:
+    head = ("Grupo", "Qtd", "Venda", "Pago", "Lucro", "A receber")
+    body = [(r[0], str(r[1]), *(format_cents_br(v) for v in r[2:])) for r in rows + [totals(rows)]]
+    widths = [max(len(x[i]) for x in [head] + body) for i in range(len(head))]
+    lines = ["  ".join(c.ljust(w) if i == 0 else c.rjust(w) for i, (c, w) in enumerate(zip(row, widths)))
+             for row in [head] + body]
+    lines.insert(1, "-" * len(lines[0]))
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Relatórios agrupados da agência.")
+    parser.add_argument("--db", default=db.DB_PATH, help="arquivo do banco (padrão: %(default)s)")
+    parser.add_argument("--por", choices=sorted(GROUPINGS), default="mes", help="agrupamento")
+    parser.add_argument("--ano", type=int, help="só compras deste ano")
+    args = parser.parse_args(argv)
+
+    db.DB_PATH = args.db
+    db.init_db()
+    print(f"{GROUPINGS[args.por]}" + (f" — {args.ano}" if args.ano else ""))
+    print(format_report(grouped_report(args.por, args.ano)))
+
+
+if __name__ == "__main__":
+    main()
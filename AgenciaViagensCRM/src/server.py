@@ -0,0 +1,277 @@
+# server.py
+"""Serviço HTTP/JSON sobre db.py para várias estações de agentes.
+
+Um único processo abre o banco (um escritor + pool de leitores) e os
+app.py dos agentes falam com ele em modo cliente (client.RemoteDB).
+
+    python server.py --db agencia_viagens.db --porta 8765
+
+Rotas (JSON):
+    GET    /saude
+    GET    /clientes?busca=&limite=&offset=&arquivo=1
+    GET    /clientes/<id>
+    GET    /clientes/<id>/historico
+    GET    /clientes-por-nome?prefixo=&limite=&apos_nome=&apos_id=
+    POST   /clientes              corpo: campos de insert_cliente
+    PUT    /clientes/<id>         corpo: campos de update_cliente
+    DELETE /clientes/<id>
+    GET    /mes-ano?ano=&mes=
+    GET    /lucro?ano=&mes=
+    GET    /anos
+    GET    /partidas?data=AAAA-MM-DD
+    GET    /recebiveis?limite=&apos_ida=AAAA-MM-DD&apos_id=
+    GET    /total-recebiveis
+    GET    /aniversarios?de=AAAA-MM-DD&ate=AAAA-MM-DD
+    GET    /relatorio?por=mes|ano|dia_semana|antecedencia|duracao&ano=
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+import db
+import reports
+
+DEFAULT_PORT = 8765
+MAX_BODY = 1024 * 1024
+
+
+class PooledHTTPServer(HTTPServer):
+    """HTTPServer que atende cada conexão em um pool fixo de threads."""
+
+    daemon_threads = True
+
+    def __init__(self, addr: Tuple[str, int], handler, workers: int = 32, token: Optional[str] = None) -> None:
+        super().__init__(addr, handler)
+        self.token = token
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="http")
+
+    def process_request(self, request, client_address) -> None:
+        self._executor.submit(self._process, request, client_address)
+
+    def _process(self, request, client_address) -> None:
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self) -> None:
+        super().server_close()
+        self._executor.shutdown(wait=True)
+
+
+class HttpError(Exception):
+    def __init__(self, status: int, msg: str) -> None:
+        super().__init__(msg)
+        self.status = status
+
+
+def _int_arg(qs: Dict[str, List[str]], name: str) -> Optional[int]:
+    v = (qs.get(name) or [""])[0].strip()
+    if not v:
+        return None
+    try:
+        return int(v)
+    except ValueError:
+        raise HttpError(400, f"Parâmetro '{name}' inválido.") from None
+
+
+def _json_default(obj: Any) -> Any:
+    if isinstance(obj, db.Cliente):
+        return obj.as_list()
+    raise TypeError(f"{type(obj).__name__} não é serializável em JSON")
+
+
+class Handler(BaseHTTPRequestHandler):
+    server: PooledHTTPServer
+    server_version = "AgenciaViagensCRM/1.0"
+
+    def log_message(self, fmt: str, *args: Any) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        self._dispatch("GET")
+
+    def do_POST(self) -> None:
+        self._dispatch("POST")
+
+    def do_PUT(self) -> None:
+        self._dispatch("PUT")
+
+    def do_DELETE(self) -> None:
+        self._dispatch("DELETE")
+
+    # ---------- infraestrutura ----------
+    def _send(self, status: int, payload: Dict[str, Any]) -> None:
+        body = json.dumps(payload, ensure_ascii=False, default=_json_default).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _body(self) -> Dict[str, Any]:
+        size = int(self.headers.get("Content-Length") or 0)
+        if size <= 0 or size > MAX_BODY:
+            raise HttpError(400, "Corpo JSON ausente ou grande demais.")
+        try:
+            data = json.loads(self.rfile.read(size).decode("utf-8"))
+        except ValueError:
+            raise HttpError(400, "JSON inválido.") from None
+        if not isinstance(data, dict):
+            raise HttpError(400, "O corpo deve ser um objeto JSON.")
+        return data
+
+    def _dispatch(self, method: str) -> None:
+        try:
+            if self.server.token and self.headers.get("X-Token") != self.server.token:
+                raise HttpError(401, "Token inválido.")
+            url = urlsplit(self.path)
+            parts = [p for p in url.path.split("/") if p]
+            payload = self._route(method, parts, parse_qs(url.query))
+            self._send(200, payload)
+        except HttpError as exc:
+            self._send(exc.status, {"erro": str(exc)})
+        except (ValueError, KeyError) as exc:
+            self._send(400, {"erro": f"Dados inválidos: {exc}"})
+        except sqlite3.IntegrityError as exc:
+            self._send(409, {"erro": str(exc)})
+        except Exception as exc:
+            self._send(500, {"erro": str(exc)})
+
+    # ---------- rotas ----------
+    def _route(self, method: str, parts: List[str], qs: Dict[str, List[str]]) -> Dict[str, Any]:
+        head = parts[0] if parts else ""
+        cid: Optional[int] = None
+        if head == "clientes" and len(parts) in (2, 3):
+            try:
+                cid = int(parts[1])
+            except ValueError:
+                raise HttpError(404, "Cliente não encontrado.") from None
+
+        if method == "GET":
+            if head == "saude" and len(parts) == 1:
+                return {"ok": True, "db": os.path.basename(db.DB_PATH)}
+            if head == "clientes" and cid is None and len(parts) == 1:
+                busca = (qs.get("busca") or [""])[0]
+                limite = _int_arg(qs, "limite")
+                offset = _int_arg(qs, "offset") or 0
+                arquivo = (qs.get("arquivo") or ["0"])[0] == "1"
+                rows = db.list_clientes(busca, include_archive=arquivo, limit=limite, offset=offset)
+                return {"rows": rows}
+            if head == "clientes" and cid is not None and len(parts) == 3:
+                if parts[2] != "historico":
+                    raise HttpError(404, "Rota não encontrada.")
+                return {"rows": db.customer_history(cid)}
+            if head == "clientes" and cid is not None:
+                row = db.get_cliente(cid)
+                if row is None:
+                    raise HttpError(404, "Cliente não encontrado.")
+                return {"row": row}
+            if head == "clientes-por-nome":
+                apos_nome = (qs.get("apos_nome") or [""])[0]
+                apos_id = _int_arg(qs, "apos_id")
+                after = (apos_nome, apos_id) if apos_id is not None else None
+                prefixo = (qs.get("prefixo") or [""])[0]
+                return {"rows": db.list_clientes_by_name(prefixo, _int_arg(qs, "limite") or 200, after)}
+            if head == "total-clientes":
+                return {"total": db.count_clientes((qs.get("busca") or [""])[0])}
+            if head == "mes-ano":
+                ano = _int_arg(qs, "ano")
+                if ano is None:
+                    raise HttpError(400, "Informe 'ano'.")
+                return {"rows": db.list_by_month_year(ano, _int_arg(qs, "mes"))}
+            if head == "lucro":
+                return {"total": db.sum_lucro(_int_arg(qs, "ano"), _int_arg(qs, "mes"))}
+            if head == "anos":
+                return {"anos": db.available_years()}
+            if head == "partidas":
+                try:
+                    alvo = date.fromisoformat((qs.get("data") or [""])[0])
+                except ValueError:
+                    raise HttpError(400, "Parâmetro 'data' inválido (AAAA-MM-DD).") from None
+                return {"rows": db.flights_departing_on(alvo)}
+            if head == "recebiveis":
+                apos_ida = (qs.get("apos_ida") or [""])[0]
+                apos_id = _int_arg(qs, "apos_id")
+                after = (apos_ida, apos_id) if apos_ida and apos_id is not None else None
+                return {"rows": db.list_receivables(_int_arg(qs, "limite") or 200, after)}
+            if head == "total-recebiveis":
+                n, total = db.receivables_total()
+                return {"quantidade": n, "total": total}
+            if head == "aniversarios":
+                try:
+                    de = date.fromisoformat((qs.get("de") or [""])[0])
+                    ate = date.fromisoformat((qs.get("ate") or [""])[0])
+                except ValueError:
+                    raise HttpError(400, "Parâmetros 'de'/'ate' inválidos (AAAA-MM-DD).") from None
+                return {"rows": db.birthdays_between(de, ate)}
+            if head == "relatorio":
+                por = (qs.get("por") or ["mes"])[0]
+                if por not in reports.GROUPINGS:
+                    raise HttpError(400, f"Agrupamento inválido: {por}")
+                return {"rows": reports.grouped_report(por, _int_arg(qs, "ano"))}
+        elif method == "POST" and head == "clientes" and len(parts) == 1:
+            return {"id": db.insert_cliente(self._body())}
+        elif method == "PUT" and cid is not None and len(parts) == 2:
+            db.update_cliente(cid, self._body())
+            return {"ok": True}
+        elif method == "DELETE" and cid is not None and len(parts) == 2:
+            db.delete_cliente(cid)
+            return {"ok": True}
+        raise HttpError(404, "Rota não encontrada.")
+
+
+def make_server(
+    host: str = "127.0.0.1",
+    port: int = DEFAULT_PORT,
+    workers: int = 32,
+    readers: int = 4,
+    token: Optional[str] = None,
+    group_commit_ms: float = 5.0,
+) -> PooledHTTPServer:
+    """Prepara banco + pool de conexões (+ fila de commit em grupo) e devolve o servidor (sem iniciar)."""
+    db.init_db()
+    db.install_pool(readers=readers)
+    if group_commit_ms > 0:
+        db.enable_write_queue(window_ms=group_commit_ms)
+    return PooledHTTPServer((host, port), Handler, workers=workers, token=token)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Serviço HTTP/JSON do CRM da agência.")
+    parser.add_argument("--db", default=db.DB_PATH, help="arquivo do banco (padrão: %(default)s)")
+    parser.add_argument("--host", default="127.0.0.1", help="use 0.0.0.0 para a rede local")
+    parser.add_argument("--porta", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, default=32, help="threads de atendimento")
+    parser.add_argument("--leitores", type=int, default=4, help="conexões de leitura")
+    parser.add_argument("--group-commit-ms", type=float, default=5.0,
+                        help="janela para juntar gravações em um commit (0 = um commit por gravação)")
+    parser.add_argument("--token", default=os.environ.get("TRAVELCRM_TOKEN"),
+                        help="segredo exigido no cabeçalho X-Token (padrão: $TRAVELCRM_TOKEN)")
+    args = parser.parse_args(argv)
+
+    db.DB_PATH = args.db
+    httpd = make_server(args.host, args.porta, args.workers, args.leitores, args.token, args.group_commit_ms)
+    print(f"Servindo {args.db} em http://{args.host}:{args.porta}")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
+        db.disable_write_queue()
+        db.uninstall_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+# sessions.py
+"""Sessões por arquivo de banco para o app (modo local).
+
+Cada sessão faz o init_db uma única vez, mantém o pool de conexões do
+arquivo aberto e guarda as leituras das telas (anos, totais, lista sem
+filtro, meses da janela Mês/Ano e relatórios agrupados). O cache vale até
+alguma conexão gravar no arquivo, detectado por PRAGMA data_version, então
+gravações de outros processos (sync.py, server.py) também o invalidam.
+
+SessionCache guarda as últimas sessões usadas (LRU): voltar para um banco
+recente não repete migração, conexões nem consultas.
+
+Nenhuma sessão mexe em db.DB_PATH: cada chamada roda dentro de
+db.bound_to(self.path), então a pré-carga e os workers de uma sessão leem
+sempre o próprio arquivo, mesmo que o app já tenha trocado de banco.
+"""
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from contextlib import AbstractContextManager
+from functools import wraps
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+import db
+import reports
+
+DEFAULT_MAX_SESSIONS = 3
+
+
+class DatabaseSession:
+    """Mesma interface das funções de db.py, presa a um arquivo.
+    As leituras das telas passam pelo cache; o resto vai direto.
+    """
+
+    def __init__(self, path: str, readers: int = 2) -> None:
+        self.path = path
+        with db.bound_to(path):
+            db.init_db()
+            db.install_pool(readers=readers, path=path)
+        # conexão só para ler data_version: muda quando outra conexão grava
+        self._probe = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._version = self._data_version()
+        self._cache: Dict[Hashable, Any] = {}
+
+    def _data_version(self) -> int:
+        return int(self._probe.execute("PRAGMA data_version").fetchone()[0])
+
+    def bound(self) -> AbstractContextManager:
+        """Chamadas diretas a db e aos módulos locais (backup, quality...) dentro
+        do `with` usam este arquivo. Threads novas precisam entrar de novo."""
+        return db.bound_to(self.path)
+
+    def close(self) -> None:
+        db.uninstall_pool(self.path)
+        with self._lock:
+            self._probe.close()
+            self._cache.clear()
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+    def cached(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            version = self._data_version()
+            if version != self._version:
+                self._version = version
+                self._cache.clear()
+            if key in self._cache:
+                return self._cache[key]
+        with self.bound():
+            value = fn()
+        with self._lock:
+            # só guarda se ninguém gravou enquanto a consulta rodava
+            if self._data_version() == self._version:
+                self._cache[key] = value
+        return value
+
+    # ---------- leituras com cache ----------
+    def available_years(self) -> List[int]:
+        return self.cached(("anos",), db.available_years)
+
+    def sum_lucro(self, year: Optional[int] = None, month: Optional[int] = None) -> int:
+        return self.cached(("lucro", year, month), lambda: db.sum_lucro(year, month))
+
+    def list_clientes(self, search: str = "", include_archive: bool = False,
+                      limit: Optional[int] = None, offset: int = 0) -> List[db.Cliente]:
+        if search or include_archive or limit is not None or offset:
+            with self.bound():
+                return db.list_clientes(search, include_archive, limit, offset)
+        return self.cached(("clientes",), db.list_clientes)
+
+    def list_by_month_year(self, year: int, month: Optional[int]) -> List[db.Cliente]:
+        return self.cached(("mes_ano", year, month), lambda: db.list_by_month_year(year, month))
+
+    def grouped_report(self, by: str = "mes", year: Optional[int] = None) -> List[reports.ReportRow]:
+        return self.cached(("relatorio", by, year), lambda: reports.grouped_report(by, year))
+
+    def __getattr__(self, name: str) -> Any:
+        # demais funções de db.py (gravações, janelas, alertas), sem cache,
+        # chamadas já presas a este arquivo
+        attr = getattr(db, name)
+        if not callable(attr) or isinstance(attr, type):
+            return attr
+
+        @wraps(attr)
+        def call(*args: Any, **kwargs: Any) -> Any:
+            with self.bound():
+                return attr(*args, **kwargs)
+        return call
+
+
+class SessionCache:
+    """Últimas `max_sessions` sessões abertas, a mais antiga é fechada primeiro."""
+
+    def __init__(self, max_sessions: int = DEFAULT_MAX_SESSIONS) -> None:
+        self.max_sessions = max(1, max_sessions)
+        self._sessions: "OrderedDict[str, DatabaseSession]" = OrderedDict()
+
+    @staticmethod
+    def _key(path: str) -> str:
+        return os.path.normcase(os.path.abspath(path))
+
+    def open(self, path: str) -> Tuple[DatabaseSession, bool]:
+        """Sessão de `path` (criando se preciso). Retorna (sessão, já estava aberta)."""
+        key = self._key(path)
+        session = self._sessions.pop(key, None)
+        warm = session is not None
+        if session is None:
+            session = DatabaseSession(path)
+        self._sessions[key] = session
+        while len(self._sessions) > self.max_sessions:
+            _, old = self._sessions.popitem(last=False)
+            old.close()
+        return session, warm
+
+    def paths(self) -> List[str]:
+        return [s.path for s in self._sessions.values()]
+
+    def close_all(self) -> None:
+        while self._sessions:
+            self._sessions.popitem()[1].close()
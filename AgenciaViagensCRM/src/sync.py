@@ -0,0 +1,62 @@
+# sync.py
+"""Sincroniza filiais trocando só as alterações (clientes_changes).
+
+    python sync.py filial_centro.db matriz.db            # centro → matriz
+    python sync.py filial_centro.db matriz.db --nos-dois-sentidos
+"""
+from __future__ import annotations
+
+import argparse
+from typing import Dict, List, Optional
+
+import db
+
+DEFAULT_BATCH = 1000
+
+
+def sync(origem: str, destino: str, lote: int = DEFAULT_BATCH) -> Dict[str, object]:
+    """Leva para `destino` as alterações de `origem` ainda não aplicadas.
+    O custo é proporcional ao número de alterações, não ao tamanho da tabela.
+    """
+    with db.bound_to(origem):
+        db.init_db()
+        origem_uid = db.database_uid()
+    with db.bound_to(destino):
+        db.init_db()
+        desde = db.sync_position(origem_uid)
+
+    aplicadas = 0
+    conflitos: List[Dict[str, object]] = []
+    while True:
+        with db.bound_to(origem):
+            batch = db.export_changes_since(desde, limit=lote)
+        if not batch:
+            break
+        with db.bound_to(destino):
+            res = db.apply_changes(batch, origem_uid=origem_uid)
+        aplicadas += int(res["aplicadas"])
+        conflitos.extend(res["conflitos"])
+        desde = int(res["ultimo_seq"])
+    return {"aplicadas": aplicadas, "conflitos": conflitos, "ultimo_seq": desde}
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Sincronização incremental entre bancos de filiais.")
+    parser.add_argument("origem")
+    parser.add_argument("destino")
+    parser.add_argument("--nos-dois-sentidos", action="store_true", help="também leva destino → origem")
+    parser.add_argument("--lote", type=int, default=DEFAULT_BATCH)
+    args = parser.parse_args(argv)
+
+    pares = [(args.origem, args.destino)]
+    if args.nos_dois_sentidos:
+        pares.append((args.destino, args.origem))
+    for a, b in pares:
+        res = sync(a, b, args.lote)
+        print(f"{a} → {b}: {res['aplicadas']} alteração(ões) aplicada(s), {len(res['conflitos'])} conflito(s)")
+        for c in res["conflitos"]:
+            print(f"  conflito seq {c['seq']} ({c['op']}) uid {c['uid']}: {c['motivo']}")
+
+
+if __name__ == "__main__":
+    main()
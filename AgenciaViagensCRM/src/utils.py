@@ -1,7 +1,11 @@
 from __future__ import annotations
+import re
+import unicodedata
+from array import array
 from datetime import datetime, date, timedelta
 from decimal import Decimal, InvalidOperation
-from typing import Optional
+from functools import lru_cache
+from typing import Iterable, List, Optional, Tuple
 from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
 
 # ========= Datas =========
@@ -19,6 +23,13 @@ def iso_to_br(date_str: Optional[str]) -> str:
 
 # -------- Moeda ---------
 
+# Formatos comuns ('R$ 1.234,56', '-1234,5', '1234.56', '1234'), sem
+# arredondamento: dão o mesmo resultado que o caminho com Decimal abaixo.
+_CURRENCY_FAST = re.compile(
+    r"\s*(-)?\s*(?:R\$)?\s*(-)?\s*"
+    r"(?:([0-9]{1,3}(?:\.[0-9]{3})+|[0-9]+),([0-9]{1,2})|([0-9]+)(?:\.([0-9]{1,2}))?)\s*"
+)
+
 def parse_currency_to_cents(value: Optional[str]) -> int:
     """Converte string de moeda BR/US para centavos (int).
     Aceita:
@@ -33,6 +44,17 @@ def parse_currency_to_cents(value: Optional[str]) -> int:
     if s == "":
         return 0
 
+    m = _CURRENCY_FAST.fullmatch(s)
+    if m is not None:
+        neg1, neg2, br_int, br_frac, int_part, frac = m.groups()
+        if br_int is not None:
+            int_part, frac = br_int.replace(".", ""), br_frac
+        cents = int(int_part) * 100 + (int(frac.ljust(2, "0")) if frac else 0)
+        return -cents if (neg1 or neg2) else cents
+
+    return _parse_currency_slow(s)
+
+def _parse_currency_slow(s: str) -> int:
     # sinal por parênteses
     negative = False
     if "(" in s and ")" in s:
@@ -88,7 +110,39 @@ def parse_currency_to_cents(value: Optional[str]) -> int:
     # arredonda para centavos
     return int((dec * 100).quantize(Decimal("1"), rounding=ROUND_HALF_UP))
 
-
+def parse_currency_many(values: Iterable[Optional[str]]) -> Tuple[array, List[int]]:
+    """parse_currency_to_cents em lote (importações). Retorna os centavos em
+    array('q') e os índices dos valores inválidos (que ficam como 0).
+    """
+    out: List[int] = []
+    errors: List[int] = []
+    fast = _CURRENCY_FAST.fullmatch
+    for i, v in enumerate(values):
+        m = fast(v) if type(v) is str else None
+        if m is not None:
+            neg1, neg2, br_int, br_frac, int_part, frac = m.groups()
+            if br_int is not None:
+                int_part, frac = br_int.replace(".", ""), br_frac
+            cents = int(int_part) * 100 + (int(frac.ljust(2, "0")) if frac else 0)
+            out.append(-cents if (neg1 or neg2) else cents)
+            continue
+        try:
+            if type(v) is str:
+                # o fast já falhou; o strip não muda isso (\s* nas pontas)
+                s = v.strip()
+                out.append(_parse_currency_slow(s) if s else 0)
+            else:
+                out.append(parse_currency_to_cents(v))
+        except ValueError:
+            out.append(0)
+            errors.append(i)
+    try:
+        return array("q", out), errors
+    except OverflowError:
+        big = [i for i, c in enumerate(out) if not -2**63 <= c < 2**63]
+        for i in big:
+            out[i] = 0
+        return array("q", out), sorted(errors + big)
 
 def format_cents_br(cents: Optional[int]) -> str:
     if cents is None:
@@ -101,6 +155,53 @@ def format_cents_br(cents: Optional[int]) -> str:
     txt = f"R$ {reais_str},{centavos:02d}"
     return f"-{txt}" if negative else txt
 
+# -------- Formatação em lote (tabelas) ---------
+# refresh_table/populate formatam 3-4 datas e 3 valores por linha. Para
+# datas ISO válidas (dígitos ASCII, dia que existe, ano >= 1000) o
+# fatiamento dá o mesmo texto que iso_to_br sem o strptime/strftime; a
+# validação é um date() com inteiros. Qualquer outra coisa passa por
+# iso_to_br (mesmo resultado, inclusive o erro). Valores de venda/pago se repetem muito
+# (pacotes, taxas), então o texto fica em cache.
+
+format_cents_br_cached = lru_cache(maxsize=65536)(format_cents_br)
+
+def iso_to_br_fast(date_str: Optional[str]) -> str:
+    if not date_str:
+        return ""
+    if len(date_str) == 10 and date_str[4] == "-" and date_str[7] == "-" and date_str.isascii():
+        y, m, d = date_str[:4], date_str[5:7], date_str[8:]
+        # ano < 1000: o strftime do iso_to_br não põe zeros à esquerda em todo SO
+        if y.isdigit() and m.isdigit() and d.isdigit() and y[0] != "0":
+            try:
+                date(int(y), int(m), int(d))
+            except ValueError:
+                pass
+            else:
+                return f"{d}/{m}/{y}"
+    return iso_to_br(date_str)
+
+def format_cliente_rows(rows: Iterable) -> List[Tuple]:
+    """Clientes de list_clientes/list_by_month_year → tuplas de exibição
+    (id, nome, nascimento, compra, ida, volta, documento, venda, pago, lucro).
+    """
+    d = iso_to_br_fast
+    m = format_cents_br_cached
+    return [
+        (r.id, r.nome_completo, d(r.data_nascimento), d(r.data_compra_voo), d(r.data_ida), d(r.data_volta),
+         f"{r.doc_tipo}: {r.doc_valor}", m(r.valor_venda_cents), m(r.valor_pago_cents), m(r.valor_lucro_cents))
+        for r in rows
+    ]
+
+# -------- Nomes ---------
+
+def fold_nome(nome: Optional[str]) -> str:
+    """Chave de ordenação/busca: NFKD sem acentos, casefold, espaços únicos
+    ("Álvaro" → "alvaro", "JOÃO  Silva" → "joao silva").
+    """
+    s = unicodedata.normalize("NFKD", nome or "")
+    s = "".join(ch for ch in s if not unicodedata.combining(ch))
+    return " ".join(s.casefold().split())
+
 # -------- CPF ---------
 
 def somente_digitos(s: Optional[str]) -> str:
@@ -119,6 +220,14 @@ def valido_cpf(cpf: str) -> bool:
     d2 = _calc_digito(cpf[:9] + d1)
     return cpf[-2:] == d1 + d2
 
+def normalize_doc(doc_tipo: Optional[str], doc_valor: Optional[str]) -> str:
+    """Documento comparável entre vendas: CPF só dígitos; passaporte só
+    letras/dígitos em maiúsculas ("ab 123-4" → "AB1234").
+    """
+    if doc_tipo == "CPF":
+        return somente_digitos(doc_valor)
+    return "".join(ch for ch in (doc_valor or "") if ch.isalnum()).upper()
+
 # --------- Outros ---------
 
 def compute_lucro_cents_from_strings(
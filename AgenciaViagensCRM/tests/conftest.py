@@ -0,0 +1,43 @@
+# conftest.py
+from __future__ import annotations
+
+import os
+import sys
+from typing import Callable, Dict
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import db  # noqa: E402
+
+
+@pytest.fixture
+def banco(tmp_path, monkeypatch) -> str:
+    """Banco novo (init_db já feito) como DB_PATH do teste."""
+    path = str(tmp_path / "agencia.db")
+    monkeypatch.setattr(db, "DB_PATH", path)
+    db.init_db()
+    return path
+
+
+@pytest.fixture
+def venda() -> Callable[..., Dict[str, object]]:
+    """Dados de uma venda para insert_cliente; kwargs sobrescrevem os campos."""
+    def make(**kw: object) -> Dict[str, object]:
+        data: Dict[str, object] = {
+            "nome_completo": "Ana Souza",
+            "data_nascimento": "1990-05-10",
+            "data_compra_voo": "2019-05-02",
+            "doc_tipo": "CPF",
+            "doc_valor": "123.456.789-09",
+            "valor_venda_cents": 100000,
+            "valor_lucro_cents": 20000,
+            "valor_pago_cents": 80000,
+            "data_ida": "2019-06-01",
+            "data_volta": "2019-06-10",
+            "doc_voo_path": None,
+        }
+        data.update(kw)
+        return data
+    return make
@@ -0,0 +1,60 @@
+# test_archive.py
+"""archive_before: as viagens saem da tabela principal, mas os relatórios
+por período (sum_lucro, list_by_month_year, available_years) continuam
+vendo tudo.
+"""
+from __future__ import annotations
+
+import os
+from datetime import date
+
+import pytest
+
+import db
+
+
+@pytest.fixture
+def vendas(banco, venda):
+    """Três vendas (2018, 2019 e 2024) já com 2018/2019 no arquivo."""
+    antigas = [
+        db.insert_cliente(venda(data_compra_voo="2018-03-05", data_ida="2018-04-01", data_volta="2018-04-10",
+                                valor_lucro_cents=1000, doc_valor="111.111.111-11")),
+        db.insert_cliente(venda(data_compra_voo="2019-05-02", data_ida="2019-06-01", data_volta=None,
+                                valor_lucro_cents=2000, doc_valor="222.222.222-22")),
+    ]
+    nova = db.insert_cliente(venda(data_compra_voo="2024-05-02", data_ida="2024-06-01", data_volta="2024-06-10",
+                                   valor_lucro_cents=4000, doc_valor="333.333.333-33"))
+    assert db.archive_before(date(2022, 1, 1)) == 2
+    return antigas, nova
+
+
+def test_move_para_o_arquivo(vendas):
+    antigas, nova = vendas
+    assert os.path.exists(db.archive_path())
+    assert [c.id for c in db.list_clientes()] == [nova]
+    assert sorted(c.id for c in db.list_clientes(include_archive=True)) == sorted(antigas + [nova])
+    assert db.get_cliente(antigas[0]) is None
+
+
+def test_reexecutar_nao_duplica(vendas):
+    antigas, nova = vendas
+    assert db.archive_before(date(2022, 1, 1)) == 0
+    assert len(db.list_clientes(include_archive=True)) == 3
+
+
+def test_relatorios_somam_o_arquivo(vendas):
+    antigas, nova = vendas
+    assert db.sum_lucro() == 7000
+    assert db.sum_lucro(2018) == 1000
+    assert db.sum_lucro(2019, 5) == 2000
+    assert db.sum_lucro(2019, 6) == 0
+    assert db.sum_lucro(2024) == 4000
+    assert [c.id for c in db.list_by_month_year(2019, 5)] == [antigas[1]]
+    assert [c.id for c in db.list_by_month_year(2024, None)] == [nova]
+    assert db.available_years() == [2018, 2019, 2024]
+
+
+def test_ano_depois_do_arquivo_nao_anexa(vendas, monkeypatch):
+    # anos mais novos que o arquivado só leem a tabela principal
+    monkeypatch.setattr(db, "_attach_archive", lambda *a, **k: pytest.fail("anexou o arquivo"))
+    assert db.sum_lucro(2024) == 4000
@@ -0,0 +1,44 @@
+# test_backup.py
+"""Backup online: o arquivo de viagens antigas vai junto e roda junto."""
+from __future__ import annotations
+
+import os
+from datetime import date
+
+import backup
+import db
+
+
+def test_backup_leva_o_arquivo_de_viagens(banco, venda, tmp_path):
+    db.insert_cliente(venda())
+    db.insert_cliente(venda(nome_completo="Bruno", data_compra_voo="2024-03-01",
+                            data_ida="2024-04-01", data_volta="2024-04-05"))
+    assert db.archive_before(date(2022, 1, 1)) == 1
+
+    final = backup.backup_to(str(tmp_path / "copia.db"))
+    assert os.path.exists(backup.companion_path(final))
+    with db.bound_to(final):
+        assert [c.nome_completo for c in db.list_by_month_year(2019, 5)] == ["Ana Souza"]
+        assert db.available_years() == [2019, 2024]
+        assert db.sum_lucro() == 40000
+
+
+def test_rotacao_apaga_o_arquivo_junto(banco, venda, tmp_path, monkeypatch):
+    db.insert_cliente(venda())
+    db.archive_before(date(2022, 1, 1))
+    pasta = tmp_path / "bk"
+    pasta.mkdir()
+    for stamp in ("20240101-000000", "20240102-000000", "20240103-000000"):
+        backup.backup_to(str(pasta / f"agencia-{stamp}.db"))
+    final = backup.rotating_backup(str(pasta), keep=2)
+    restantes = sorted(os.listdir(pasta))
+    assert backup.list_backups(str(pasta)) == [str(pasta / "agencia-20240103-000000.db"), final]
+    assert len(restantes) == 4
+    assert all(os.path.exists(backup.companion_path(p)) for p in backup.list_backups(str(pasta)))
+
+
+def test_backup_comprimido_sem_arquivo(banco, venda, tmp_path):
+    db.insert_cliente(venda())
+    final = backup.backup_to(str(tmp_path / "copia.db"), compress=True)
+    assert final.endswith(".db.gz")
+    assert not os.path.exists(backup.companion_path(final))
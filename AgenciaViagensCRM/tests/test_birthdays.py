@@ -0,0 +1,45 @@
+# test_birthdays.py
+"""birthdays_between: virada do ano, 29/02 e uma linha por pessoa."""
+from __future__ import annotations
+
+from datetime import date
+
+import db
+
+
+def _nomes(start, end):
+    return [r[1] for r in db.birthdays_between(start, end)]
+
+
+def test_virada_do_ano_em_ordem(banco, venda):
+    db.insert_cliente(venda(nome_completo="Dezembro", data_nascimento="1980-12-30", doc_valor="111.111.111-11"))
+    db.insert_cliente(venda(nome_completo="Janeiro", data_nascimento="1985-01-02", doc_valor="222.222.222-22"))
+    db.insert_cliente(venda(nome_completo="Junho", data_nascimento="1990-06-15", doc_valor="333.333.333-33"))
+    assert _nomes(date(2024, 12, 28), date(2025, 1, 5)) == ["Dezembro", "Janeiro"]
+    assert _nomes(date(2025, 1, 5), date(2024, 12, 28)) == []
+
+
+def test_29_de_fevereiro(banco, venda):
+    db.insert_cliente(venda(nome_completo="Bissexto", data_nascimento="2000-02-29"))
+    # ano não bissexto: comemora em 28/02
+    assert _nomes(date(2025, 2, 28), date(2025, 2, 28)) == ["Bissexto"]
+    assert _nomes(date(2025, 3, 1), date(2025, 3, 1)) == []
+    # ano bissexto: só em 29/02
+    assert _nomes(date(2024, 2, 28), date(2024, 2, 28)) == []
+    assert _nomes(date(2024, 2, 29), date(2024, 2, 29)) == ["Bissexto"]
+
+
+def test_uma_linha_por_pessoa_mesmo_com_documento_digitado_diferente(banco, venda):
+    db.insert_cliente(venda(doc_valor="123.456.789-09", data_compra_voo="2023-01-01"))
+    ultima = db.insert_cliente(venda(doc_valor="12345678909", data_compra_voo="2024-01-01"))
+    rows = db.birthdays_between(date(2025, 5, 1), date(2025, 5, 31))
+    assert [r[0] for r in rows] == [ultima]
+
+
+def test_arquivo_entra_sem_duplicar(banco, venda):
+    db.insert_cliente(venda(data_compra_voo="2019-01-01", data_ida="2019-02-01", data_volta="2019-02-10"))
+    db.insert_cliente(venda(data_compra_voo="2024-01-01", data_ida="2024-02-01", data_volta="2024-02-10"))
+    db.insert_cliente(venda(nome_completo="Só no arquivo", doc_valor="999.999.999-99",
+                            data_compra_voo="2018-01-01", data_ida="2018-02-01", data_volta="2018-02-10"))
+    db.archive_before(date(2022, 1, 1))
+    assert sorted(_nomes(date(2025, 5, 1), date(2025, 5, 31))) == ["Ana Souza", "Só no arquivo"]
@@ -0,0 +1,46 @@
+# test_client.py
+"""RemoteDB contra um server.py de verdade (porta livre, thread)."""
+from __future__ import annotations
+
+import threading
+
+import pytest
+
+import db
+import server
+from client import RemoteDB, RemoteError
+
+
+@pytest.fixture
+def remoto(banco):
+    httpd = server.make_server(port=0, workers=4, readers=1, group_commit_ms=0)
+    t = threading.Thread(target=httpd.serve_forever, daemon=True)
+    t.start()
+    try:
+        yield RemoteDB(f"http://127.0.0.1:{httpd.server_address[1]}", token="", timeout=5)
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+        db.uninstall_pool()
+
+
+def test_get_cliente_existente_e_inexistente(remoto, venda):
+    cid = remoto.insert_cliente(venda())
+    assert remoto.get_cliente(cid).nome_completo == "Ana Souza"
+    assert remoto.get_cliente(cid + 1000) is None
+
+
+def test_get_cliente_erro_do_servidor_nao_vira_none(remoto, monkeypatch):
+    def quebra(_cid):
+        raise RuntimeError("disco cheio")
+    monkeypatch.setattr(db, "get_cliente", quebra)
+    with pytest.raises(RemoteError) as info:
+        remoto.get_cliente(1)
+    assert info.value.status == 500
+
+
+def test_get_cliente_servidor_fora_do_ar():
+    offline = RemoteDB("http://127.0.0.1:9", token="", timeout=1)
+    with pytest.raises(RemoteError) as info:
+        offline.get_cliente(1)
+    assert info.value.status is None
@@ -0,0 +1,84 @@
+# test_columnar.py
+"""export_columnar: o .npz (e o Parquet, com pyarrow) volta com os mesmos
+valores, datas NULL como NaT/null, em vários grupos de linhas.
+"""
+from __future__ import annotations
+
+from datetime import date
+
+import pytest
+
+import columnar
+import db
+
+np = pytest.importorskip("numpy")
+
+
+@pytest.fixture
+def vendas(banco, venda):
+    """Quatro vendas: uma sem volta e uma com data de ida malformada."""
+    ids = [
+        db.insert_cliente(venda(nome_completo="Ana", data_compra_voo="2024-01-04", valor_venda_cents=-5)),
+        db.insert_cliente(venda(nome_completo="Bruno", data_compra_voo="2024-01-03", data_volta=None)),
+        db.insert_cliente(venda(nome_completo="Carla", data_compra_voo="2024-01-02", doc_tipo="Passaporte",
+                                doc_valor="AB1234")),
+        db.insert_cliente(venda(nome_completo="Davi", data_compra_voo="2024-01-01", valor_pago_cents=10**15)),
+    ]
+    # gravada por fora do db.py: ida_dia fica NULL
+    conn = db.get_conn()
+    with conn:
+        conn.execute("UPDATE clientes SET data_ida='01/06/2019' WHERE id=?", (ids[3],))
+    conn.close()
+    return ids
+
+
+def _esperado(ids):
+    return {
+        "id": ids,
+        "nome": ["Ana", "Bruno", "Carla", "Davi"],
+        "nascimento": [date(1990, 5, 10)] * 4,
+        "compra": [date(2024, 1, 4), date(2024, 1, 3), date(2024, 1, 2), date(2024, 1, 1)],
+        "ida": [date(2019, 6, 1)] * 3 + [None],
+        "volta": [date(2019, 6, 10), None, date(2019, 6, 10), date(2019, 6, 10)],
+        "doc_tipo": ["CPF", "CPF", "Passaporte", "CPF"],
+        "venda_cents": [-5, 100000, 100000, 100000],
+        "pago_cents": [80000, 80000, 80000, 10**15],
+    }
+
+
+def _datas(arr):
+    return [None if np.isnat(v) else v.astype(object) for v in arr]
+
+
+def test_npz_ida_e_volta(vendas, tmp_path):
+    path = str(tmp_path / "clientes.npz")
+    assert columnar.export_columnar(path, row_group=3) == 4
+    cols = columnar.load_npz(path)
+    esperado = _esperado(vendas)
+    for nome in ("nascimento", "compra", "ida", "volta"):
+        assert cols[nome].dtype == np.dtype("datetime64[D]")
+        assert _datas(cols[nome]) == esperado[nome], nome
+    assert cols["id"].tolist() == esperado["id"]
+    assert cols["nome"].tolist() == esperado["nome"]
+    assert [cols["doc_tipo.categorias"][c] for c in cols["doc_tipo"]] == esperado["doc_tipo"]
+    assert cols["venda_cents"].dtype == np.int64
+    assert cols["venda_cents"].tolist() == esperado["venda_cents"]
+    assert cols["pago_cents"].tolist() == esperado["pago_cents"]
+
+
+def test_npz_filtro_e_banco_vazio(vendas, tmp_path):
+    path = str(tmp_path / "b.npz")
+    assert columnar.export_columnar(path, "bruno") == 1
+    assert columnar.load_npz(path)["id"].tolist() == [vendas[1]]
+    assert columnar.export_columnar(path, "ninguém") == 0
+    assert list(columnar.load_npz(path)) == ["doc_tipo.categorias"]
+
+
+def test_parquet_ida_e_volta(vendas, tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    path = str(tmp_path / "clientes.parquet")
+    assert columnar.export_columnar(path, row_group=3) == 4
+    table = pq.read_table(path)
+    esperado = _esperado(vendas)
+    for nome, valores in esperado.items():
+        assert table.column(nome).to_pylist() == valores, nome
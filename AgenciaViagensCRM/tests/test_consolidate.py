@@ -0,0 +1,49 @@
+# test_consolidate.py
+"""summarize_file: uma conexão query_only por arquivo, sem mexer nos globais."""
+from __future__ import annotations
+
+from datetime import date
+
+import pytest
+
+import consolidate
+import db
+
+
+@pytest.fixture
+def filial(tmp_path, venda):
+    path = str(tmp_path / "filial.db")
+    with db.bound_to(path):
+        db.init_db()
+        db.insert_cliente(venda())
+        db.insert_cliente(venda(data_compra_voo="2024-03-01", data_ida="2024-04-01", data_volta="2024-04-05",
+                                valor_lucro_cents=5000))
+        db.archive_before(date(2022, 1, 1))
+    return path
+
+
+def test_uma_conexao_so_leitura(filial, monkeypatch):
+    abertas = []
+    original = db.connect
+
+    def connect(path, profile=None):
+        conn = original(path, profile)
+        abertas.append((path, profile, conn.execute("PRAGMA query_only").fetchone()[0]))
+        return conn
+
+    def proibido():
+        raise AssertionError("summarize_file abriu outra conexão")
+
+    monkeypatch.setattr(db, "connect", connect)
+    monkeypatch.setattr(db, "get_conn", proibido)
+    antes = (db.DB_PATH, db.DB_PROFILE)
+    s = consolidate.summarize_file(filial)
+    assert s.erro is None
+    assert abertas == [(filial, consolidate.READ_PROFILE, 1)]
+    assert s.lucro == 25000 == sum(r[4] for r in s.meses)
+    assert [r[0] for r in s.meses] == ["2019-05", "2024-03"]
+    assert (db.DB_PATH, db.DB_PROFILE) == antes
+
+
+def test_arquivo_inexistente(tmp_path):
+    assert consolidate.summarize_file(str(tmp_path / "nada.db")).erro == "arquivo não encontrado"
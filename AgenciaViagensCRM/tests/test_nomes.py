@@ -0,0 +1,52 @@
+# test_nomes.py
+"""list_clientes_by_name: ordem sem acento/caixa, prefixo pela faixa de
+nome_sort e páginas por chave (nome, id).
+"""
+from __future__ import annotations
+
+import db
+from utils import fold_nome
+
+NOMES = ["joão silva", "João Santos", "Joana", "JOSÉ", "Ângela", "angelo", "Beatriz", "Jo", "Zé"]
+
+
+def _inserir(venda):
+    return {db.insert_cliente(venda(nome_completo=n, doc_valor=f"{i:03d}.000.000-00")): n
+            for i, n in enumerate(NOMES)}
+
+
+def _ordem(ids):
+    return sorted(ids, key=lambda i: (fold_nome(ids[i]), i))
+
+
+def test_ordem_sem_acento_nem_caixa(banco, venda):
+    ids = _inserir(venda)
+    assert [c.id for c in db.list_clientes_by_name()] == _ordem(ids)
+    assert [c.nome_completo for c in db.list_clientes_by_name("ang")] == ["Ângela", "angelo"]
+
+
+def test_prefixo(banco, venda):
+    _inserir(venda)
+    assert [c.nome_completo for c in db.list_clientes_by_name("JOÃO")] == ["João Santos", "joão silva"]
+    assert [c.nome_completo for c in db.list_clientes_by_name("jo")] == [
+        "Jo", "Joana", "João Santos", "joão silva", "JOSÉ",
+    ]
+    assert db.list_clientes_by_name("joz") == []
+    assert [c.nome_completo for c in db.list_clientes_by_name("z")] == ["Zé"]
+
+
+def test_paginas_por_chave_com_nomes_repetidos(banco, venda):
+    ids = _inserir(venda)
+    # mesmo nome em outra pessoa: o id desempata
+    for i in range(3):
+        ids[db.insert_cliente(venda(nome_completo="Joana", doc_valor=f"9{i:02d}.000.000-00"))] = "Joana"
+    for prefixo in ("", "jo"):
+        esperado = [i for i in _ordem(ids) if fold_nome(ids[i]).startswith(fold_nome(prefixo))]
+        vistos, after = [], None
+        while True:
+            pagina = db.list_clientes_by_name(prefixo, limit=2, after=after)
+            if not pagina:
+                break
+            vistos += [c.id for c in pagina]
+            after = (pagina[-1].nome_completo, pagina[-1].id)
+        assert vistos == esperado
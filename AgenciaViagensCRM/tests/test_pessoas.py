@@ -0,0 +1,109 @@
+# test_pessoas.py
+"""pessoas: vendas com o mesmo documento (normalizado) são a mesma pessoa,
+tanto gravando pelo db.py quanto migrando um banco do formato original.
+"""
+from __future__ import annotations
+
+import sqlite3
+
+import db
+
+# clientes como o init_db original criava (antes de pessoas e das colunas *_dia)
+ESQUEMA_ORIGINAL = """
+CREATE TABLE clientes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    nome_completo TEXT NOT NULL,
+    data_nascimento TEXT NOT NULL,
+    data_compra_voo TEXT NOT NULL,
+    doc_tipo TEXT NOT NULL CHECK(doc_tipo IN ('CPF','Passaporte')),
+    doc_valor TEXT NOT NULL,
+    valor_venda_cents INTEGER NOT NULL,
+    valor_lucro_cents INTEGER NOT NULL,
+    valor_pago_cents INTEGER DEFAULT 0 NOT NULL,
+    data_ida TEXT NOT NULL,
+    data_volta TEXT,
+    doc_voo_path TEXT,
+    created_at TEXT DEFAULT (DATE('now')),
+    updated_at TEXT DEFAULT (DATE('now'))
+);
+CREATE INDEX idx_clientes_data_compra ON clientes (data_compra_voo);
+CREATE INDEX idx_clientes_nome ON clientes (nome_completo);
+CREATE INDEX idx_clientes_data_ida ON clientes (data_ida);
+"""
+
+
+def _pessoa(cid):
+    conn = db.get_conn()
+    try:
+        return conn.execute("SELECT pessoa_id FROM clientes WHERE id=?", (cid,)).fetchone()[0]
+    finally:
+        conn.close()
+
+
+def _pessoas():
+    conn = db.get_conn()
+    try:
+        return conn.execute("SELECT doc_tipo, doc_norm, nome_completo FROM pessoas ORDER BY id").fetchall()
+    finally:
+        conn.close()
+
+
+def test_mesmo_documento_digitado_diferente(banco, venda):
+    a = db.insert_cliente(venda(nome_completo="Ana Souza", doc_valor="123.456.789-09"))
+    b = db.insert_cliente(venda(nome_completo="Ana Souza Lima", doc_valor="12345678909"))
+    p1 = db.insert_cliente(venda(nome_completo="Paulo", doc_tipo="Passaporte", doc_valor="ab 123-4"))
+    p2 = db.insert_cliente(venda(nome_completo="Paulo", doc_tipo="Passaporte", doc_valor="AB1234"))
+    # mesmos dígitos em outro tipo de documento: outra pessoa
+    c = db.insert_cliente(venda(nome_completo="Carla", doc_tipo="Passaporte", doc_valor="12345678909"))
+    assert _pessoa(a) == _pessoa(b)
+    assert _pessoa(p1) == _pessoa(p2)
+    assert len({_pessoa(a), _pessoa(p1), _pessoa(c)}) == 3
+    # nome da gravação mais recente
+    assert _pessoas() == [
+        ("CPF", "12345678909", "Ana Souza Lima"),
+        ("Passaporte", "AB1234", "Paulo"),
+        ("Passaporte", "12345678909", "Carla"),
+    ]
+    assert [h.id for h in db.customer_history(a)] == [b, a]
+
+
+def test_init_db_migra_banco_original(tmp_path, monkeypatch):
+    path = str(tmp_path / "antigo.db")
+    conn = sqlite3.connect(path)
+    conn.executescript(ESQUEMA_ORIGINAL)
+    conn.executemany(
+        "INSERT INTO clientes (nome_completo, data_nascimento, data_compra_voo, doc_tipo, doc_valor, "
+        "valor_venda_cents, valor_lucro_cents, valor_pago_cents, data_ida, data_volta) "
+        "VALUES (?, '1990-05-10', ?, ?, ?, 100000, 20000, 0, ?, NULL)",
+        [
+            ("José Antigo", "2019-01-10", "CPF", "123.456.789-09", "2019-02-01"),
+            ("José Novo", "2020-03-15", "CPF", "12345678909", "2020-04-01"),
+            ("Maria", "2020-07-01", "Passaporte", "x1", "2020-08-01"),
+        ],
+    )
+    conn.commit()
+    conn.close()
+
+    monkeypatch.setattr(db, "DB_PATH", path)
+    db.init_db()
+    db.init_db()  # reexecutar não muda nada
+
+    conn = db.get_conn()
+    try:
+        cols = {r[1] for r in conn.execute("PRAGMA table_xinfo(clientes)")}
+        indices = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='index'")}
+        sem_pessoa = conn.execute("SELECT COUNT(*) FROM clientes WHERE pessoa_id IS NULL").fetchone()[0]
+    finally:
+        conn.close()
+    assert {"uid", "nome_sort", "pessoa_id", "compra_dia", "ida_dia", "volta_dia", "nascimento_md"} <= cols
+    assert {"idx_clientes_compra_dia", "idx_clientes_nome_sort", "idx_clientes_relatorio"} <= indices
+    assert not {"idx_clientes_data_compra", "idx_clientes_nome", "idx_clientes_data_ida"} & indices
+    assert sem_pessoa == 0
+    assert _pessoas() == [("CPF", "12345678909", "José Novo"), ("Passaporte", "X1", "Maria")]
+    assert _pessoa(1) == _pessoa(2) != _pessoa(3)
+
+    # as consultas novas enxergam as linhas antigas
+    assert [c.nome_completo for c in db.list_clientes_by_name("jose")] == ["José Antigo", "José Novo"]
+    assert db.sum_lucro(2020) == 40000
+    assert db.available_years() == [2019, 2020]
+    assert [c.id for c in db.customer_history(1)] == [2, 1]
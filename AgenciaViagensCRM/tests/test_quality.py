@@ -0,0 +1,65 @@
+# test_quality.py
+"""quality.check_row (uma regra por caso) e scan incremental."""
+from __future__ import annotations
+
+import pytest
+
+import db
+import quality
+
+# id, updated_at, doc_tipo, doc_valor, nascimento, compra, ida, volta, venda, pago, lucro
+OK = (1, "2024-01-01", "CPF", "123.456.789-09", "1990-05-10", "2024-01-10", "2024-02-01", "2024-02-10",
+      100000, 80000, -20000)
+
+
+def _regras(**kw):
+    campos = ("cid", "upd", "doc_tipo", "doc_valor", "nasc", "compra", "ida", "volta", "venda", "pago", "lucro")
+    row = dict(zip(campos, OK))
+    row.update(kw)
+    return [(regra, detalhe) for _cid, regra, detalhe in quality.check_row(tuple(row.values()))]
+
+
+def test_linha_correta_sem_achados():
+    assert quality.check_row(OK) == []
+    assert _regras(volta=None) == []
+    assert _regras(doc_tipo="Passaporte", doc_valor="qualquer") == []
+
+
+@pytest.mark.parametrize("kw, esperado", [
+    (dict(doc_valor="123.456.789-00"), [("cpf_invalido", "123.456.789-00")]),
+    (dict(doc_valor=None), [("cpf_invalido", "")]),
+    (dict(nasc="1990-02-30"), [("data_invalida", "nascimento")]),
+    (dict(compra="10/01/2024", volta="2024-13-01"), [("data_invalida", "compra, volta")]),
+    (dict(ida="2024-2-1"), [("data_invalida", "ida")]),
+    (dict(volta="2024-01-31"), [("volta_antes_ida", "ida 2024-02-01, volta 2024-01-31")]),
+    (dict(ida="2024-01-05", volta="2024-01-09"), [("ida_antes_compra", "compra 2024-01-10, ida 2024-01-05")]),
+    (dict(venda=-100, pago=0, lucro=100), [("venda_negativa", "-R$ 1,00")]),
+    (dict(lucro=20000), [("lucro_divergente", "gravado R$ 200,00, esperado -R$ 200,00")]),
+    (dict(pago=None, lucro=-100000), []),
+])
+def test_regras(kw, esperado):
+    assert _regras(**kw) == esperado
+
+
+def test_data_invalida_nao_gera_comparacao():
+    # ida ilegível: nada de volta_antes_ida/ida_antes_compra com texto qualquer
+    assert [r for r, _ in _regras(ida="xx")] == ["data_invalida"]
+
+
+def test_scan_incremental(banco, venda):
+    boa = db.insert_cliente(venda(valor_lucro_cents=-20000))
+    ruim = db.insert_cliente(venda(valor_lucro_cents=1, doc_valor="111.111.111-12"))
+    assert quality.scan(workers=1) == {"verificadas": 2, "achados": 2, "faixas": 1}
+    assert quality.summary() == [("cpf_invalido", 1), ("lucro_divergente", 1)]
+    # sem alterações, nada a reler
+    assert quality.scan(workers=1)["verificadas"] == 0
+
+    db.delete_cliente(ruim)
+    assert quality.scan(workers=1)["verificadas"] == 0
+    assert quality.list_findings() == []
+    assert quality.scan(full=True, workers=1) == {"verificadas": 1, "achados": 0, "faixas": 1}
+
+    # venda alterada: só ela é relida
+    db.update_cliente(boa, venda(valor_lucro_cents=5))
+    assert quality.scan(workers=1) == {"verificadas": 1, "achados": 1, "faixas": 1}
+    assert [(cid, regra) for cid, _nome, regra, _d in quality.list_findings()] == [(boa, "lucro_divergente")]
@@ -0,0 +1,45 @@
+# test_receivables.py
+"""list_receivables / receivables_total: só saldo em aberto, páginas por
+chave (data_ida, id) sem pular nem repetir linhas.
+"""
+from __future__ import annotations
+
+import db
+
+
+def _abertas(venda):
+    """Insere vendas com e sem saldo; devolve os ids em aberto na ordem esperada."""
+    ids = {}
+    for n, (ida, pago) in enumerate([
+        ("2025-03-10", 80000), ("2025-01-05", 100000), ("2025-01-05", 0), ("2025-02-01", 50000),
+        ("2025-01-05", 99999), ("2025-03-10", 120000), ("2025-02-01", 10000),
+    ]):
+        cid = db.insert_cliente(venda(data_ida=ida, data_volta=None, valor_pago_cents=pago,
+                                      doc_valor=f"{n:03d}.000.000-00"))
+        if pago < 100000:
+            ids[cid] = (ida, cid)
+    return sorted(ids, key=ids.get)
+
+
+def test_so_saldo_em_aberto_por_data_de_ida(banco, venda):
+    esperado = _abertas(venda)
+    assert [c.id for c in db.list_receivables()] == esperado
+    assert all(c.valor_pago_cents < c.valor_venda_cents for c in db.list_receivables())
+
+
+def test_paginas_por_chave(banco, venda):
+    esperado = _abertas(venda)
+    vistos, after = [], None
+    while True:
+        pagina = db.list_receivables(limit=2, after=after)
+        if not pagina:
+            break
+        assert len(pagina) <= 2
+        vistos += [c.id for c in pagina]
+        after = (pagina[-1].data_ida, pagina[-1].id)
+    assert vistos == esperado
+
+
+def test_total(banco, venda):
+    _abertas(venda)
+    assert db.receivables_total() == (5, 20000 + 100000 + 50000 + 1 + 90000)
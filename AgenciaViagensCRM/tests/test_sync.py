@@ -0,0 +1,98 @@
+# test_sync.py
+"""apply_changes / sync.py: aplicação do delta e caminhos de conflito."""
+from __future__ import annotations
+
+from datetime import date
+
+import pytest
+
+import db
+import sync
+
+
+@pytest.fixture
+def filiais(tmp_path, venda):
+    """(c, d): dois bancos novos; d já recebeu de c uma venda de 2019."""
+    c, d = str(tmp_path / "c.db"), str(tmp_path / "d.db")
+    for path in (c, d):
+        with db.bound_to(path):
+            db.init_db()
+    with db.bound_to(c):
+        cid = db.insert_cliente(venda())
+    res = sync.sync(c, d)
+    assert res["aplicadas"] == 1 and not res["conflitos"]
+    return c, d, cid
+
+
+def _editar(path, cid, **kw):
+    with db.bound_to(path):
+        atual = db.get_cliente(cid)
+        data = {k: getattr(atual, k) for k in db.CLIENTE_CAMPOS if k != "id"}
+        data.update(kw)
+        db.update_cliente(cid, data)
+
+
+def _id_por_nome(path, nome):
+    with db.bound_to(path):
+        return next(c.id for c in db.list_clientes() if c.nome_completo == nome)
+
+
+def test_update_aplicado_e_reaplicar_e_inofensivo(filiais):
+    c, d, cid = filiais
+    _editar(c, cid, valor_lucro_cents=25000)
+    with db.bound_to(c):
+        lote = db.export_changes_since(db.latest_change_seq() - 1)
+    assert sync.sync(c, d)["aplicadas"] == 1
+    with db.bound_to(d):
+        res = db.apply_changes(lote)
+        assert db.sum_lucro() == 25000
+        assert len(db.list_clientes()) == 1
+    assert res["aplicadas"] == 0 and res["conflitos"] == []
+
+
+def test_update_concorrente_vira_conflito(filiais):
+    c, d, cid = filiais
+    _editar(c, cid, valor_lucro_cents=25000)
+    _editar(d, _id_por_nome(d, "Ana Souza"), valor_lucro_cents=30000)
+    res = sync.sync(c, d)
+    assert res["aplicadas"] == 0
+    assert [x["motivo"] for x in res["conflitos"]] == ["alterado localmente"]
+    with db.bound_to(d):
+        assert db.sum_lucro() == 30000
+
+
+def test_delete_de_linha_alterada_localmente_vira_conflito(filiais):
+    c, d, cid = filiais
+    _editar(d, _id_por_nome(d, "Ana Souza"), valor_lucro_cents=30000)
+    with db.bound_to(c):
+        db.delete_cliente(cid)
+    res = sync.sync(c, d)
+    assert [x["op"] for x in res["conflitos"]] == ["D"]
+    with db.bound_to(d):
+        assert len(db.list_clientes()) == 1
+
+
+def test_update_de_linha_excluida_localmente_nao_recria(filiais):
+    c, d, cid = filiais
+    with db.bound_to(d):
+        db.delete_cliente(_id_por_nome(d, "Ana Souza"))
+    _editar(c, cid, valor_lucro_cents=25000)
+    res = sync.sync(c, d)
+    assert res["aplicadas"] == 0
+    assert [x["motivo"] for x in res["conflitos"]] == ["excluído localmente"]
+    with db.bound_to(d):
+        assert db.list_clientes() == []
+
+
+def test_update_de_viagem_arquivada_nao_duplica(filiais):
+    c, d, cid = filiais
+    with db.bound_to(d):
+        assert db.archive_before(date(2022, 1, 1)) == 1
+    _editar(c, cid, valor_lucro_cents=25000)
+    res = sync.sync(c, d)
+    assert res["aplicadas"] == 0
+    assert [x["motivo"] for x in res["conflitos"]] == ["arquivada localmente"]
+    with db.bound_to(d):
+        assert [x.nome_completo for x in db.list_by_month_year(2019, 5)] == ["Ana Souza"]
+        assert db.list_clientes() == []
+        assert db.sum_lucro() == 20000
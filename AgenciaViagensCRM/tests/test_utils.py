@@ -0,0 +1,125 @@
+# test_utils.py
+"""Caminhos rápidos de utils dão o mesmo resultado que os originais:
+moeda (regex e lote contra o caminho com Decimal) e datas (iso_to_br_fast
+contra iso_to_br, inclusive o erro).
+"""
+from __future__ import annotations
+
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import utils  # noqa: E402
+from utils import format_cents_br  # noqa: E402
+
+
+def _texto_moeda(rnd: random.Random) -> str:
+    """Valor aleatório nos formatos do formulário e das importações, com lixo."""
+    cents = rnd.choice([rnd.randint(0, 999), rnd.randint(0, 10**7), rnd.randint(0, 10**12)])
+    reais, cent = divmod(cents, 100)
+    txt = rnd.choice([
+        format_cents_br(cents),
+        f"{reais}.{cent:02d}",
+        f"{reais},{cent % 10}",
+        str(reais),
+        f"{reais:,}.{cent:02d}",
+        f"{reais}.{rnd.randint(0, 999):03d}",
+        f"({format_cents_br(cents)})",
+        f"{reais:,}".replace(",", ".") + rnd.choice(["", "-", ",", ",5-"]),
+        "".join(rnd.choice("0123456789.,R$- ()+\xa0x") for _ in range(rnd.randint(0, 12))),
+        f"{reais},{cent:02d}",
+    ])
+    sinal = rnd.randrange(6)
+    if sinal == 0:
+        txt = "-" + txt
+    elif sinal == 1:
+        txt = txt.replace("R$ ", "R$ -")
+    return rnd.choice(["", " ", "\xa0"]) + txt + rnd.choice(["", " "])
+
+
+def _referencia(v: object) -> object:
+    """Resultado do caminho com Decimal, ou ValueError."""
+    s = "" if v is None else str(v).strip()
+    if s == "":
+        return 0
+    try:
+        return utils._parse_currency_slow(s)
+    except ValueError:
+        return ValueError
+
+
+def _um(v: object) -> object:
+    try:
+        return utils.parse_currency_to_cents(v)
+    except ValueError:
+        return ValueError
+
+
+VALORES = [_texto_moeda(random.Random(seed)) for seed in range(20_000)]
+EXTRAS = [None, "", "   ", 1234, 12.5, "R$ 1.234,56", "1,234,567.89", "1.234,56-", "(1.234,56)", "abc"]
+
+
+@pytest.mark.parametrize("valor, cents", [
+    ("R$ 1.234,56", 123456),
+    ("-R$ 1.234,56", -123456),
+    ("R$ -1.234,56", -123456),
+    ("1.234,56-", -123456),
+    ("(1.234,56)", -123456),
+    ("1,234,567.89", 123456789),
+    ("1234.5", 123450),
+    ("", 0),
+    (None, 0),
+])
+def test_parse_currency_to_cents_exemplos(valor, cents):
+    assert utils.parse_currency_to_cents(valor) == cents
+
+
+def test_parse_currency_to_cents_igual_ao_caminho_decimal():
+    for v in VALORES + EXTRAS:
+        assert _um(v) == _referencia(v), v
+
+
+def test_parse_currency_many_igual_a_um_por_um():
+    valores = VALORES + EXTRAS
+    cents, erros = utils.parse_currency_many(valores)
+    esperado = [_um(v) for v in valores]
+    assert erros == [i for i, r in enumerate(esperado) if r is ValueError]
+    assert list(cents) == [0 if r is ValueError else r for r in esperado]
+
+
+def test_parse_currency_many_fora_do_int64_vira_erro():
+    cents, erros = utils.parse_currency_many(["1", "9" * 30, "2"])
+    assert list(cents) == [100, 0, 200]
+    assert erros == [1]
+
+
+def _br(fn, v):
+    try:
+        return fn(v)
+    except ValueError as exc:
+        return ("erro", str(exc))
+
+
+@pytest.mark.parametrize("valor", [
+    "2023-02-30", "2023-13-01", "2023-00-10", "2023-04-31", "2023-02-29", "2024-02-29",
+    "0999-01-01", "2023-1a-01", "2023-01-0١", "abcd-ef-gh", "2023-01-01 ", "", None,
+])
+def test_iso_to_br_fast_igual_a_iso_to_br(valor):
+    assert _br(utils.iso_to_br_fast, valor) == _br(utils.iso_to_br, valor)
+
+
+def test_iso_to_br_fast_data_inexistente_da_o_mesmo_erro():
+    with pytest.raises(ValueError, match="day is out of range for month"):
+        utils.iso_to_br_fast("2023-02-30")
+    assert utils.iso_to_br_fast("2024-02-29") == "29/02/2024"
+
+
+def test_iso_to_br_fast_aleatorio():
+    rnd = random.Random(3)
+    for _ in range(20_000):
+        v = f"{rnd.randint(0, 9999):04d}-{rnd.randint(0, 13):02d}-{rnd.randint(0, 32):02d}"
+        assert _br(utils.iso_to_br_fast, v) == _br(utils.iso_to_br, v), v